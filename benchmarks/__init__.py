@@ -0,0 +1,4 @@
+"""Benchmark suite for the processing pipeline and editor hot paths.
+
+Run with ``python -m benchmarks.run``; see that module for options.
+"""
@@ -0,0 +1,124 @@
+"""Benchmarks for the editor widgets, run on the offscreen Qt platform."""
+
+import os
+import sys
+
+from benchmarks.harness import benchmark
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Loading the document into the editor dominates setup above this size
+_EDITOR_MAX_SIZE = 20_000_000
+
+
+def _get_app():
+    from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module,import-outside-toplevel
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def _editor(document):
+    from papyrus.ui.editor import PagedTextEdit  # pylint: disable=import-outside-toplevel
+
+    app = _get_app()
+    editor = PagedTextEdit()
+    editor.resize(900, 700)
+    editor.setPlainText(document)
+    editor.show()
+    app.processEvents()
+    return app, editor
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_paint_with_page_breaks(document):
+    app, editor = _editor(document)
+    editor.set_show_page_breaks(True)
+    bar = editor.verticalScrollBar()
+    bar.setValue(bar.maximum() // 2)
+    app.processEvents()
+    # The closure keeps the editor alive while it is being timed
+    return lambda: editor.viewport().repaint()
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_scroll_page(document):
+    """Page down and repaint, wrapping around at the end."""
+    from PySide6.QtWidgets import QAbstractSlider  # pylint: disable=no-name-in-module,import-outside-toplevel
+
+    app, editor = _editor(document)
+    editor.set_show_page_breaks(True)
+    bar = editor.verticalScrollBar()
+
+    def run():
+        if bar.value() >= bar.maximum():
+            bar.setValue(0)
+        bar.triggerAction(QAbstractSlider.SliderAction.SliderPageStepAdd)
+        editor.viewport().repaint()
+        app.processEvents()
+
+    return run
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_type_character(document):
+    """Insert one character mid-document and repaint."""
+    app, editor = _editor(document)
+    bar = editor.verticalScrollBar()
+    bar.setValue(bar.maximum() // 2)
+    app.processEvents()
+    editor.setTextCursor(editor.cursorForPosition(editor.viewport().rect().center()))
+
+    def run():
+        editor.textCursor().insertText("x")
+        editor.viewport().repaint()
+        app.processEvents()
+
+    return run
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_highlighter_rehighlight(document):
+    from papyrus.ui.highlighter import HTMLSyntaxHighlighter  # pylint: disable=import-outside-toplevel
+
+    _, editor = _editor(document)
+    highlighter = HTMLSyntaxHighlighter(editor.document())
+    editor.visibleBlocksChanged.connect(highlighter.set_visible_blocks)
+    # rehighlight() relayouts the whole document in Qt after formatting
+    return lambda: (editor, highlighter.rehighlight())
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_load_highlighted(document):
+    """setPlainText with the highlighter attached, as when a file is opened."""
+    from papyrus.ui.editor import PagedTextEdit  # pylint: disable=import-outside-toplevel
+    from papyrus.ui.highlighter import HTMLSyntaxHighlighter  # pylint: disable=import-outside-toplevel
+
+    _get_app()
+    editor = PagedTextEdit()
+    editor.resize(900, 700)
+    editor.show()
+    highlighter = HTMLSyntaxHighlighter(editor.document())
+    editor.visibleBlocksChanged.connect(highlighter.set_visible_blocks)
+
+    def run():
+        editor.setPlainText(document)
+        editor.clear()
+
+    return run
+
+
+@benchmark(max_size=_EDITOR_MAX_SIZE)
+def bench_highlight_tokenize(document):
+    from papyrus.ui.highlighter import tokenize  # pylint: disable=import-outside-toplevel
+
+    lines = document.split("\n")
+
+    def run():
+        in_comment = False
+        for line in lines:
+            _, in_comment = tokenize(line, in_comment)
+
+    return run
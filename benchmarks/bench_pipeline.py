@@ -0,0 +1,58 @@
+"""Benchmarks for the Qt-free processing pipeline."""
+
+import os
+import tempfile
+
+from benchmarks.harness import benchmark
+from papyrus.core import pipeline, stream
+from papyrus.utils.helpers import clean_pasted_html
+
+# BeautifulSoup needs minutes per run above this size
+_SOUP_MAX_SIZE = 10_000_000
+
+
+@benchmark(max_size=_SOUP_MAX_SIZE)
+def bench_clean_pasted_html(document):
+    return lambda: clean_pasted_html(document)
+
+
+@benchmark()
+def bench_sanitize_for_pdf_copy(document):
+    return lambda: pipeline.sanitize_for_pdf_copy(document)
+
+
+@benchmark()
+def bench_build_copyable_code_view(document):
+    return lambda: pipeline.build_copyable_code_view(document)
+
+
+@benchmark()
+def bench_get_styled_wrapper(document):
+    return lambda: pipeline.get_styled_wrapper(document)
+
+
+@benchmark(full_document=True)
+def bench_inject_print_bands(document):
+    return lambda: pipeline.inject_print_bands(document, pipeline.DEFAULT_BAND_TEXT)
+
+
+@benchmark()
+def bench_render_html(document):
+    options = pipeline.RenderOptions(print_bands=True)
+    return lambda: pipeline.render_html(document, options)
+
+
+@benchmark()
+def bench_render_file_streamed(document):
+    # The closure keeps the directory alive; it is removed with it
+    workdir = tempfile.TemporaryDirectory(prefix="papyrus-bench-")
+    with open(os.path.join(workdir.name, "in.html"), "w", encoding="utf-8") as f:
+        f.write(document)
+    options = pipeline.RenderOptions(print_bands=True)
+
+    def run():
+        stream.render_file(
+            os.path.join(workdir.name, "in.html"), os.path.join(workdir.name, "out.html"), options
+        )
+
+    return run
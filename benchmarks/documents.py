@@ -0,0 +1,74 @@
+"""Deterministic synthetic HTML documents for benchmarks."""
+
+import random
+
+SIZES = {
+    "1KB": 1_000,
+    "100KB": 100_000,
+    "1MB": 1_000_000,
+    "10MB": 10_000_000,
+    "20MB": 20_000_000,
+    "50MB": 50_000_000,
+}
+
+_WORDS = (
+    "papyrus render pipeline page break highlight paste clean wrapper band "
+    "print document editor history search token block layout viewport"
+).split()
+
+# Characters sanitize_for_pdf_copy rewrites, mixed in at a low rate
+_SPECIALS = ("\xa0", "\u200b", "\u2018", "\u2019", "\u201c", "\u201d", "\u2014", "\u2026")
+
+
+def _paragraph(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(8, 24)):
+        word = rng.choice(_WORDS)
+        if rng.random() < 0.05:
+            word += rng.choice(_SPECIALS)
+        words.append(word)
+    text = " ".join(words)
+    return f'<p class="c{rng.randint(0, 9)}">{text} &amp; more</p>'
+
+
+def _snippet(rng: random.Random, index: int) -> str:
+    choice = rng.random()
+    if choice < 0.6:
+        return _paragraph(rng)
+    if choice < 0.75:
+        href = f"/docs/{index}"
+        return f'<div id="d{index}"><a href="{href}" title=\'link {index}\'>{rng.choice(_WORDS)}</a></div>'
+    if choice < 0.85:
+        return f"<pre><code>for i in range({index}):\n    print(i &lt; 3)</code></pre>"
+    if choice < 0.93:
+        return f"<!-- section {index}\n     notes -->"
+    return f'<span style="user-select: none">{rng.choice(_WORDS)}</span>'
+
+
+def make_document(size: int, seed: int = 0, full: bool = False) -> str:
+    """Return HTML of roughly size characters, identical for the same arguments.
+
+    Args:
+        size: Target length in characters
+        seed: Random seed
+        full: Wrap the body in <html>/<head>/<body>
+
+    Returns:
+        Synthetic HTML document
+    """
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    index = 0
+    while length < size:
+        snippet = _snippet(rng, index)
+        parts.append(snippet)
+        length += len(snippet) + 1
+        index += 1
+    body = "\n".join(parts)
+    if full:
+        return (
+            "<!DOCTYPE html>\n<html><head><title>Benchmark</title>"
+            "<style>p { margin: 0 }</style></head>\n<body>\n" + body + "\n</body></html>"
+        )
+    return body
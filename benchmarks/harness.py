@@ -0,0 +1,154 @@
+"""Timing, result storage and comparison for the benchmark suite."""
+
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+BENCH_MODULES = ("benchmarks.bench_pipeline", "benchmarks.bench_editor")
+DEFAULT_THRESHOLD = 0.10
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A benchmark: setup(document) returns the callable that is timed."""
+
+    name: str
+    setup: Callable[[str], Callable[[], object]]
+    max_size: Optional[int] = None
+    full_document: bool = False
+
+
+def benchmark(max_size: Optional[int] = None, full_document: bool = False):
+    """Mark a function as a benchmark.
+
+    The decorated function receives the synthetic document, does any
+    untimed preparation and returns a zero-argument callable to time.
+
+    Args:
+        max_size: Skip document sizes above this many characters
+        full_document: Generate a complete <html> document instead of a fragment
+    """
+
+    def decorate(func):
+        group = func.__module__.rsplit(".", 1)[-1].removeprefix("bench_")
+        func.benchmark = Benchmark(
+            name=f"{group}.{func.__name__.removeprefix('bench_')}",
+            setup=func,
+            max_size=max_size,
+            full_document=full_document,
+        )
+        return func
+
+    return decorate
+
+
+def discover(modules=BENCH_MODULES) -> Iterator[Benchmark]:
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        for value in vars(module).values():
+            bench = getattr(value, "benchmark", None)
+            if isinstance(bench, Benchmark):
+                yield bench
+
+
+def time_callable(
+    func: Callable[[], object], min_repeats: int = 3, max_repeats: int = 50, min_time: float = 0.5
+) -> list:
+    """Call func repeatedly and return the wall time of each call in seconds.
+
+    Stops after max_repeats calls, or once at least min_repeats calls have
+    taken min_time seconds in total.
+    """
+    times = []
+    while len(times) < max_repeats:
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+        if len(times) >= min_repeats and sum(times) >= min_time:
+            break
+    return times
+
+
+def summarize(times: list, size: int) -> dict:
+    best = min(times)
+    return {
+        "size": size,
+        "repeats": len(times),
+        "min_s": best,
+        "median_s": statistics.median(times),
+        "mb_per_s": size / best / 1e6 if best > 0 else None,
+    }
+
+
+def environment() -> dict:
+    """Describe the machine and code a result file was produced on."""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import PySide6  # pylint: disable=import-outside-toplevel
+
+        info["pyside6"] = PySide6.__version__
+    except ImportError:
+        pass
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def save_results(path: str, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Compare best times of benchmarks present in both result sets.
+
+    Args:
+        baseline: Results from an earlier run
+        current: Results from this run
+        threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10%
+
+    Returns:
+        List of (name, baseline seconds, current seconds, ratio, regressed)
+        sorted by name
+    """
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]["min_s"]
+        after = current[name]["min_s"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(rows: list, file=None) -> None:
+    file = file or sys.stdout
+    for name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<48} {before * 1000:10.3f} ms -> {after * 1000:10.3f} ms  x{ratio:5.2f}{flag}",
+            file=file,
+        )
@@ -0,0 +1,119 @@
+"""Run the benchmark suite and optionally compare against a saved baseline.
+
+Examples::
+
+    # Everything up to 1 MB, saved for later comparison
+    python -m benchmarks.run --max-size 1MB -o baseline.json
+
+    # Full run (1 KB to 50 MB), failing on slowdowns above 10%
+    python -m benchmarks.run -o current.json --compare baseline.json --threshold 0.10
+
+    # Compare two saved files without running anything
+    python -m benchmarks.run --compare baseline.json --against current.json
+
+Editor benchmarks use the offscreen Qt platform unless QT_QPA_PLATFORM is set.
+"""
+
+import argparse
+import fnmatch
+import gc
+import sys
+
+from benchmarks.documents import SIZES, make_document
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD,
+    compare_results,
+    discover,
+    load_results,
+    print_comparison,
+    save_results,
+    summarize,
+    time_callable,
+)
+
+
+def _size(value: str) -> int:
+    if value.upper() in SIZES:
+        return SIZES[value.upper()]
+    return int(value)
+
+
+def run(patterns: list, max_size: int, quiet: bool = False) -> dict:
+    """Run matching benchmarks at every document size up to max_size.
+
+    Args:
+        patterns: fnmatch patterns for benchmark names, empty for all
+        max_size: Largest document size in characters
+
+    Returns:
+        Result dict keyed by "name[size label]"
+    """
+    results = {}
+    benches = [
+        b for b in discover() if not patterns or any(fnmatch.fnmatch(b.name, p) for p in patterns)
+    ]
+    for label, size in SIZES.items():
+        if size > max_size:
+            continue
+        documents = {}
+        for bench in benches:
+            if bench.max_size is not None and size > bench.max_size:
+                continue
+            if bench.full_document not in documents:
+                documents[bench.full_document] = make_document(size, full=bench.full_document)
+            document = documents[bench.full_document]
+            func = bench.setup(document)
+            stats = summarize(time_callable(func), len(document))
+            key = f"{bench.name}[{label}]"
+            results[key] = stats
+            del func
+            gc.collect()
+            if not quiet:
+                print(
+                    f"{key:<48} {stats['min_s'] * 1000:10.3f} ms  "
+                    f"(median {stats['median_s'] * 1000:.3f} ms, {stats['repeats']} runs)",
+                    flush=True,
+                )
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n")[0])
+    parser.add_argument("-k", "--filter", action="append", default=[], help="Benchmark name pattern")
+    parser.add_argument(
+        "--max-size", type=_size, default=SIZES["50MB"], help="Largest document, e.g. 1MB (default: 50MB)"
+    )
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to compare against")
+    parser.add_argument("--against", metavar="RESULTS", help="Compare this file instead of running")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown before a result counts as a regression (default: 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.against:
+        if not args.compare:
+            parser.error("--against requires --compare")
+        current = load_results(args.against)
+    else:
+        current = run(args.filter, args.max_size)
+        if args.output:
+            save_results(args.output, current)
+
+    if not args.compare:
+        return 0
+    rows = compare_results(load_results(args.compare), current, args.threshold)
+    print()
+    print_comparison(rows)
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -106,5 +106,6 @@ setup(
     data_files=DATA_FILES,
     package_dir={"": "src"},
     packages=find_packages(where="src"),
+    package_data={"papyrus": ["themes/*.json"]},
     options={"py2app": OPTIONS},
 )
@@ -1,6 +1,12 @@
-from importlib.metadata import version, PackageNotFoundError
+def __getattr__(name):
+    # importlib.metadata is slow to import, so the version is looked up on use
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
 
-try:
-    __version__ = version("Papyrus")
-except PackageNotFoundError:
-    __version__ = "unknown"
+        try:
+            value = version("Papyrus")
+        except PackageNotFoundError:
+            value = "unknown"
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,498 @@
+"""Headless command line interface for batch HTML conversion.
+
+This module must not import Qt: conversions run the string pipeline from
+papyrus.core.pipeline in a process pool without a QApplication. PDF output
+imports papyrus.core.pdf inside the worker that needs it.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import fnmatch
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from papyrus import __version__
+from papyrus.core.assets import ASSET_MODES
+from papyrus.core.pipeline import DEFAULT_BAND_TEXT, RenderOptions, render_html
+from papyrus.core.render_pool import DEFAULT_TIMEOUT, RendererPool
+from papyrus.core.server import DEFAULT_HOST, DEFAULT_MAX_QUEUE, DEFAULT_PORT, RenderServer
+from papyrus.core.stream import render_file
+from papyrus.core.themes import DEFAULT_THEME, ThemeError, registry
+from papyrus.core.watch import DEFAULT_DEBOUNCE, MANIFEST_NAME, SyncResult, WatchFolder
+
+HTML_SUFFIXES = (".html", ".htm")
+# HTML output for sources this large is rendered in chunks, in constant memory
+STREAM_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+
+def iter_sources(inputs: list) -> Iterator[tuple]:
+    """Expand directories, globs and files into (source, relative output) pairs.
+
+    Args:
+        inputs: Paths, directories or glob patterns from the command line
+
+    Yields:
+        Tuples of (source path, output path relative to the output directory)
+    """
+    seen = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pairs = (
+                (p, p.relative_to(path))
+                for p in sorted(path.rglob("*"))
+                if p.suffix.lower() in HTML_SUFFIXES and p.is_file()
+            )
+        elif glob.has_magic(item):
+            pairs = (
+                (Path(p), Path(Path(p).name))
+                for p in sorted(glob.glob(item, recursive=True))
+                if os.path.isfile(p)
+            )
+        else:
+            pairs = iter([(path, Path(path.name))])
+        for source, relative in pairs:
+            key = os.path.abspath(source)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield source, relative
+
+
+def convert_file(
+    source: Path, target: Path, options: RenderOptions, pdf_engine: Optional[str] = None
+) -> tuple:
+    """Run the pipeline on one file and write the result.
+
+    Args:
+        source: HTML file to read
+        target: File to write the processed HTML or PDF to
+        options: Render options
+        pdf_engine: Write a PDF with this papyrus.core.pdf engine instead of HTML
+
+    Returns:
+        Tuple of (source, target, bytes read, bytes written, error message or None)
+    """
+    try:
+        # Streamed files keep their asset references as written
+        if pdf_engine is None and source.stat().st_size >= STREAM_THRESHOLD_BYTES:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            size_in, size_out = render_file(str(source), str(target), options)
+            return source, target, size_in, size_out, None
+        raw = source.read_bytes()
+        html = raw.decode("utf-8", errors="replace")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if pdf_engine is not None:
+            from papyrus.core.pdf import export_pdf  # pylint: disable=import-outside-toplevel
+
+            export_pdf(html, str(target), options, engine=pdf_engine, base_dir=str(source.parent))
+            return source, target, len(raw), target.stat().st_size, None
+        output = render_html(
+            html, options, base_dir=str(source.parent), output_path=str(target)
+        ).encode("utf-8")
+        target.write_bytes(output)
+        return source, target, len(raw), len(output), None
+    except OSError as e:
+        return source, target, 0, 0, str(e)
+
+
+def parse_theme_rules(values: Optional[list]) -> tuple:
+    """Split --theme values into a default theme and per-document rules.
+
+    Args:
+        values: "THEME" or "PATTERN=THEME" strings; the last plain THEME is the default
+
+    Returns:
+        Tuple of (default theme id, list of (pattern, theme id) in order)
+
+    Raises:
+        ThemeError: If a theme is unknown
+    """
+    default = DEFAULT_THEME
+    rules = []
+    for value in values or ():
+        pattern, sep, theme = value.rpartition("=")
+        registry().get(theme)
+        if sep:
+            rules.append((pattern, theme))
+        else:
+            default = theme
+    return default, rules
+
+
+def theme_for(relative: Path, default: str, rules: list) -> str:
+    """Return the theme of the first rule whose pattern matches a document's output path."""
+    name = relative.as_posix()
+    for pattern, theme in rules:
+        if fnmatch.fnmatch(name, pattern):
+            return theme
+    return default
+
+
+def _convert_job(job: tuple) -> tuple:
+    return convert_file(*job)
+
+
+def _format_rate(count: float, seconds: float) -> str:
+    return f"{count / seconds:.1f}" if seconds > 0 else "inf"
+
+
+def options_resolver(args: argparse.Namespace) -> Callable[[Path], RenderOptions]:
+    """Build the render options for each document from the render arguments.
+
+    Returns:
+        Function from a document's output path to its RenderOptions
+
+    Raises:
+        ThemeError: If a --theme names an unknown theme
+    """
+    options = RenderOptions(
+        add_wrapper=not args.no_wrapper,
+        pdf_copy=args.pdf_copy,
+        print_bands=args.bands,
+        band_text=args.band_text,
+        top_mm=args.top_mm,
+        bottom_mm=args.bottom_mm,
+        assets=args.assets or "",
+    )
+    default_theme, theme_rules = parse_theme_rules(args.theme)
+    # One RenderOptions per theme; workers compile each theme's CSS once
+    themed = {}
+
+    def options_for(relative: Path) -> RenderOptions:
+        theme = theme_for(relative, default_theme, theme_rules)
+        if theme not in themed:
+            themed[theme] = dataclasses.replace(options, theme=theme)
+        return themed[theme]
+
+    return options_for
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    try:
+        options_for = options_resolver(args)
+    except ThemeError as e:
+        print(f"papyrus: {e}", file=sys.stderr)
+        return 1
+    out_dir = Path(args.output)
+    pdf_engine = args.pdf_engine if args.pdf else None
+    jobs = [
+        (
+            source,
+            out_dir / (relative.with_suffix(".pdf") if args.pdf else relative),
+            options_for(relative),
+            pdf_engine,
+        )
+        for source, relative in iter_sources(args.inputs)
+    ]
+    if not jobs:
+        print("papyrus: no HTML files matched", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    converted = failed = bytes_in = bytes_out = 0
+    if args.jobs == 1:
+        results = map(_convert_job, jobs)
+        executor = None
+    elif pdf_engine is not None:
+        # Long-lived renderers keep Qt warm and survive crashing documents
+        executor = RendererPool(
+            workers=args.jobs, timeout=args.timeout, engine=pdf_engine
+        )
+        results = executor.imap_unordered(job[:3] for job in jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        chunksize = max(1, min(64, len(jobs) // ((args.jobs or os.cpu_count() or 1) * 4)))
+        results = executor.map(_convert_job, jobs, chunksize=chunksize)
+    try:
+        for source, target, size_in, size_out, error in results:
+            if error:
+                failed += 1
+                print(f"papyrus: {source}: {error}", file=sys.stderr)
+                continue
+            converted += 1
+            bytes_in += size_in
+            bytes_out += size_out
+            if args.verbose:
+                print(f"{source} -> {target}")
+    finally:
+        if isinstance(executor, RendererPool):
+            executor.close()
+        elif executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - started
+
+    mb_in = bytes_in / (1024 * 1024)
+    print(
+        f"Converted {converted} file(s), {mb_in:.2f} MB -> "
+        f"{bytes_out / (1024 * 1024):.2f} MB in {elapsed:.2f}s "
+        f"({_format_rate(converted, elapsed)} files/s, {_format_rate(mb_in, elapsed)} MB/s)"
+        + (f", {failed} failed" if failed else "")
+    )
+    return 1 if failed else 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    try:
+        options_for = options_resolver(args)
+    except ThemeError as e:
+        print(f"papyrus: {e}", file=sys.stderr)
+        return 1
+    if not os.path.isdir(args.source):
+        print(f"papyrus: {args.source} is not a directory", file=sys.stderr)
+        return 1
+    failed = 0
+
+    def report(result: SyncResult) -> None:
+        nonlocal failed
+        failed += len(result.failed)
+        for source, error in result.failed:
+            print(f"papyrus: {source}: {error}", file=sys.stderr)
+        if result.changed or args.verbose:
+            print(
+                f"{time.strftime('%H:%M:%S')} converted {result.converted}, "
+                f"removed {result.removed}, unchanged {result.unchanged}"
+                + (f", {len(result.failed)} failed" if result.failed else "")
+                + f" in {result.seconds:.2f}s",
+                flush=True,
+            )
+
+    folder = WatchFolder(
+        args.source,
+        args.output,
+        convert_file,
+        options_for,
+        manifest_path=args.manifest,
+        jobs=args.jobs or None,
+        # A single pass should not leave files behind for a pass that never comes
+        debounce=0.0 if args.once else args.debounce,
+    )
+    try:
+        if not args.once:
+            print(f"Watching {folder.source} -> {folder.output} (Ctrl+C to stop)", flush=True)
+        folder.watch(args.interval, report, should_stop=lambda: args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        folder.close()
+    return 1 if args.once and failed else 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    try:
+        server = RenderServer(
+            args.host,
+            args.port,
+            jobs=args.jobs,
+            max_queue=args.max_queue,
+            max_body=args.max_body_mb * 1024 * 1024,
+            timeout=args.timeout,
+            pdf_engine=args.pdf_engine,
+        )
+    except ValueError as e:
+        print(f"papyrus: {e}", file=sys.stderr)
+        return 1
+
+    async def serve() -> None:
+        await server.start()
+        print(f"Serving on {server.url} (Ctrl+C to stop)", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"papyrus: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_themes(args: argparse.Namespace) -> int:
+    themes = registry()
+    for theme_id in themes.ids():
+        theme = themes.get(theme_id)
+        print(f"{theme_id}\t{theme.name}" + (f"\t{theme.digest}" if args.verbose else ""))
+    return 0
+
+
+def add_render_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments read by options_resolver()."""
+    parser.add_argument(
+        "--no-wrapper", action="store_true", help="Do not add the styling wrapper"
+    )
+    parser.add_argument(
+        "--pdf-copy",
+        action="store_true",
+        help="Render the HTML source as copyable code",
+    )
+    parser.add_argument(
+        "--bands", action="store_true", help="Add repeated print bands"
+    )
+    parser.add_argument(
+        "--band-text", default=DEFAULT_BAND_TEXT, help="Text shown in the print bands"
+    )
+    parser.add_argument("--top-mm", type=int, default=12, help="Top band offset")
+    parser.add_argument(
+        "--bottom-mm", type=int, default=12, help="Bottom band offset"
+    )
+    parser.add_argument(
+        "--assets",
+        choices=ASSET_MODES,
+        help="Inline local images, stylesheets and fonts as data URIs, or copy them "
+        "into a NAME_files folder next to each output",
+    )
+    parser.add_argument(
+        "--theme",
+        action="append",
+        metavar="[PATTERN=]THEME",
+        help="Wrapper theme, or the theme for output paths matching PATTERN; repeatable",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="papyrus", description="Papyrus HTML converter (headless mode)."
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser(
+        "convert", help="Process HTML files into print-ready HTML."
+    )
+    convert.add_argument(
+        "inputs", nargs="+", help="HTML files, directories or glob patterns"
+    )
+    convert.add_argument(
+        "-o", "--output", required=True, help="Directory to write results to"
+    )
+    convert.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count, 1 runs in-process)",
+    )
+    add_render_arguments(convert)
+    convert.add_argument(
+        "--pdf", action="store_true", help="Write PDF files instead of HTML"
+    )
+    convert.add_argument(
+        "--pdf-engine",
+        choices=("auto", "webengine", "qt"),
+        default="auto",
+        help="PDF renderer (default: QtWebEngine when installed, else QTextDocument)",
+    )
+    convert.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds one PDF may take before its renderer is restarted",
+    )
+    convert.add_argument(
+        "-v", "--verbose", action="store_true", help="List each converted file"
+    )
+    convert.set_defaults(func=run_convert)
+
+    watch = commands.add_parser(
+        "watch",
+        help="Keep a mirrored folder of processed HTML up to date.",
+        description="Render every HTML file under SOURCE into OUTPUT, then keep polling "
+        "and re-render only files whose content or options changed. A manifest of "
+        "content hashes in OUTPUT carries over between runs.",
+    )
+    watch.add_argument("source", help="Folder of HTML files to watch")
+    watch.add_argument("-o", "--output", required=True, help="Folder to mirror results into")
+    watch.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for re-rendering (default: 1, 0 for the CPU count)",
+    )
+    add_render_arguments(watch)
+    watch.add_argument(
+        "--interval", type=float, default=1.0, help="Seconds between scans (default: 1)"
+    )
+    watch.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help="Seconds a file must stay unmodified before it is rendered",
+    )
+    watch.add_argument(
+        "--manifest",
+        help=f"Manifest database (default: OUTPUT/{MANIFEST_NAME})",
+    )
+    watch.add_argument(
+        "--once", action="store_true", help="Sync once and exit instead of watching"
+    )
+    watch.add_argument(
+        "-v", "--verbose", action="store_true", help="Report every scan, not only changes"
+    )
+    watch.set_defaults(func=run_watch)
+
+    serve = commands.add_parser(
+        "serve",
+        help="Serve the pipeline over HTTP on localhost.",
+        description="POST HTML to /render (options as query parameters, e.g. "
+        "?bands=1&theme=light&format=pdf) to get processed HTML or PDF back. "
+        "GET /metrics returns Prometheus metrics.",
+    )
+    serve.add_argument(
+        "--host", default=DEFAULT_HOST, help=f"Loopback address (default: {DEFAULT_HOST})"
+    )
+    serve.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})"
+    )
+    serve.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count, 1 renders in a thread)",
+    )
+    serve.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help="Requests that may wait for a worker before others get 503",
+    )
+    serve.add_argument(
+        "--max-body-mb", type=int, default=256, help="Largest accepted document (default: 256)"
+    )
+    serve.add_argument(
+        "--pdf-engine",
+        choices=("auto", "webengine", "qt"),
+        default="auto",
+        help="PDF renderer for format=pdf",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds one render may take before the request fails",
+    )
+    serve.set_defaults(func=run_serve)
+
+    themes = commands.add_parser("themes", help="List the available wrapper themes.")
+    themes.add_argument(
+        "-v", "--verbose", action="store_true", help="Also print each theme's bundle digest"
+    )
+    themes.set_defaults(func=run_themes)
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,7 @@
 import os
-import json
-import tempfile
-import subprocess
-import webbrowser
 import platform
 from datetime import datetime
-from functools import partial
+from typing import TYPE_CHECKING, Optional
 
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -13,6 +9,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QTextEdit,
+    QPlainTextEdit,
     QPushButton,
     QLabel,
     QTabWidget,
@@ -21,39 +18,56 @@ from PySide6.QtWidgets import (
     QFrame,
     QLineEdit,
     QSpinBox,
-    QScrollArea,
+    QSplitter,
+    QListView,
     QDialog,
-    QSizePolicy,
     QApplication,
+    QProgressBar,
+    QFileDialog,
+    QComboBox,
 )
 from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QIcon, QPalette, QColor, QKeySequence, QShortcut
+from PySide6.QtGui import QAction, QIcon, QPalette, QColor, QKeySequence, QShortcut
 
+from papyrus.core import pipeline
+from papyrus.core.pipeline import DEFAULT_BAND_TEXT, DEFAULT_COLORS, RenderOptions
+from papyrus.core.themes import DEFAULT_THEME, ThemeError, registry as theme_registry
 from papyrus.utils.helpers import resource_path
 from papyrus.ui.editor import PagedTextEdit
 from papyrus.ui.highlighter import HTMLSyntaxHighlighter
+from papyrus.ui.stats import DocumentStats
+
+# Features that are not needed to show the first window are imported on use
+if TYPE_CHECKING:
+    from papyrus.core.history import HistoryStore
+    from papyrus.core.mapped import MappedDocument
+    from papyrus.core.render_cache import RenderCache
+    from papyrus.ui.history_model import HistoryListModel
+    from papyrus.ui.large_viewer import LargeFileViewer
+    from papyrus.ui.perf_hud import PerfHud
+    from papyrus.ui.preview import PreviewPane
 
 
 class HTMLConverterApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.colors = {
-            "dark_grey": "#1e1e1e",
-            "deep_orange": "#FF5A09",
-            "light_orange": "#EC7F37",
-            "orange_yellow": "#BE4F0C",
-            "bright_blue": "#2a9df4",
-            "darker_grey": "#141414",
-            "lighter_grey": "#2c2c2c",
-            "white": "#FFFFFF",
-            "text_bg": "#1e1e1e",
-            "text_fg": "#f0f0f0",
-        }
+        self.theme = DEFAULT_THEME
+        self.colors = dict(DEFAULT_COLORS)
+        self._stylesheets = {}
+        self.preview_pane: Optional["PreviewPane"] = None
+        self.perf_hud: Optional["PerfHud"] = None
+        self.large_viewer: Optional["LargeFileViewer"] = None
+        self._mapped_document: Optional["MappedDocument"] = None
+        # Folder of the file loaded into the editor; its relative assets resolve there
+        self._source_dir: Optional[str] = None
         self.init_ui()
+        self.setup_menus()
         self.setup_shortcuts()
-        self.history_entries: list[dict] = []
-        self.MAX_HISTORY = 50
-        self._init_history_storage()
+        self._history: Optional["HistoryStore"] = None
+        self._history_dialog: Optional[QDialog] = None
+        self._history_model: Optional["HistoryListModel"] = None
+        self._history_placeholder: Optional[QLabel] = None
+        self._render_cache: Optional["RenderCache"] = None
 
     def init_ui(self):
         self.setWindowTitle("")
@@ -61,40 +75,7 @@ class HTMLConverterApp(QMainWindow):
         self.setGeometry(100, 100, 1000, 800)
         self.center_on_screen()
         self.setMinimumSize(600, 500)
-        self.setStyleSheet(
-            f"""
-            QMainWindow {{ background-color: {self.colors["dark_grey"]}; }}
-            QWidget {{ background-color: {self.colors["dark_grey"]}; color: {self.colors["white"]}; }}
-            QTabWidget {{ background-color: {self.colors["darker_grey"]}; border: none; }}
-            QTabWidget::pane {{ border: none; background-color: {self.colors["darker_grey"]}; border-radius: 8px; }}
-            QTabBar::tab {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["white"]}; padding: 10px 20px; margin-right: 5px; border-top-left-radius: 8px; border-top-right-radius: 8px; font-size: 14px; font-weight: 500; }}
-            QTabBar::tab:selected {{ background-color: {self.colors["darker_grey"]}; color: {self.colors["light_orange"]}; }}
-            QTabBar::tab:hover {{ background-color: {self.colors["orange_yellow"]}; }}
-            QTextEdit {{ background-color: {self.colors["text_bg"]}; color: {self.colors["text_fg"]}; border: 1px solid {self.colors["deep_orange"]}; border-radius: 8px; padding: 10px; font-family: 'Menlo', 'Consolas', 'Monaco', 'Courier New', monospace; font-size: 12px; selection-background-color: {self.colors["orange_yellow"]}; selection-color: {self.colors["white"]}; }}
-            QTextEdit QScrollBar:vertical, QTextEdit QScrollBar:horizontal {{ background: {self.colors["darker_grey"]}; }}
-            QTextEdit * {{ background-color: {self.colors["text_bg"]} !important; margin: 0px !important; padding: 0px !important; }}
-            QPushButton {{ background-color: {self.colors["deep_orange"]}; color: {self.colors["white"]}; border: none; border-radius: 8px; padding: 12px 30px; font-size: 16px; font-weight: bold; min-width: 150px; }}
-            QPushButton:hover {{ background-color: {self.colors["light_orange"]}; }}
-            QPushButton:pressed {{ background-color: {self.colors["orange_yellow"]}; }}
-            QPushButton#secondary {{ background-color: {self.colors["lighter_grey"]}; }}
-            QPushButton#secondary:hover {{ background-color: {self.colors["orange_yellow"]}; }}
-            QCheckBox {{ color: {self.colors["white"]}; font-size: 12px; spacing: 10px; }}
-            QCheckBox::indicator {{ width: 18px; height: 18px; border: 2px solid #000000; border-radius: 4px; background-color: {self.colors["lighter_grey"]}; }}
-            QCheckBox::indicator:checked {{ background-color: {self.colors["deep_orange"]}; border-color: {self.colors["deep_orange"]}; }}
-            QLabel {{ color: {self.colors["white"]}; }}
-            QLabel#title {{ color: {self.colors["light_orange"]}; font-size: 44px; font-weight: bold; }}
-            QLabel#subtitle {{ color: {self.colors["white"]}; font-size: 16px; }}
-            QLabel#instruction {{ color: {self.colors["light_orange"]}; font-size: 14px; }}
-            QLabel#status {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["white"]}; padding: 8px 15px; border-radius: 4px; font-size: 11px; }}
-            QLabel#shortcuts {{ color: {self.colors["orange_yellow"]}; font-size: 10px; }}
-            QLineEdit {{ background-color: {self.colors["text_bg"]}; color: {self.colors["text_fg"]}; border: 1px solid {self.colors["deep_orange"]}; border-radius: 6px; padding: 6px 8px; selection-background-color: {self.colors["orange_yellow"]}; selection-color: {self.colors["white"]}; }}
-            QLineEdit:focus {{ border: 1px solid {self.colors["deep_orange"]}; }}
-            QDialog {{ background-color: {self.colors["dark_grey"]}; color: {self.colors["white"]}; }}
-            QScrollArea {{ background-color: {self.colors["dark_grey"]}; border: none; }}
-            QPushButton#historyItemButton {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["deep_orange"]}; border: none; border-radius: 10px; padding: 12px 16px; text-align: left; }}
-            QPushButton#historyItemButton:hover {{ background-color: {self.colors["orange_yellow"]}; color: {self.colors["white"]}; }}
-        """
-        )
+        self.setStyleSheet(self._app_stylesheet())
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
@@ -132,6 +113,107 @@ class HTMLConverterApp(QMainWindow):
         self.text_editor.setMinimumHeight(400)
         self.text_editor.set_show_page_breaks(False)
         self.text_editor.setFrameShape(QFrame.Shape.NoFrame)
+        self._apply_editor_palette()
+        self.highlighter = HTMLSyntaxHighlighter(self.text_editor.document())
+        self.text_editor.visibleBlocksChanged.connect(self.highlighter.set_visible_blocks)
+        self.text_editor.setPlaceholderText("Paste HTML here…")
+        self.text_editor.document().setDocumentMargin(0)
+        self.text_editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        # The preview pane is created the first time it is switched on
+        self.editor_splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.editor_splitter.setChildrenCollapsible(False)
+        self.editor_splitter.addWidget(self.text_editor)
+        input_layout.addWidget(self.editor_splitter)
+        self.text_editor.setFocus()
+        self.tab_widget.addTab(input_tab, "  HTML Input  ")
+        # Settings widgets are built after the first paint, or on first use
+        self.settings_tab = QWidget()
+        self._settings_built = False
+        self.tab_widget.addTab(self.settings_tab, "  Settings  ")
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+        self.safari_btn = QPushButton("🌐 Open in Browser")
+        self.safari_btn.clicked.connect(self.open_in_browser)
+        button_layout.addWidget(self.safari_btn)
+        self.export_pdf_btn = QPushButton("📄 Export PDF")
+        self.export_pdf_btn.setObjectName("secondary")
+        self.export_pdf_btn.clicked.connect(self.export_pdf)
+        button_layout.addWidget(self.export_pdf_btn)
+        self.char_counter = QLabel("0")
+        self.char_counter.setObjectName("status")
+        button_layout.addWidget(self.char_counter)
+        self.paste_progress = QProgressBar()
+        self.paste_progress.setRange(0, 0)  # busy indicator
+        self.paste_progress.setFixedWidth(120)
+        self.paste_progress.setTextVisible(False)
+        self.paste_progress.hide()
+        button_layout.addWidget(self.paste_progress)
+        self.history_btn = QPushButton("🕘 History")
+        self.history_btn.setObjectName("secondary")
+        self.history_btn.clicked.connect(self.show_history)
+        button_layout.addWidget(self.history_btn)
+        button_layout.addStretch()
+        main_layout.addLayout(button_layout)
+        self.status_label = QLabel("Ready to convert your HTML...")
+        self.status_label.setObjectName("status")
+        main_layout.addWidget(self.status_label)
+        self.document_stats = DocumentStats(self.text_editor.document(), parent=self)
+        self.document_stats.countsChanged.connect(self.update_char_count)
+        self.update_char_count()
+        self.text_editor.pasteCleaningChanged.connect(self._on_paste_cleaning_changed)
+        shortcuts_label = QLabel(
+            "Shortcuts: ⌘+Return = Open in Browser | ⌘+Shift+P = Performance HUD | ⌘+Q = Quit"
+        )
+        shortcuts_label.setObjectName("shortcuts")
+        shortcuts_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(shortcuts_label)
+
+    def _app_stylesheet(self) -> str:
+        """Qt stylesheet for the current palette, built once per theme."""
+        stylesheet = self._stylesheets.get(self.theme)
+        if stylesheet is None:
+            stylesheet = self._stylesheets[self.theme] = (
+                f"""
+                QMainWindow {{ background-color: {self.colors["dark_grey"]}; }}
+                QWidget {{ background-color: {self.colors["dark_grey"]}; color: {self.colors["white"]}; }}
+                QTabWidget {{ background-color: {self.colors["darker_grey"]}; border: none; }}
+                QTabWidget::pane {{ border: none; background-color: {self.colors["darker_grey"]}; border-radius: 8px; }}
+                QTabBar::tab {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["white"]}; padding: 10px 20px; margin-right: 5px; border-top-left-radius: 8px; border-top-right-radius: 8px; font-size: 14px; font-weight: 500; }}
+                QTabBar::tab:selected {{ background-color: {self.colors["darker_grey"]}; color: {self.colors["light_orange"]}; }}
+                QTabBar::tab:hover {{ background-color: {self.colors["orange_yellow"]}; }}
+                QTextEdit, QPlainTextEdit {{ background-color: {self.colors["text_bg"]}; color: {self.colors["text_fg"]}; border: 1px solid {self.colors["deep_orange"]}; border-radius: 8px; padding: 10px; font-family: 'Menlo', 'Consolas', 'Monaco', 'Courier New', monospace; font-size: 12px; selection-background-color: {self.colors["orange_yellow"]}; selection-color: {self.colors["white"]}; }}
+                QTextEdit QScrollBar:vertical, QTextEdit QScrollBar:horizontal, QPlainTextEdit QScrollBar:vertical, QPlainTextEdit QScrollBar:horizontal {{ background: {self.colors["darker_grey"]}; }}
+                QTextEdit *, QPlainTextEdit * {{ background-color: {self.colors["text_bg"]} !important; margin: 0px !important; padding: 0px !important; }}
+                QPushButton {{ background-color: {self.colors["deep_orange"]}; color: {self.colors["white"]}; border: none; border-radius: 8px; padding: 12px 30px; font-size: 16px; font-weight: bold; min-width: 150px; }}
+                QPushButton:hover {{ background-color: {self.colors["light_orange"]}; }}
+                QPushButton:pressed {{ background-color: {self.colors["orange_yellow"]}; }}
+                QPushButton#secondary {{ background-color: {self.colors["lighter_grey"]}; }}
+                QPushButton#secondary:hover {{ background-color: {self.colors["orange_yellow"]}; }}
+                QCheckBox {{ color: {self.colors["white"]}; font-size: 12px; spacing: 10px; }}
+                QCheckBox::indicator {{ width: 18px; height: 18px; border: 2px solid #000000; border-radius: 4px; background-color: {self.colors["lighter_grey"]}; }}
+                QCheckBox::indicator:checked {{ background-color: {self.colors["deep_orange"]}; border-color: {self.colors["deep_orange"]}; }}
+                QLabel {{ color: {self.colors["white"]}; }}
+                QLabel#title {{ color: {self.colors["light_orange"]}; font-size: 44px; font-weight: bold; }}
+                QLabel#subtitle {{ color: {self.colors["white"]}; font-size: 16px; }}
+                QLabel#instruction {{ color: {self.colors["light_orange"]}; font-size: 14px; }}
+                QLabel#status {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["white"]}; padding: 8px 15px; border-radius: 4px; font-size: 11px; }}
+                QLabel#shortcuts {{ color: {self.colors["orange_yellow"]}; font-size: 10px; }}
+                QLineEdit {{ background-color: {self.colors["text_bg"]}; color: {self.colors["text_fg"]}; border: 1px solid {self.colors["deep_orange"]}; border-radius: 6px; padding: 6px 8px; selection-background-color: {self.colors["orange_yellow"]}; selection-color: {self.colors["white"]}; }}
+                QLineEdit:focus {{ border: 1px solid {self.colors["deep_orange"]}; }}
+                QDialog {{ background-color: {self.colors["dark_grey"]}; color: {self.colors["white"]}; }}
+                QListView#historyList {{ background-color: {self.colors["dark_grey"]}; border: none; padding: 10px; }}
+                QListView#historyList::item {{ background-color: {self.colors["lighter_grey"]}; color: {self.colors["deep_orange"]}; border: none; border-radius: 10px; padding: 12px 16px; margin: 6px; }}
+                QProgressBar {{ background-color: {self.colors["lighter_grey"]}; border: none; border-radius: 4px; max-height: 8px; }}
+                QProgressBar::chunk {{ background-color: {self.colors["deep_orange"]}; border-radius: 4px; }}
+                QFrame#perfHud {{ background-color: {self.colors["darker_grey"]}; border: 1px solid {self.colors["deep_orange"]}; border-radius: 8px; }}
+                QFrame#perfHud QTableWidget {{ background-color: {self.colors["text_bg"]}; color: {self.colors["text_fg"]}; border: none; font-size: 11px; }}
+                QListView#historyList::item:hover, QListView#historyList::item:selected {{ background-color: {self.colors["orange_yellow"]}; color: {self.colors["white"]}; }}
+            """
+            )
+        return stylesheet
+
+    def _apply_editor_palette(self) -> None:
         palette = self.text_editor.palette()
         bg_color = QColor(self.colors["text_bg"])
         palette.setColor(QPalette.ColorRole.Base, bg_color)
@@ -148,17 +230,56 @@ class HTMLConverterApp(QMainWindow):
         self.text_editor.setPalette(palette)
         self.text_editor.viewport().setPalette(palette)
         self.text_editor.viewport().setAutoFillBackground(True)
-        self.highlighter = HTMLSyntaxHighlighter(self.text_editor.document())
-        self.text_editor.setPlaceholderText("Paste HTML here…")
-        self.text_editor.document().setDocumentMargin(0)
-        self.text_editor.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
-        input_layout.addWidget(self.text_editor)
-        self.text_editor.setFocus()
-        self.tab_widget.addTab(input_tab, "  HTML Input  ")
-        settings_tab = QWidget()
-        settings_layout = QVBoxLayout(settings_tab)
+        if self.large_viewer is not None:
+            self.large_viewer.setPalette(palette)
+            self.large_viewer.viewport().setPalette(palette)
+
+    def apply_theme(self, theme_id: str) -> None:
+        """Switch the window, editor, highlighting and rendered output to a theme.
+
+        Args:
+            theme_id: Id from papyrus.core.themes
+        """
+        try:
+            theme = theme_registry().get(theme_id)
+        except ThemeError as e:
+            self.status_label.setText(f"❌ {e}")
+            return
+        self.theme = theme.id
+        self.colors = dict(theme.colors)
+        self.setStyleSheet(self._app_stylesheet())
+        self._apply_editor_palette()
+        self.highlighter.set_colors(theme.tokens)
+        if self.large_viewer is not None:
+            self.large_viewer.set_colors(theme.tokens)
+        if self.preview_pane is not None and self.preview_pane.isVisible():
+            self.preview_pane.schedule_refresh()
+
+    def _on_tab_changed(self, index: int) -> None:
+        if self.tab_widget.widget(index) is self.settings_tab:
+            self.ensure_settings_tab()
+
+    def ensure_settings_tab(self) -> None:
+        """Build the Settings tab if it has not been built yet."""
+        if self._settings_built:
+            return
+        self._settings_built = True
+        settings_layout = QVBoxLayout(self.settings_tab)
         settings_layout.setContentsMargins(20, 20, 20, 20)
         settings_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        theme_row = QHBoxLayout()
+        theme_row.addWidget(QLabel("Theme:"))
+        self.theme_combo = QComboBox()
+        registry = theme_registry()
+        for theme_id in registry.ids():
+            self.theme_combo.addItem(registry.get(theme_id).name, theme_id)
+        self.theme_combo.setCurrentIndex(max(0, self.theme_combo.findData(self.theme)))
+        self.theme_combo.currentIndexChanged.connect(
+            lambda index: self.apply_theme(self.theme_combo.itemData(index))
+        )
+        theme_row.addWidget(self.theme_combo)
+        theme_row.addStretch()
+        settings_layout.addLayout(theme_row)
         self.add_wrapper_checkbox = QCheckBox(
             "Add styling wrapper (adds beautiful dark theme if HTML lacks styles)"
         )
@@ -176,9 +297,14 @@ class HTMLConverterApp(QMainWindow):
         )
         self.enable_pdf_copy_checkbox.setChecked(False)
         settings_layout.addWidget(self.enable_pdf_copy_checkbox)
+        self.inline_assets_checkbox = QCheckBox(
+            "Inline local images, stylesheets and fonts of opened files"
+        )
+        self.inline_assets_checkbox.setChecked(True)
+        settings_layout.addWidget(self.inline_assets_checkbox)
         band_text_row = QHBoxLayout()
         band_text_label = QLabel("Band text:")
-        self.print_band_text = QLineEdit("Papyrus HTML Converter")
+        self.print_band_text = QLineEdit(DEFAULT_BAND_TEXT)
         self.print_band_text.setPlaceholderText(
             "Text to repeat across the top/bottom of each printed page"
         )
@@ -197,30 +323,32 @@ class HTMLConverterApp(QMainWindow):
         self.bottom_offset_mm.setValue(12)
         offset_row.addWidget(self.bottom_offset_mm)
         settings_layout.addLayout(offset_row)
+        prettify_row = QHBoxLayout()
+        prettify_row.addWidget(QLabel("Skip pretty-printing pastes above (KB):"))
+        self.prettify_limit_kb = QSpinBox()
+        self.prettify_limit_kb.setRange(0, 100_000)
+        self.prettify_limit_kb.setValue(self.text_editor.prettify_limit // 1000)
+        self.prettify_limit_kb.valueChanged.connect(self._set_prettify_limit)
+        prettify_row.addWidget(self.prettify_limit_kb)
+        prettify_row.addStretch()
+        settings_layout.addLayout(prettify_row)
+        self.live_preview_checkbox = QCheckBox(
+            "Show live preview beside the editor"
+        )
+        self.live_preview_checkbox.setChecked(False)
+        self.live_preview_checkbox.toggled.connect(self._set_live_preview)
+        settings_layout.addWidget(self.live_preview_checkbox)
         settings_layout.addStretch()
-        self.tab_widget.addTab(settings_tab, "  Settings  ")
-        button_layout = QHBoxLayout()
-        button_layout.setSpacing(10)
-        self.safari_btn = QPushButton("🌐 Open in Browser")
-        self.safari_btn.clicked.connect(self.open_in_browser)
-        button_layout.addWidget(self.safari_btn)
-        self.char_counter = QLabel("0")
-        self.char_counter.setObjectName("status")
-        button_layout.addWidget(self.char_counter)
-        self.history_btn = QPushButton("🕘 History")
-        self.history_btn.setObjectName("secondary")
-        self.history_btn.clicked.connect(self.show_history)
-        button_layout.addWidget(self.history_btn)
-        button_layout.addStretch()
-        main_layout.addLayout(button_layout)
-        self.status_label = QLabel("Ready to convert your HTML...")
-        self.status_label.setObjectName("status")
-        main_layout.addWidget(self.status_label)
-        self.text_editor.textChanged.connect(self.update_char_count)
-        shortcuts_label = QLabel("Shortcuts: ⌘+Return = Open in Browser | ⌘+Q = Quit")
-        shortcuts_label.setObjectName("shortcuts")
-        shortcuts_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        main_layout.addWidget(shortcuts_label)
+
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        super().showEvent(event)
+        if not self._settings_built:
+            QTimer.singleShot(0, self.ensure_settings_tab)
+
+    def resizeEvent(self, event):  # pylint: disable=invalid-name
+        super().resizeEvent(event)
+        if self.perf_hud is not None:
+            self.perf_hud.reposition()
 
     def center_on_screen(self):
         screen = QApplication.primaryScreen()
@@ -229,7 +357,29 @@ class HTMLConverterApp(QMainWindow):
         frame_geometry.moveCenter(geometry.center())
         self.move(frame_geometry.topLeft())
 
-    def _init_history_storage(self) -> None:
+    @property
+    def history(self) -> "HistoryStore":
+        """History database, opened on first use so startup does not wait on it."""
+        if self._history is None:
+            self._history = self._init_history_storage()
+        return self._history
+
+    @property
+    def render_cache(self) -> "RenderCache":
+        """Rendered preview files, reused while the content and options are unchanged."""
+        if self._render_cache is None:
+            from papyrus.core.render_cache import RenderCache  # pylint: disable=import-outside-toplevel
+
+            self._render_cache = RenderCache()
+        return self._render_cache
+
+    def _init_history_storage(self) -> "HistoryStore":
+        # pylint: disable=import-outside-toplevel
+        import sqlite3
+        import tempfile
+
+        from papyrus.core.history import HistoryStore
+
         try:
             base_dir = os.path.join(
                 os.path.expanduser("~"),
@@ -237,241 +387,174 @@ class HTMLConverterApp(QMainWindow):
                 "HTMLConverter",
             )
             os.makedirs(base_dir, exist_ok=True)
-            self.history_file = os.path.join(base_dir, "history.json")
-        except Exception:
-            self.history_file = os.path.join(
+            store = HistoryStore(os.path.join(base_dir, "history.sqlite3"))
+            legacy_file = os.path.join(base_dir, "history.json")
+        except (OSError, sqlite3.Error):
+            store = HistoryStore(
+                os.path.join(tempfile.gettempdir(), "html_converter_history.sqlite3")
+            )
+            legacy_file = os.path.join(
                 tempfile.gettempdir(), "html_converter_history.json"
             )
-        self.load_history()
+        store.import_legacy_json(legacy_file)
+        return store
+
+    def setup_menus(self):
+        file_menu = self.menuBar().addMenu("File")
+        open_action = QAction("Open\u2026", self)
+        open_action.setShortcut(QKeySequence.StandardKey.Open)
+        open_action.triggered.connect(self.open_file_dialog)
+        file_menu.addAction(open_action)
+        self.close_file_action = QAction("Close Large File", self)
+        self.close_file_action.setEnabled(False)
+        self.close_file_action.triggered.connect(self.close_large_file)
+        file_menu.addAction(self.close_file_action)
+
+    def open_file_dialog(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open HTML",
+            os.path.expanduser("~"),
+            "HTML Files (*.html *.htm);;All Files (*)",
+        )
+        if path:
+            self.open_file(path)
+
+    def open_file(self, path: str) -> None:
+        """Load a file into the editor, or map it into the viewer if it is large.
+
+        Args:
+            path: HTML file to open
+        """
+        from papyrus.core.mapped import open_document  # pylint: disable=import-outside-toplevel
 
-    def load_history(self) -> None:
-        try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    cleaned = [
-                        item
-                        for item in data[: self.MAX_HISTORY]
-                        if isinstance(item, dict)
-                        and "title" in item
-                        and "content" in item
-                    ]
-                    self.history_entries = cleaned
-        except Exception:
-            self.history_entries = []
-
-    def save_history(self) -> None:
         try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(
-                    self.history_entries[: self.MAX_HISTORY],
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
-        except Exception:
-            pass
+            text, document = open_document(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to open file: {str(e)}")
+            self.status_label.setText("\u274c Open failed")
+            return
+        if document is not None:
+            self._show_large_file(document)
+            return
+        self.close_large_file()
+        self._source_dir = os.path.dirname(os.path.abspath(path))
+        if not self.title_input.text().strip():
+            self.title_input.setText(os.path.splitext(os.path.basename(path))[0])
+        self.text_editor.setPlainText(text)
+        self.status_label.setText(f"\u2705 Opened {path}")
+
+    def _show_large_file(self, document: "MappedDocument") -> None:
+        if self.large_viewer is None:
+            from papyrus.ui.large_viewer import LargeFileViewer  # pylint: disable=import-outside-toplevel
+
+            self.large_viewer = LargeFileViewer()
+            self.large_viewer.set_colors(self.highlighter.colors)
+            self._apply_editor_palette()
+            self.editor_splitter.insertWidget(0, self.large_viewer)
+        previous = self._mapped_document
+        self._mapped_document = document
+        self.large_viewer.set_document(document)
+        if previous is not None:
+            previous.close()
+        self.text_editor.hide()
+        self.large_viewer.show()
+        self.large_viewer.setFocus()
+        self.close_file_action.setEnabled(True)
+        self.char_counter.setText(
+            f"{document.size / (1024 * 1024):.1f} MB \u00b7 {document.line_count} lines \u00b7 read-only"
+        )
+        self.status_label.setText(
+            f"\U0001f4c4 Viewing {document.path} read-only; export and browser preview stream from disk"
+        )
+
+    def close_large_file(self) -> None:
+        """Leave the read-only viewer and return to the editor."""
+        document = self._mapped_document
+        if document is None:
+            return
+        self._mapped_document = None
+        self.large_viewer.set_document(None)
+        self.large_viewer.hide()
+        document.close()
+        self.text_editor.show()
+        self.text_editor.setFocus()
+        self.close_file_action.setEnabled(False)
+        self.update_char_count()
+        self.status_label.setText("Ready to convert your HTML...")
 
     def setup_shortcuts(self):
         safari_shortcut = QShortcut(QKeySequence("Ctrl+Return"), self)
         safari_shortcut.activated.connect(self.open_in_browser)
         safari_shortcut_mac = QShortcut(QKeySequence("Meta+Return"), self)
         safari_shortcut_mac.activated.connect(self.open_in_browser)
+        perf_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        perf_shortcut.activated.connect(self.toggle_perf_hud)
+        perf_shortcut_mac = QShortcut(QKeySequence("Meta+Shift+P"), self)
+        perf_shortcut_mac.activated.connect(self.toggle_perf_hud)
+
+    def toggle_perf_hud(self) -> None:
+        """Show or hide the timing overlay; showing it starts recording."""
+        if self.perf_hud is None:
+            from papyrus.ui.perf_hud import PerfHud  # pylint: disable=import-outside-toplevel
+
+            self.perf_hud = PerfHud(self.centralWidget())
+        self.perf_hud.toggle()
 
     def get_styled_wrapper(self, content):
+        self.ensure_settings_tab()
         if not self.add_wrapper_checkbox.isChecked():
             return content
-        if "<html" in content.lower() and "<body" in content.lower():
-            return content
-        wrapper = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Converted Document - {datetime.now().strftime("%B %d, %Y %I:%M %p")}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, {self.colors["dark_grey"]} 0%, {self.colors["darker_grey"]} 100%); color: {self.colors["white"]}; min-height: 100vh; line-height: 1.8; padding: 60px 40px; }}
-        .container {{ max-width: 900px; margin: 0 auto; background: rgba(57, 57, 57, 0.4); backdrop-filter: blur(20px); border-radius: 20px; padding: 40px; border: 1px solid rgba(255, 90, 9, 0.2); box-shadow: 0 20px 40px rgba(0, 0, 0, 0.4); }}
-        h1, h2, h3, h4, h5, h6 {{ color: {self.colors["light_orange"]}; margin-bottom: 20px; margin-top: 30px; }}
-        h1:first-child {{ margin-top: 0; }}
-        a {{ color: {self.colors["deep_orange"]}; text-decoration: none; transition: color 0.3s ease; }}
-        a:hover {{ color: {self.colors["light_orange"]}; text-decoration: underline; }}
-        code {{ background: rgba(255, 90, 9, 0.1); color: {self.colors["light_orange"]}; padding: 2px 6px; border-radius: 4px; font-family: 'SF Mono', monospace; font-variant-ligatures: none; -webkit-user-select: text; user-select: text; }}
-        pre {{ background: {self.colors["darker_grey"]}; padding: 20px; border-radius: 10px; overflow-x: auto; margin: 20px 0; border: 1px solid rgba(255, 90, 9, 0.2); -webkit-user-select: text; user-select: text; white-space: pre; tab-size: 4; -moz-tab-size: 4; }}
-        blockquote {{ border-left: 4px solid {self.colors["deep_orange"]}; padding-left: 20px; margin: 20px 0; font-style: italic; color: rgba(255, 255, 255, 0.8); }}
-        hr {{ border: none; height: 1px; background: linear-gradient(90deg, transparent, {self.colors["orange_yellow"]}, transparent); margin: 30px 0; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid rgba(255, 90, 9, 0.2); }}
-        th {{ background: rgba(255, 90, 9, 0.1); color: {self.colors["light_orange"]}; font-weight: 600; }}
-        @media print {{ body {{ background: white; color: black; padding: 20px; }} .container {{ background: white; box-shadow: none; border: none; padding: 0; }} h1, h2, h3, h4, h5, h6 {{ color: {self.colors["dark_grey"]}; }} a {{ color: {self.colors["orange_yellow"]}; }} code {{ background: #f0f0f0; }} pre {{ background: #f5f5f5; border: 1px solid #ddd; }} }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        {content}
-    </div>
-</body>
-</html>"""
-        return wrapper
+        return pipeline.get_styled_wrapper(content, theme=self.theme)
 
     def build_copyable_code_view(self, raw_html: str) -> str:
-        """Return an escaped <pre><code> block for copyable HTML source.
-        Avoid importing stdlib html due to module name conflict with this file.
-        """
-
-        def _escape(s: str) -> str:
-            # Order matters: ampersand first
-            s = s.replace("&", "&amp;")
-            s = s.replace("<", "&lt;").replace(">", "&gt;")
-            s = s.replace('"', "&quot;")
-            return s
-
-        escaped = _escape(raw_html)
-        return (
-            '<section class="code-view">\n'
-            '  <h2 style="margin-bottom:12px;color:#ffa86b;font-weight:600;">HTML Source</h2>\n'
-            "  <pre><code>" + escaped + "</code></pre>\n"
-            "</section>"
-        )
+        """Return an escaped <pre><code> block for copyable HTML source."""
+        return pipeline.build_copyable_code_view(raw_html)
 
     def sanitize_for_pdf_copy(self, html: str) -> str:
-        """Minimal sanitization so code copies cleanly from macOS Preview PDFs.
-        - Normalize line endings
-        - Remove zero-width, soft hyphen, BOM, and directional marks
-        - Replace user-select:none with selectable text
-        - Inject style to enforce selectable, monospace code and sane wrapping
-        """
-        # Normalize line endings
-        s = html.replace("\r\n", "\n").replace("\r", "\n")
-        # Replace NBSP and narrow NBSP with regular spaces
-        s = s.replace("\xa0", " ").replace("\u202f", " ")
-        # Remove BOM, zero-width, directional marks, and soft hyphens
-        for ch in (
-            "\ufeff",  # BOM
-            "\u200b",
-            "\u200c",
-            "\u200d",  # zero width
-            "\u2060",  # word joiner
-            "\u200e",
-            "\u200f",  # LRM/RLM
-            "\u202a",
-            "\u202b",
-            "\u202c",
-            "\u202d",
-            "\u202e",  # bidi embedding/override
-            "\u2066",
-            "\u2067",
-            "\u2068",
-            "\u2069",  # bidi isolates
-            "\u00ad",  # soft hyphen
-        ):
-            s = s.replace(ch, "")
-        # Make non-selectable rules selectable
-        for token in (
-            "user-select: none",
-            "user-select:none",
-            "-webkit-user-select: none",
-            "-webkit-user-select:none",
-        ):
-            s = s.replace(token, "user-select: text")
-        for token in (
-            "pointer-events: none",
-            "pointer-events:none",
-        ):
-            s = s.replace(token, "pointer-events: auto")
-        # Inject a small style block to enforce selection and monospace code
-        lower = s.lower()
-        style_block = """
-<style id="pdf-copy-sanitize">
-  body, pre, code, table, td, th, p, li, div { -webkit-user-select: text !important; user-select: text !important; }
-  pre, code { font-family: SFMono-Regular, Menlo, Consolas, 'Liberation Mono', monospace; font-variant-ligatures: none; tab-size: 4; -moz-tab-size: 4; }
-  pre { white-space: pre; }
-  @media print { pre { white-space: pre-wrap; word-break: normal; overflow-wrap: anywhere; } }
-</style>
-"""
-        if "</head>" in lower and "pdf-copy-sanitize" not in lower:
-            idx = lower.rfind("</head>")
-            s = s[:idx] + style_block + s[idx:]
-        elif "pdf-copy-sanitize" not in lower and (
-            "<html" in lower or "<body" in lower
-        ):
-            s = style_block + s
-        return s
+        """Minimal sanitization so code copies cleanly from macOS Preview PDFs."""
+        return pipeline.sanitize_for_pdf_copy(html)
 
     def inject_print_bands(
         self, html: str, band_text: str, top_mm: int = 12, bottom_mm: int = 12
     ) -> str:
-        band_text = (band_text or "").strip()
-        if not band_text:
-            return html
-        css = f"""
-<style>
-  .print-header, .print-footer {{ display: block !important; position: fixed; left: 0; right: 0; height: 8mm; padding: 2mm 6mm; background: transparent; z-index: 9999; font-size: 9pt; color: #2a6792; text-align: center; line-height: 1; white-space: nowrap; overflow: hidden; text-overflow: clip; }}
-  .print-header {{ top: {top_mm}mm; }}
-  .print-footer {{ bottom: {bottom_mm}mm; }}
-  @media print {{ header, footer {{ display: none !important; }} body {{ padding-top: max(15mm, {top_mm + 3}mm); padding-bottom: max(15mm, {bottom_mm + 3}mm); }} }}
-</style>
-"""
-        repeated = (band_text + " ") * 5
-        bands = f"""
-<div class="print-header" aria-hidden="true">{repeated}</div>
-<div class="print-footer" aria-hidden="true">{repeated}</div>
-"""
-        lower = html.lower()
-        if "</head>" in lower:
-            idx = lower.rfind("</head>")
-            html = html[:idx] + css + html[idx:]
-        else:
-            html = css + html
-        lower = html.lower()
-        if "<body" in lower:
-            body_start = lower.find("<body")
-            insert_after = lower.find(">", body_start) + 1
-            html = html[:insert_after] + bands + html[insert_after:]
-            return html
-        if "</html>" in lower:
-            idx = lower.rfind("</html>")
-            html = html[:idx] + bands + html[idx:]
-        else:
-            html += bands
-        return html
+        return pipeline.inject_print_bands(html, band_text, top_mm, bottom_mm)
+
+    def _render_options(self) -> RenderOptions:
+        self.ensure_settings_tab()
+        return RenderOptions(
+            add_wrapper=self.add_wrapper_checkbox.isChecked(),
+            pdf_copy=self.enable_pdf_copy_checkbox.isChecked(),
+            print_bands=self.add_print_bands_checkbox.isChecked(),
+            band_text=self.print_band_text.text(),
+            top_mm=self.top_offset_mm.value(),
+            bottom_mm=self.bottom_offset_mm.value(),
+            theme=self.theme,
+            assets="inline" if self.inline_assets_checkbox.isChecked() else "",
+        )
 
     def open_in_browser(self):
+        if self._mapped_document is not None:
+            self._open_large_file_in_browser()
+            return
         html_content = self.text_editor.toPlainText()
         if not html_content.strip():
             QMessageBox.warning(
                 self, "No Content", "Please paste some HTML code first!"
             )
             return
+        import subprocess  # pylint: disable=import-outside-toplevel
+        import webbrowser  # pylint: disable=import-outside-toplevel
+
         try:
-            processed_html = self.sanitize_for_pdf_copy(html_content)
-            # When enabled, render the sanitized content as escaped code for PDF copyability
-            if (
-                getattr(self, "enable_pdf_copy_checkbox", None)
-                and self.enable_pdf_copy_checkbox.isChecked()
-            ):
-                processed_html = self.build_copyable_code_view(processed_html)
-            final_html = self.get_styled_wrapper(processed_html)
-            if self.add_print_bands_checkbox.isChecked():
-                final_html = self.inject_print_bands(
-                    final_html,
-                    self.print_band_text.text(),
-                    self.top_offset_mm.value(),
-                    self.bottom_offset_mm.value(),
-                )
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".html", delete=False
-            ) as f:
-                f.write(final_html)
-                temp_path = f.name
+            temp_path, _cached = self.render_cache.get_or_render(
+                html_content, self._render_options(), base_dir=self._source_dir
+            )
             webbrowser.open(f"file://{temp_path}", new=2)
             self._save_history_if_titled(html_content)
             self.status_label.setText(
                 f"✅ Opened in browser | File: {temp_path} | Press ⌘+P to print"
             )
-            self.save_history()
         except subprocess.CalledProcessError as e:
             QMessageBox.critical(self, "Error", f"Failed to open browser: {str(e)}")
             self.status_label.setText("❌ Browser open failed")
@@ -479,7 +562,65 @@ class HTMLConverterApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"Unexpected error: {str(e)}")
             self.status_label.setText("❌ Error occurred")
 
+    def _open_large_file_in_browser(self) -> None:
+        import webbrowser  # pylint: disable=import-outside-toplevel
+
+        document = self._mapped_document
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            temp_path, _cached = self.render_cache.get_or_render_chunks(
+                document.identity, document.chunks, self._render_options()
+            )
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to render file: {str(e)}")
+            self.status_label.setText("\u274c Render failed")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        webbrowser.open(f"file://{temp_path}", new=2)
+        self.status_label.setText(f"\u2705 Opened in browser | File: {temp_path}")
+
+    def export_pdf(self) -> None:
+        if self._mapped_document is not None:
+            # The PDF engines lay out the whole document; it is decoded here
+            # but never loaded into the editor
+            html_content = self._mapped_document.text()
+            base_dir = os.path.dirname(os.path.abspath(self._mapped_document.path))
+        else:
+            html_content = self.text_editor.toPlainText()
+            base_dir = self._source_dir
+        if not html_content.strip():
+            QMessageBox.warning(
+                self, "No Content", "Please paste some HTML code first!"
+            )
+            return
+        title = (self.title_input.text() or "").strip() or "Papyrus"
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export PDF",
+            os.path.join(os.path.expanduser("~/Desktop"), f"{title}.pdf"),
+            "PDF Files (*.pdf)",
+        )
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            from papyrus.core import pdf  # pylint: disable=import-outside-toplevel
+
+            pdf.export_pdf(html_content, path, self._render_options(), base_dir=base_dir)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export PDF: {str(e)}")
+            self.status_label.setText("❌ PDF export failed")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self._save_history_if_titled(html_content)
+        self.status_label.setText(f"✅ Exported PDF | File: {path}")
+
     def save_title_to_history(self) -> None:
+        if self._mapped_document is not None:
+            self.status_label.setText("Large files are not saved to History")
+            return
         html_content = self.text_editor.toPlainText()
         if not html_content.strip():
             self.status_label.setText("Nothing to save: editor is empty")
@@ -493,24 +634,16 @@ class HTMLConverterApp(QMainWindow):
 
     def _save_history_if_titled(self, html_content: str) -> bool:
         title = (self.title_input.text() or "").strip()
-        if not title:
+        # Large files stay out of the history database
+        if not title or self._mapped_document is not None:
             return False
         ts = datetime.now()
         timestamp_display = f"{ts.strftime('%I:%M:%S %p')} – {ts.strftime('%B %d, %Y')}"
-        for e in self.history_entries:
-            if e["title"] == title and e.get("content", "") == html_content:
-                return False
-        self.history_entries.insert(
-            0,
-            {
-                "title": title,
-                "timestamp": timestamp_display,
-                "content": html_content,
-            },
-        )
-        if len(self.history_entries) > self.MAX_HISTORY:
-            self.history_entries = self.history_entries[: self.MAX_HISTORY]
-        self.save_history()
+        entry_id = self.history.add(title, html_content, timestamp_display)
+        if entry_id is None:
+            return False
+        if self._history_model is not None:
+            self._history_model.entry_added(entry_id)
         self.title_input.clear()
         return True
 
@@ -524,8 +657,8 @@ class HTMLConverterApp(QMainWindow):
         dlg.exec()
 
     def show_history(self):
-        if getattr(self, "_history_dialog", None):
-            self._populate_history_list()
+        if self._history_dialog is not None:
+            self._history_model.reload()
             return
         dlg = QDialog(self)
         dlg.setWindowTitle("History")
@@ -546,22 +679,61 @@ class HTMLConverterApp(QMainWindow):
         header_layout.addWidget(clear_btn)
         outer.addLayout(header_layout)
 
-        scroll = QScrollArea(dlg)
-        scroll.setWidgetResizable(True)
-        outer.addWidget(scroll)
-        container = QWidget()
-        scroll.setWidget(container)
-        v = QVBoxLayout(container)
-        v.setContentsMargins(16, 16, 16, 16)
-        v.setSpacing(12)
-        self._history_list_layout = v
-        self._populate_history_list()
+        # Search-as-you-type, debounced so each pause runs one query
+        search_input = QLineEdit()
+        search_input.setPlaceholderText("Search titles and HTML…")
+        search_input.setClearButtonEnabled(True)
+        search_timer = QTimer(dlg)
+        search_timer.setSingleShot(True)
+        search_timer.setInterval(150)
+        search_input.textChanged.connect(search_timer.start)
+        search_timer.timeout.connect(
+            lambda: self._search_history(search_input.text())
+        )
+        outer.addWidget(search_input)
+
+        # Rows are paged in from the database as the list scrolls
+        from papyrus.ui.history_model import ENTRY_ID_ROLE, HistoryListModel  # pylint: disable=import-outside-toplevel
+
+        self._history_model = HistoryListModel(self.history, parent=dlg)
+        self._history_placeholder = QLabel()
+        outer.addWidget(self._history_placeholder)
+        view = QListView(dlg)
+        view.setObjectName("historyList")
+        view.setUniformItemSizes(True)
+        view.setModel(self._history_model)
+        view.clicked.connect(
+            lambda index: self._open_history_details(index.data(ENTRY_ID_ROLE))
+        )
+        outer.addWidget(view)
+        for signal in (
+            self._history_model.modelReset,
+            self._history_model.rowsInserted,
+            self._history_model.rowsRemoved,
+        ):
+            signal.connect(self._update_history_placeholder)
+        self._history_model.reload()
         dlg.exec()
         self._history_dialog = None
-        self._history_list_layout = None
+        self._history_model = None
+        self._history_placeholder = None
+
+    def _update_history_placeholder(self, *_args) -> None:
+        model = self._history_model
+        if model is None:
+            return
+        if model.rowCount():
+            self._history_placeholder.hide()
+            return
+        self._history_placeholder.setText(
+            "No matching items."
+            if model.query
+            else "No saved items yet. Add a title and open in Safari to save."
+        )
+        self._history_placeholder.show()
 
     def clear_history(self):
-        if not self.history_entries:
+        if not self.history.count():
             return
         reply = QMessageBox.question(
             self._history_dialog,
@@ -570,42 +742,61 @@ class HTMLConverterApp(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
-            self.history_entries = []
-            self.save_history()
-            self._populate_history_list()
+            if self._history_model is not None:
+                self._history_model.clear()
+            else:
+                self.history.clear()
 
-    def _populate_history_list(self):
-        layout = getattr(self, "_history_list_layout", None)
-        if layout is None:
-            return
-        while layout.count():
-            item = layout.takeAt(0)
-            w = item.widget()
-            if w is not None:
-                w.deleteLater()
-        if not self.history_entries:
-            layout.addWidget(
-                QLabel("No saved items yet. Add a title and open in Safari to save.")
-            )
-            return
-        for idx, entry in enumerate(self.history_entries):
-            title = entry["title"]
-            ts = entry.get("timestamp", "")
-            btn = QPushButton(f"{idx + 1}. {title} – {ts}")
-            btn.setObjectName("historyItemButton")
-            btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
-            btn.clicked.connect(partial(self._open_history_details, idx))
-            layout.addWidget(btn)
-
-    def update_char_count(self) -> None:
-        text = self.text_editor.toPlainText()
-        char_count = len(text)
-        self.char_counter.setText(f"{char_count}")
-
-    def _open_history_details(self, index: int) -> None:
-        if index < 0 or index >= len(self.history_entries):
+    def _search_history(self, query: str) -> None:
+        if self._history_model is not None:
+            self._history_model.set_query(query)
+
+    def _set_prettify_limit(self, kilobytes: int) -> None:
+        self.text_editor.prettify_limit = kilobytes * 1000
+
+    def _set_live_preview(self, enabled: bool) -> None:
+        if enabled and self.preview_pane is None:
+            from papyrus.ui.preview import PreviewPane  # pylint: disable=import-outside-toplevel
+
+            self.preview_pane = PreviewPane(self._render_preview, parent=self)
+            self.editor_splitter.addWidget(self.preview_pane)
+            refresh = self.preview_pane.schedule_refresh
+            self.text_editor.document().contentsChanged.connect(refresh)
+            for checkbox in (
+                self.add_wrapper_checkbox,
+                self.add_print_bands_checkbox,
+                self.enable_pdf_copy_checkbox,
+                self.inline_assets_checkbox,
+            ):
+                checkbox.toggled.connect(refresh)
+            self.print_band_text.textChanged.connect(refresh)
+            self.top_offset_mm.valueChanged.connect(refresh)
+            self.bottom_offset_mm.valueChanged.connect(refresh)
+        if self.preview_pane is not None:
+            self.preview_pane.setVisible(enabled)
+
+    def _render_preview(self) -> str:
+        return pipeline.render_html(
+            self.text_editor.toPlainText(), self._render_options(), base_dir=self._source_dir
+        )
+
+    def _on_paste_cleaning_changed(self, pending: int) -> None:
+        self.paste_progress.setVisible(pending > 0)
+        if pending:
+            self.status_label.setText("🧹 Cleaning pasted HTML… you can keep editing")
+        else:
+            self.status_label.setText("✅ Paste cleanup finished")
+
+    def update_char_count(self, *_counts) -> None:
+        stats = self.document_stats
+        self.char_counter.setText(
+            f"{stats.chars} chars · {stats.words} words · {stats.lines} lines"
+        )
+
+    def _open_history_details(self, entry_id: int) -> None:
+        entry = self.history.get(entry_id)
+        if entry is None:
             return
-        entry = self.history_entries[index]
         dlg = QDialog(self)
         dlg.setWindowTitle(entry["title"])
         dlg.resize(900, 600)
@@ -634,10 +825,11 @@ class HTMLConverterApp(QMainWindow):
             QApplication.clipboard().setText(entry.get("content", ""))
 
         def delete():
-            del self.history_entries[index]
+            if self._history_model is not None:
+                self._history_model.remove_entry(entry_id)
+            else:
+                self.history.delete(entry_id)
             dlg.accept()
-            self._populate_history_list()
-            self.save_history()
 
         reopen_btn.clicked.connect(reopen)
         copy_btn.clicked.connect(copy)
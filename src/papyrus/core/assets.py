@@ -0,0 +1,446 @@
+"""Make documents that reference local files self-contained.
+
+A document opened from disk may load images, stylesheets, scripts and
+fonts by relative path. Once it is rendered into a temporary file those
+paths no longer resolve, so resolve_assets() rewrites every local src,
+href and url() reference found in asset-loading tags and CSS:
+
+- "inline" replaces the reference with a data URI
+- "copy" copies the file into a <output name>_files folder next to the
+  output and points the reference there
+
+Stylesheets get the same treatment for the url() references inside them.
+Web and data URLs, anchors and links to other pages are left alone, as are
+files whose type is not an image, font, media, stylesheet or script.
+
+Encoded data URIs are cached in memory and on disk under the file's path,
+size and modification time, so converting the same document again reads
+and encodes nothing. Files are loaded on a thread pool.
+
+This module must not import Qt.
+"""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import quote, unquote, urlsplit
+from urllib.request import pathname2url
+
+from papyrus.core.themes import cache_root
+
+ASSET_MODES = ("inline", "copy")
+# Larger files are linked by absolute file URL instead of inlined
+DEFAULT_MAX_INLINE_BYTES = 8 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+_WORKERS = 8
+# Depth of nested stylesheet imports that are followed
+_MAX_CSS_DEPTH = 8
+
+_MIME_TYPES = {
+    ".css": "text/css",
+    ".js": "text/javascript",
+    ".mjs": "text/javascript",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".eot": "application/vnd.ms-fontobject",
+}
+# Tags whose src/href/poster loads a resource; <a>, <iframe> and <form> do not
+_TAG_RE = re.compile(
+    r"<(?:img|script|link|source|video|audio|input|embed|track|image|use)\b[^>]*>",
+    re.IGNORECASE,
+)
+_ATTR_RE = re.compile(
+    r"""(\s(?:src|href|poster|xlink:href)\s*=\s*)(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE,
+)
+_LINK_REL_RE = re.compile(
+    r"""\srel\s*=\s*["']?[^"'>]*\b(?:stylesheet|icon|preload|apple-touch-icon)\b""",
+    re.IGNORECASE,
+)
+_URL_RE = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)"'\s]*))\s*\)""", re.IGNORECASE)
+_IMPORT_RE = re.compile(r"""@import\s+(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_REFERENCE_RE = re.compile(
+    f"{_TAG_RE.pattern}|{_URL_RE.pattern}|{_IMPORT_RE.pattern}", re.IGNORECASE
+)
+_SCHEME_RE = re.compile(r"^[a-z][a-z0-9+.-]+:", re.IGNORECASE)
+
+
+def asset_type(path: str) -> Optional[str]:
+    """Return the MIME type of a file resolve_assets() may embed, or None."""
+    suffix = os.path.splitext(path)[1].lower()
+    mime = _MIME_TYPES.get(suffix) or mimetypes.guess_type(path)[0]
+    if mime and mime.split("/", 1)[0] in ("image", "font", "audio", "video"):
+        return mime
+    return mime if mime in ("text/css", "text/javascript", "application/javascript") else None
+
+
+def resolve_reference(reference: str, base_dir: str) -> Optional[tuple]:
+    """Find the local file a reference points to.
+
+    Args:
+        reference: Value of a src/href attribute or url()
+        base_dir: Directory relative references resolve against
+
+    Returns:
+        Tuple of (absolute path, "#fragment" or ""), or None if the
+        reference is not an existing local file of an embeddable type
+    """
+    reference = reference.strip()
+    if not reference or reference.startswith(("#", "//")):
+        return None
+    if _SCHEME_RE.match(reference):
+        if not reference.lower().startswith("file:"):
+            return None
+        reference = urlsplit(reference).path
+    fragment = ""
+    if "#" in reference:
+        reference, fragment = reference.split("#", 1)
+        fragment = f"#{fragment}"
+    path = unquote(reference.split("?", 1)[0])
+    if not path:
+        return None
+    path = os.path.normpath(os.path.join(base_dir, path))
+    if asset_type(path) is None or not os.path.isfile(path):
+        return None
+    return path, fragment
+
+
+class AssetCache:
+    """Data URIs keyed on a file's path, size and modification time.
+
+    Recently used URIs stay in memory; every URI is also written to a
+    cache directory so the next process finds it there.
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_bytes: int = DEFAULT_MEMORY_BYTES):
+        """Create the cache.
+
+        Args:
+            directory: Where encoded assets are kept, defaults to the user
+                cache; an empty string keeps them in memory only
+            memory_bytes: Size of the URIs kept in memory
+        """
+        self.directory = os.path.join(cache_root(), "assets") if directory is None else directory
+        self.memory_bytes = memory_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str, stat: os.stat_result) -> str:
+        identity = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode("utf-8", "surrogatepass")).hexdigest()[:32]
+
+    def data_uri(self, path: str) -> str:
+        """Return the file as a data URI, reading and encoding it only on a miss.
+
+        Args:
+            path: Absolute path of a file asset_type() accepts
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = self.key(path, os.stat(path))
+        with self._lock:
+            uri = self._memory.get(key)
+            if uri is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return uri
+        stored = os.path.join(self.directory, f"{key}.uri") if self.directory else None
+        uri = _read_text(stored) if stored else None
+        if uri is None:
+            data = _read_bytes(path)
+            uri = f"data:{asset_type(path)};base64,{base64.b64encode(data).decode('ascii')}"
+            if stored:
+                _write_text(stored, uri)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+        self._remember(key, uri)
+        return uri
+
+    def _remember(self, key: str, uri: str) -> None:
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = uri
+            self._memory_size += len(uri)
+            while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_size -= len(dropped)
+
+    def clear(self) -> None:
+        """Forget every cached URI, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="ascii") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _write_text(path: str, text: str) -> None:
+    # A read-only or full cache only costs a re-encode next time
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(partial, "w", encoding="ascii") as f:
+            f.write(text)
+        os.replace(partial, path)
+    except OSError:
+        pass
+
+
+_cache: Optional[AssetCache] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_module_lock = threading.Lock()
+
+
+def asset_cache() -> AssetCache:
+    """Return the process-wide cache, creating it on first use."""
+    global _cache  # pylint: disable=global-statement
+    with _module_lock:
+        if _cache is None:
+            _cache = AssetCache()
+        return _cache
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+    with _module_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(_WORKERS, thread_name_prefix="papyrus-assets")
+        return _executor
+
+
+def _rewrite_css(css: str, replace: Callable[[str], Optional[str]]) -> str:
+    # Replacements are URL-safe, so the original quotes can be kept; a
+    # url() inside a style attribute must not switch to the attribute's quote
+    def url(match):
+        mark = '"' if match.group(1) is not None else "'" if match.group(2) is not None else ""
+        reference = next(g for g in match.groups() if g is not None)
+        new = replace(reference)
+        return match.group(0) if new is None else f"url({mark}{new}{mark})"
+
+    def import_(match):
+        mark = '"' if match.group(1) is not None else "'"
+        reference = next(g for g in match.groups() if g is not None)
+        new = replace(reference)
+        return match.group(0) if new is None else f"@import {mark}{new}{mark}"
+
+    return _URL_RE.sub(url, _IMPORT_RE.sub(import_, css))
+
+
+def _rewrite_html(html: str, replace: Callable[[str], Optional[str]]) -> str:
+    def attribute(match):
+        mark = '"' if match.group(2) is not None else "'" if match.group(3) is not None else ""
+        reference = next(g for g in match.groups()[1:] if g is not None)
+        new = replace(reference)
+        if new is None:
+            return match.group(0)
+        return f'{match.group(1)}"{new}"' if not mark else f"{match.group(1)}{mark}{new}{mark}"
+
+    def reference(match):
+        text = match.group(0)
+        if not text.startswith("<"):
+            return _rewrite_css(text, replace)
+        # A style attribute may hold url()s; rewrite those before data URIs
+        # from src and href make the tag long
+        if "url(" in text.lower():
+            text = _rewrite_css(text, replace)
+        if text[1:5].lower() == "link" and not _LINK_REL_RE.search(text):
+            # Only stylesheets and icons load their href; other links navigate
+            return text
+        return _ATTR_RE.sub(attribute, text)
+
+    return _REFERENCE_RE.sub(reference, html)
+
+
+class _Resolver:
+    """State for one resolve_assets() call."""
+
+    def __init__(self, mode: str, output_path: Optional[str], cache: AssetCache, max_inline: int):
+        self.mode = mode
+        self.cache = cache
+        self.max_inline = max_inline
+        if mode == "copy":
+            stem = os.path.splitext(os.path.basename(output_path))[0]
+            self.folder_name = f"{stem}_files"
+            self.folder = os.path.join(os.path.dirname(os.path.abspath(output_path)), self.folder_name)
+        self.results: dict = {}  # path -> replacement without fragment
+
+    def load_all(self, paths: set) -> None:
+        todo = [p for p in paths if p not in self.results]
+        if len(todo) > 1:
+            results = _pool().map(self.load, todo)
+        else:
+            results = map(self.load, todo)
+        for path, result in zip(todo, results):
+            self.results[path] = result
+
+    def load(self, path: str, depth: int = 0) -> str:
+        """Return what references to path become; never raises."""
+        try:
+            if asset_type(path) == "text/css" and depth < _MAX_CSS_DEPTH:
+                return self._load_stylesheet(path, depth)
+            if self.mode == "copy":
+                return self._copy(path, None)
+            if os.path.getsize(path) <= self.max_inline:
+                return self.cache.data_uri(path)
+        except OSError:
+            pass
+        return f"file://{pathname2url(path)}"
+
+    def _load_stylesheet(self, path: str, depth: int) -> str:
+        base_dir = os.path.dirname(path)
+        nested = {}
+
+        def replace(reference: str) -> Optional[str]:
+            resolved = resolve_reference(reference, base_dir)
+            if resolved is None or resolved[0] == path:
+                return None
+            target = nested.get(resolved[0])
+            if target is None:
+                target = nested[resolved[0]] = self.load(resolved[0], depth + 1)
+            if self.mode == "copy" and not target.startswith("file:"):
+                # Copies sit side by side in the same folder
+                target = target.rsplit("/", 1)[-1]
+            return target + resolved[1]
+
+        def encode(source: str) -> bytes:
+            with open(source, "rb") as f:
+                css = f.read().decode("utf-8", errors="replace")
+            return _rewrite_css(css, replace).encode("utf-8")
+
+        if self.mode == "copy":
+            return self._copy(path, encode)
+        # Not cached: the result depends on the files it references, which are
+        return f"data:text/css;base64,{base64.b64encode(encode(path)).decode('ascii')}"
+
+    def _copy(self, path: str, transform: Optional[Callable[[str], bytes]]) -> str:
+        digest = hashlib.sha256(path.encode("utf-8", "surrogatepass")).hexdigest()[:8]
+        name = f"{digest}-{os.path.basename(path)}"
+        target = os.path.join(self.folder, name)
+        os.makedirs(self.folder, exist_ok=True)
+        if transform is not None:
+            data = transform(path)
+            if _read_file_or_none(target) != data:
+                with open(target, "wb") as f:
+                    f.write(data)
+        else:
+            stat = os.stat(path)
+            try:
+                copied = os.stat(target)
+                fresh = copied.st_size == stat.st_size and copied.st_mtime_ns == stat.st_mtime_ns
+            except OSError:
+                fresh = False
+            if not fresh:
+                shutil.copy2(path, target)
+        return quote(f"{self.folder_name}/{name}")
+
+
+def _read_file_or_none(path: str) -> Optional[bytes]:
+    try:
+        return _read_bytes(path)
+    except OSError:
+        return None
+
+
+def find_assets(html: str, base_dir: str) -> dict:
+    """Return {reference: resolve_reference() result} for every reference in html."""
+    references = {}
+
+    def record(reference: str) -> None:
+        if reference not in references:
+            references[reference] = resolve_reference(reference, base_dir)
+
+    _rewrite_html(html, record)
+    return references
+
+
+def asset_fingerprint(html: str, base_dir: str) -> str:
+    """Return a digest that changes when a local file html references changes."""
+    h = hashlib.sha256(os.path.abspath(base_dir).encode("utf-8", "surrogatepass"))
+    for path in sorted({r[0] for r in find_assets(html, base_dir).values() if r is not None}):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        h.update(AssetCache.key(path, stat).encode("ascii"))
+    return h.hexdigest()
+
+
+def resolve_assets(
+    html: str,
+    base_dir: str,
+    mode: str = "inline",
+    output_path: Optional[str] = None,
+    cache: Optional[AssetCache] = None,
+    max_inline_bytes: int = DEFAULT_MAX_INLINE_BYTES,
+) -> str:
+    """Rewrite local asset references so the document works from any folder.
+
+    Args:
+        html: Document or fragment
+        base_dir: Directory relative references resolve against, usually the source's
+        mode: "inline" for data URIs, "copy" to copy files next to output_path
+        output_path: File the result will be written to; without it "copy"
+            falls back to "inline"
+        cache: Data URI cache, defaults to asset_cache()
+        max_inline_bytes: Larger files are referenced by absolute file URL instead
+
+    Returns:
+        The document with references rewritten
+
+    Raises:
+        ValueError: If mode is not one of ASSET_MODES
+    """
+    if mode not in ASSET_MODES:
+        raise ValueError(f"Unknown asset mode: {mode}")
+    if mode == "copy" and output_path is None:
+        mode = "inline"
+    base_dir = os.path.abspath(base_dir)
+    resolver = _Resolver(mode, output_path, cache or asset_cache(), max_inline_bytes)
+    references = find_assets(html, base_dir)
+    paths = {resolved[0] for resolved in references.values() if resolved is not None}
+    if not paths:
+        return html
+    resolver.load_all(paths)
+
+    def replace(reference: str) -> Optional[str]:
+        resolved = references[reference]
+        if resolved is None:
+            return None
+        return resolver.results[resolved[0]] + resolved[1]
+
+    return _rewrite_html(html, replace)
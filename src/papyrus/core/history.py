@@ -0,0 +1,242 @@
+"""SQLite-backed storage for saved conversions."""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from typing import Optional
+
+from papyrus.utils import perf
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS entries_title_hash ON entries (title, content_hash);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# External-content FTS index over titles and HTML, kept in sync by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE entries_fts USING fts5(
+    title, content, content='entries', content_rowid='id'
+);
+CREATE TRIGGER entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+END;
+INSERT INTO entries_fts (entries_fts) VALUES ('rebuild');
+"""
+
+# Title matches rank well above matches in the HTML body
+_TITLE_WEIGHT = 10.0
+
+_SEARCH_TERM_RE = re.compile(r"\w+")
+
+
+def content_hash(content: str) -> str:
+    """Return the digest used to detect duplicate entries."""
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class HistoryStore:
+    """Saved conversions, newest first, in a WAL-mode SQLite database.
+
+    Entries are dicts with "id", "title" and "timestamp"; "content" is only
+    loaded by get() so listing thousands of entries stays cheap.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Open or create the history database.
+
+        Args:
+            path: Database file, or ":memory:"
+            max_entries: Oldest entries beyond this count are pruned on add
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        self.has_fts = self._init_fts()
+
+    def _init_fts(self) -> bool:
+        """Create the full-text index if SQLite was built with FTS5."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            with self._conn:
+                self._conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @perf.timed("history.add")
+    def add(self, title: str, content: str, timestamp: str) -> Optional[int]:
+        """Insert an entry unless one with the same title and content exists.
+
+        Args:
+            title: Entry title
+            content: HTML source
+            timestamp: Display timestamp
+
+        Returns:
+            New entry id, or None for a duplicate
+        """
+        with self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO entries (title, timestamp, content, content_hash) "
+                "VALUES (?, ?, ?, ?)",
+                (title, timestamp, content, content_hash(content)),
+            )
+            if cur.rowcount == 0:
+                return None
+            self._conn.execute(
+                "DELETE FROM entries WHERE id <= "
+                "(SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            return cur.lastrowid
+
+    @perf.timed("history.delete")
+    def delete(self, entry_id: int) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def clear(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @perf.timed("history.entries")
+    def entries(self, offset: int = 0, limit: int = -1) -> list:
+        """Return entry summaries, newest first.
+
+        Args:
+            offset: Number of newest entries to skip
+            limit: Maximum number of entries, -1 for all
+
+        Returns:
+            List of dicts with id, title and timestamp
+        """
+        rows = self._conn.execute(
+            "SELECT id, title, timestamp FROM entries ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [{"id": r[0], "title": r[1], "timestamp": r[2]} for r in rows]
+
+    @perf.timed("history.search")
+    def search(self, query: str, limit: int = 200, offset: int = 0) -> list:
+        """Return entry summaries matching every word of query, best first.
+
+        Each word is matched as a prefix so results update while typing.
+        Without FTS5 this falls back to substring matching, newest first.
+
+        Args:
+            query: Free text typed by the user
+            limit: Maximum number of results
+            offset: Number of best results to skip
+
+        Returns:
+            List of dicts with id, title and timestamp
+        """
+        terms = _SEARCH_TERM_RE.findall(query)
+        if not terms:
+            return self.entries(offset=offset, limit=limit)
+        if self.has_fts:
+            rows = self._conn.execute(
+                "SELECT e.id, e.title, e.timestamp FROM entries_fts "
+                "JOIN entries AS e ON e.id = entries_fts.rowid "
+                "WHERE entries_fts MATCH ? "
+                "ORDER BY bm25(entries_fts, ?, 1.0) LIMIT ? OFFSET ?",
+                (" ".join(f'"{term}"*' for term in terms), _TITLE_WEIGHT, limit, offset),
+            )
+        else:
+            where = " AND ".join(["(title LIKE ? OR content LIKE ?)"] * len(terms))
+            params = [p for term in terms for p in (f"%{term}%", f"%{term}%")]
+            rows = self._conn.execute(
+                f"SELECT id, title, timestamp FROM entries WHERE {where} "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            )
+        return [{"id": r[0], "title": r[1], "timestamp": r[2]} for r in rows]
+
+    @perf.timed("history.get")
+    def get(self, entry_id: int) -> Optional[dict]:
+        """Return a full entry including its content, or None if missing."""
+        row = self._conn.execute(
+            "SELECT id, title, timestamp, content FROM entries WHERE id = ?",
+            (entry_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "title": row[1], "timestamp": row[2], "content": row[3]}
+
+    def import_legacy_json(self, json_path: str) -> int:
+        """Import a pre-SQLite history.json once.
+
+        The file is left in place; a marker in the database prevents a second
+        import.
+
+        Args:
+            json_path: Path of the legacy history file
+
+        Returns:
+            Number of entries imported
+        """
+        marker = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'legacy_json_imported'"
+        ).fetchone()
+        if marker is not None or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = []
+        if not isinstance(data, list):
+            data = []
+        rows = [
+            (
+                str(item["title"]),
+                str(item.get("timestamp", "")),
+                str(item["content"]),
+                content_hash(str(item["content"])),
+            )
+            for item in reversed(data)  # the JSON list is newest first
+            if isinstance(item, dict) and "title" in item and "content" in item
+        ]
+        with self._conn:
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (title, timestamp, content, content_hash) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+                (json_path,),
+            )
+        return max(0, cur.rowcount)
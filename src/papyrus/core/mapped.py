@@ -0,0 +1,218 @@
+"""Read-only, memory-mapped HTML files for the large-file viewer.
+
+Opening a file maps it instead of reading it, and one pass over the
+mapping records where lines and comments start. After that the viewer can
+jump to any byte offset and decode only the rows it draws, and the export
+path can stream the mapping through papyrus.core.stream.
+
+Lines longer than ROW_BYTES are shown as several rows, so a minified
+document on a single line still scrolls.
+
+This module must not import Qt.
+"""
+
+import bisect
+import codecs
+import mmap
+import os
+from array import array
+from typing import Iterator
+
+# Files at least this large open in the read-only viewer
+LARGE_FILE_THRESHOLD = 4 * 1024 * 1024
+# Bytes per row when a line is too long to show on one row
+ROW_BYTES = 4096
+# Granularity of the line index
+INDEX_CHUNK = 64 * 1024
+# Bytes decoded at a time by chunks()
+CHUNK_SIZE = 1 << 20
+
+
+class MappedDocument:
+    """A UTF-8 HTML file mapped into memory.
+
+    Offsets are byte offsets into the file. Rows start after a newline or
+    every ROW_BYTES bytes into a long line, moved back to a character
+    boundary.
+    """
+
+    def __init__(self, path: str):
+        """Map a file and index its lines and comments.
+
+        Args:
+            path: File to open
+
+        Raises:
+            OSError: If the file cannot be opened or mapped
+        """
+        self.path = path
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            # Empty files cannot be mapped; an empty bytes object behaves the same
+            self._map = (
+                mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+            )
+        except (OSError, ValueError) as e:
+            self._file.close()
+            raise OSError(f"Cannot map {path}: {e}") from e
+        self.mtime_ns = os.fstat(self._file.fileno()).st_mtime_ns
+        # Per INDEX_CHUNK: newlines before the chunk, and the start of the
+        # line that contains the chunk's first byte
+        self._chunk_lines = array("q")
+        self._chunk_line_starts = array("q")
+        # Offsets where comment state flips: even entries open, odd entries close
+        self._comment_toggles = array("q")
+        self.line_count = 0
+        self._build_index()
+
+    def _build_index(self) -> None:
+        data = self._map
+        lines = 0
+        line_start = 0
+        for offset in range(0, self.size, INDEX_CHUNK):
+            self._chunk_lines.append(lines)
+            self._chunk_line_starts.append(line_start)
+            chunk = data[offset : offset + INDEX_CHUNK]
+            lines += chunk.count(b"\n")
+            last = chunk.rfind(b"\n")
+            if last >= 0:
+                line_start = offset + last + 1
+        self.line_count = lines + (1 if self.size and data[-1:] != b"\n" else 0)
+
+        # Same rules as highlighter.comment_spans, across the whole file
+        pos = data.find(b"<!--")
+        while pos >= 0:
+            self._comment_toggles.append(pos)
+            end = data.find(b"-->", pos)
+            if end < 0:
+                break
+            self._comment_toggles.append(end + 3)
+            pos = data.find(b"<!--", end + 3)
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    @property
+    def identity(self) -> str:
+        """String that changes whenever the file on disk changes."""
+        return f"{os.path.abspath(self.path)}\0{self.size}\0{self.mtime_ns}"
+
+    def line_start(self, offset: int) -> int:
+        """Return the offset of the first byte of the line containing offset."""
+        offset = max(0, min(offset, self.size))
+        if offset == 0:
+            return 0
+        chunk = min((offset - 1) // INDEX_CHUNK, len(self._chunk_lines) - 1)
+        newline = self._map.rfind(b"\n", chunk * INDEX_CHUNK, offset)
+        if newline >= 0:
+            return newline + 1
+        return self._chunk_line_starts[chunk]
+
+    def line_number(self, offset: int) -> int:
+        """Return the 0-based line number at offset."""
+        offset = max(0, min(offset, self.size))
+        if not self._chunk_lines:
+            return 0
+        chunk = min(offset // INDEX_CHUNK, len(self._chunk_lines) - 1)
+        start = chunk * INDEX_CHUNK
+        return self._chunk_lines[chunk] + self._map[start:offset].count(b"\n")
+
+    def _grid_row(self, line_start: int, step: int) -> int:
+        """Start of the step-th row of a line, moved back to a character boundary."""
+        offset = line_start + step * ROW_BYTES
+        if offset >= self.size:
+            return self.size
+        floor = max(line_start, offset - 3)
+        while offset > floor and 0x80 <= self._map[offset] < 0xC0:
+            offset -= 1
+        return offset
+
+    def row_start(self, offset: int) -> int:
+        """Return the start of the row containing offset."""
+        offset = max(0, min(offset, self.size))
+        start = self.line_start(offset)
+        step = (offset - start) // ROW_BYTES
+        following = self._grid_row(start, step + 1)
+        if following <= offset:
+            return following
+        return self._grid_row(start, step)
+
+    def next_row(self, offset: int) -> int:
+        """Return the start of the row after the one starting at offset."""
+        if offset >= self.size:
+            return self.size
+        start = self.line_start(offset)
+        # A row start sits at most 3 bytes before its grid point
+        boundary = self._grid_row(start, (offset - start + 3) // ROW_BYTES + 1)
+        newline = self._map.find(b"\n", offset, boundary)
+        return newline + 1 if newline >= 0 else boundary
+
+    def previous_row(self, offset: int) -> int:
+        """Return the start of the row before the one starting at offset."""
+        if offset <= 0:
+            return 0
+        return self.row_start(offset - 1)
+
+    def row_text(self, offset: int) -> tuple:
+        """Decode the row starting at offset.
+
+        Returns:
+            Tuple of (row text without its line ending, offset of the next row)
+        """
+        end = self.next_row(offset)
+        raw = self._map[offset:end]
+        if raw.endswith(b"\n"):
+            raw = raw[:-2] if raw.endswith(b"\r\n") else raw[:-1]
+        elif raw.endswith(b"\r") and self._map[end : end + 1] == b"\n":
+            # Long line cut between \r and \n
+            raw = raw[:-1]
+        return raw.decode("utf-8", errors="replace"), end
+
+    def in_comment(self, offset: int) -> bool:
+        """Return whether offset lies inside an HTML comment."""
+        return bisect.bisect_right(self._comment_toggles, offset) % 2 == 1
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Decode the mapping chunk_size bytes at a time."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for offset in range(0, self.size, chunk_size):
+            text = decoder.decode(self._map[offset : offset + chunk_size])
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def text(self) -> str:
+        """Decode the whole file."""
+        return self._map[:].decode("utf-8", errors="replace")
+
+
+def open_document(path: str, threshold: int = LARGE_FILE_THRESHOLD) -> tuple:
+    """Open a file for the editor or, above threshold, the read-only viewer.
+
+    Args:
+        path: File to open
+        threshold: Size in bytes from which the file stays mapped
+
+    Returns:
+        Tuple of (text for the editor or None, MappedDocument or None)
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    document = MappedDocument(path)
+    if document.size >= threshold:
+        return None, document
+    with document:
+        return document.text(), None
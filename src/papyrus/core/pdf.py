@@ -0,0 +1,255 @@
+"""Render pipeline output straight to PDF without an external browser.
+
+Two engines are available. QtWebEngine prints the HTML the same way a
+browser would, including the CSS print bands. Where QtWebEngine is missing
+(py2app builds, minimal Linux hosts), QTextDocument lays the HTML out on
+a QPdfWriter and the bands from inject_print_bands are painted on each
+page with the same geometry.
+
+Both engines need a QGuiApplication; ensure_gui_app() creates one on the
+offscreen platform when no display is available, so batch jobs run
+unattended.
+"""
+
+import dataclasses
+import math
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from typing import Optional
+
+from PySide6.QtCore import QCoreApplication, QMarginsF, QRectF, QSizeF, Qt, QUrl  # pylint: disable=no-name-in-module
+from PySide6.QtGui import (  # pylint: disable=no-name-in-module
+    QColor,
+    QFont,
+    QGuiApplication,
+    QPageLayout,
+    QPageSize,
+    QPainter,
+    QPdfWriter,
+    QTextDocument,
+)
+
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.utils import perf
+
+PAGE_SIZE = QPageSize.PageSizeId.Letter
+DEFAULT_MARGIN_MM = 12.7
+# Geometry and style of the bands written by inject_print_bands
+BAND_HEIGHT_MM = 8.0
+BAND_PADDING_MM = 6.0
+BAND_FONT_PT = 9
+BAND_COLOR = "#2a6792"
+BAND_REPEAT = 5
+# Resolution the QTextDocument engine lays pages out at
+_LAYOUT_DPI = 96
+_WEBENGINE_TIMEOUT_MS = 120_000
+ENGINES = ("auto", "webengine", "qt")
+
+
+def _mm_to_px(mm: float) -> float:
+    return mm / 25.4 * _LAYOUT_DPI
+
+
+def ensure_gui_app() -> QCoreApplication:
+    """Return the running Qt application, creating a headless one if needed."""
+    app = QCoreApplication.instance()
+    if app is not None:
+        return app
+    if (
+        sys.platform.startswith("linux")
+        and not os.environ.get("DISPLAY")
+        and not os.environ.get("WAYLAND_DISPLAY")
+    ):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Required by QtWebEngine when it is imported after the application exists
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    return QGuiApplication(sys.argv[:1])
+
+
+@lru_cache(maxsize=None)
+def webengine_available() -> bool:
+    """Return True if QtWebEngine can be imported in this environment."""
+    try:
+        from PySide6.QtWebEngineCore import QWebEnginePage  # pylint: disable=no-name-in-module,import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+def content_margins_mm(options: RenderOptions, margin_mm: float = DEFAULT_MARGIN_MM) -> tuple:
+    """Return (top, bottom) page margins that keep text clear of the bands.
+
+    The body padding inject_print_bands adds for print media only clears
+    the band offset, so the band height is added here as well.
+
+    Args:
+        options: Render options
+        margin_mm: Margin used when bands are off
+
+    Returns:
+        Tuple of top and bottom margins in millimetres
+    """
+    if not (options.print_bands and options.band_text.strip()):
+        return margin_mm, margin_mm
+    gap = BAND_HEIGHT_MM + 3.0
+    return max(margin_mm, options.top_mm + gap), max(margin_mm, options.bottom_mm + gap)
+
+
+@perf.timed("pdf.export")
+def export_pdf(
+    html: str,
+    path: str,
+    options: Optional[RenderOptions] = None,
+    colors: Optional[dict] = None,
+    engine: str = "auto",
+    margin_mm: float = DEFAULT_MARGIN_MM,
+    base_dir: Optional[str] = None,
+) -> str:
+    """Run the pipeline on html and write the result to a PDF file.
+
+    Args:
+        html: Raw HTML from the editor or a source file
+        path: PDF file to write
+        options: Render options, defaults to RenderOptions()
+        colors: Color palette for the styling wrapper
+        engine: "webengine", "qt", or "auto" to prefer QtWebEngine when available
+        margin_mm: Left and right margins, and top and bottom without bands
+        base_dir: Directory the HTML's relative references resolve against;
+            local assets are inlined when options.assets is set
+
+    Returns:
+        Name of the engine that wrote the file
+
+    Raises:
+        ValueError: If engine is not one of ENGINES
+        OSError: If the PDF could not be written
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+    options = options or RenderOptions()
+    if options.assets:
+        # The page is loaded from a temporary file, so nothing can be copied next to it
+        options = dataclasses.replace(options, assets="inline")
+    ensure_gui_app()
+    if engine == "webengine" or (engine == "auto" and webengine_available()):
+        _export_with_webengine(
+            render_html(html, options, colors, base_dir=base_dir), path, options, margin_mm
+        )
+        return "webengine"
+    # QTextDocument ignores position: fixed, so the bands are painted instead
+    text_options = dataclasses.replace(options, print_bands=False)
+    _export_with_text_document(
+        render_html(html, text_options, colors, base_dir=base_dir), path, options, margin_mm
+    )
+    return "qt"
+
+
+def _export_with_webengine(
+    html: str, path: str, options: RenderOptions, margin_mm: float
+) -> None:
+    from PySide6.QtCore import QEventLoop, QTimer  # pylint: disable=no-name-in-module,import-outside-toplevel
+    from PySide6.QtWebEngineCore import QWebEnginePage  # pylint: disable=no-name-in-module,import-outside-toplevel
+
+    # The bands are fixed-position elements placed from the paper edge, as
+    # when printing from a browser, so the page itself has no vertical margins
+    vertical = 0.0 if options.print_bands and options.band_text.strip() else margin_mm
+    layout = QPageLayout(
+        QPageSize(PAGE_SIZE),
+        QPageLayout.Orientation.Portrait,
+        QMarginsF(margin_mm, vertical, margin_mm, vertical),
+        QPageLayout.Unit.Millimeter,
+    )
+    result = {"ok": False}
+    loop = QEventLoop()
+    page = QWebEnginePage()
+
+    def on_loaded(ok: bool) -> None:
+        if not ok:
+            loop.quit()
+            return
+        page.printToPdf(os.path.abspath(path), layout)
+
+    def on_printed(_path: str, ok: bool) -> None:
+        result["ok"] = ok
+        loop.quit()
+
+    page.loadFinished.connect(on_loaded)
+    page.pdfPrintingFinished.connect(on_printed)
+    QTimer.singleShot(_WEBENGINE_TIMEOUT_MS, loop.quit)
+    # setHtml() is limited to 2 MB, so load the document from a file
+    with tempfile.TemporaryDirectory(prefix="papyrus-pdf-") as tmp:
+        source = os.path.join(tmp, "document.html")
+        with open(source, "w", encoding="utf-8", errors="surrogatepass") as f:
+            f.write(html)
+        page.load(QUrl.fromLocalFile(source))
+        loop.exec()
+    page.deleteLater()
+    if not result["ok"]:
+        raise OSError(f"QtWebEngine could not print {path}")
+
+
+def _export_with_text_document(
+    html: str, path: str, options: RenderOptions, margin_mm: float
+) -> None:
+    writer = QPdfWriter(path)
+    writer.setResolution(_LAYOUT_DPI)
+    writer.setPageLayout(
+        QPageLayout(
+            QPageSize(PAGE_SIZE),
+            QPageLayout.Orientation.Portrait,
+            QMarginsF(0, 0, 0, 0),
+            QPageLayout.Unit.Millimeter,
+        )
+    )
+    page_rect = writer.pageLayout().fullRectPixels(_LAYOUT_DPI)
+    top_mm, bottom_mm = content_margins_mm(options, margin_mm)
+    left = _mm_to_px(margin_mm)
+    top = _mm_to_px(top_mm)
+    content_width = page_rect.width() - 2 * left
+    content_height = page_rect.height() - top - _mm_to_px(bottom_mm)
+
+    doc = QTextDocument()
+    doc.documentLayout().setPaintDevice(writer)
+    doc.setHtml(html)
+    doc.setPageSize(QSizeF(content_width, content_height))
+    pages = max(1, math.ceil(doc.size().height() / content_height))
+
+    painter = QPainter()
+    if not painter.begin(writer):
+        raise OSError(f"Cannot write {path}")
+    try:
+        for number in range(pages):
+            if number:
+                writer.newPage()
+            painter.save()
+            painter.translate(left, top - number * content_height)
+            doc.drawContents(
+                painter, QRectF(0, number * content_height, content_width, content_height)
+            )
+            painter.restore()
+            if options.print_bands:
+                _paint_bands(painter, page_rect.width(), page_rect.height(), options)
+    finally:
+        painter.end()
+
+
+def _paint_bands(painter: QPainter, width: float, height: float, options: RenderOptions) -> None:
+    band_text = (options.band_text or "").strip()
+    if not band_text:
+        return
+    text = (band_text + " ") * BAND_REPEAT
+    padding = _mm_to_px(BAND_PADDING_MM)
+    band_height = _mm_to_px(BAND_HEIGHT_MM)
+    font = QFont(painter.font())
+    font.setPointSizeF(BAND_FONT_PT)
+    painter.save()
+    painter.setFont(font)
+    painter.setPen(QColor(BAND_COLOR))
+    flags = Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextSingleLine
+    for y in (_mm_to_px(options.top_mm), height - _mm_to_px(options.bottom_mm) - band_height):
+        rect = QRectF(padding, y, width - 2 * padding, band_height)
+        painter.setClipRect(rect)
+        painter.drawText(rect, flags, text)
+    painter.restore()
@@ -0,0 +1,448 @@
+"""Qt-free HTML processing pipeline shared by the GUI and the command line.
+
+Every stage is a plain function on strings so it can run in worker processes
+without building a QApplication.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from papyrus.core.assets import resolve_assets
+from papyrus.core.themes import DEFAULT_THEME, builtin_theme, palette_css, registry
+from papyrus.utils import perf
+
+DEFAULT_COLORS = dict(builtin_theme().colors)
+
+DEFAULT_BAND_TEXT = "Papyrus HTML Converter"
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """Options that affect the final HTML produced by :func:`render_html`."""
+
+    add_wrapper: bool = True
+    pdf_copy: bool = False
+    print_bands: bool = False
+    band_text: str = DEFAULT_BAND_TEXT
+    top_mm: int = 12
+    bottom_mm: int = 12
+    theme: str = DEFAULT_THEME
+    # "inline" or "copy" to make local assets work from the output location
+    # (see papyrus.core.assets); needs a base_dir passed to render_html
+    assets: str = ""
+
+
+# Placeholders that split the compiled wrapper into fragments
+_TITLE_SLOT = "\x00title\x00"
+_CONTENT_SLOT = "\x00content\x00"
+_ROOT_TAG_RE = re.compile(r"<(?:html|body)", re.IGNORECASE | re.ASCII)
+_DOCUMENT_MARKERS_RE = re.compile(r"<(?:/head>|/html>|html|body)", re.IGNORECASE | re.ASCII)
+
+
+@dataclass(frozen=True)
+class DocumentOffsets:
+    """Where print bands go in a document, from one scan_document() pass.
+
+    Offsets are -1 when the marker is missing.
+    """
+
+    head_close: int = -1  # last </head>
+    body_tag_end: int = -1  # just past the '>' of the first <body, 0 if unterminated
+    html_close: int = -1  # last </html>
+    has_html: bool = False
+    has_body: bool = False
+
+
+_NO_MARKERS = DocumentOffsets()
+
+
+def scan_document(html: str) -> DocumentOffsets:
+    """Find the injection points for the wrapper and print bands without copying html."""
+    head_close = html_close = body_start = -1
+    has_html = False
+    for match in _DOCUMENT_MARKERS_RE.finditer(html):
+        tag = match.group()[1:3].lower()
+        if tag == "/h":
+            if match.group()[3] in "eE":
+                head_close = match.start()
+            else:
+                html_close = match.start()
+        elif tag == "ht":
+            has_html = True
+        elif body_start < 0:
+            body_start = match.start()
+    return DocumentOffsets(
+        head_close=head_close,
+        body_tag_end=html.find(">", body_start) + 1 if body_start >= 0 else -1,
+        html_close=html_close,
+        has_html=has_html,
+        has_body=body_start >= 0,
+    )
+
+
+def _has_root_tags(content: str) -> bool:
+    """Return whether content contains both <html and <body, stopping early."""
+    seen = set()
+    for match in _ROOT_TAG_RE.finditer(content):
+        seen.add(match.group()[1].lower())
+        if len(seen) == 2:
+            return True
+    return False
+
+
+def wrapper_css(colors: Optional[dict] = None, theme: str = DEFAULT_THEME) -> str:
+    """Return the compiled stylesheet for an explicit palette, else for a theme.
+
+    Raises:
+        ThemeError: If the theme is unknown
+    """
+    if colors:
+        return palette_css(tuple(sorted(colors.items())))
+    return registry().css(theme)
+
+
+@lru_cache(maxsize=16)
+def _compile_wrapper(stylesheet: str, bands_key: Optional[tuple] = None) -> tuple:
+    """Build the wrapper once per stylesheet and band setting.
+
+    Args:
+        stylesheet: Compiled theme CSS from wrapper_css()
+        bands_key: (band text, top mm, bottom mm) to build the bands in, or None
+
+    Returns:
+        Tuple of (text before the title stamp, text between the stamp and the
+        content, text after the content)
+    """
+    wrapper = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Converted Document - {_TITLE_SLOT}</title>
+    <style>{stylesheet}</style>
+</head>
+<body>
+    <div class="container">
+        {_CONTENT_SLOT}
+    </div>
+</body>
+</html>"""
+    if bands_key is not None:
+        css, bands = print_band_markup(*bands_key)
+        wrapper = _insert_bands(wrapper, scan_document(wrapper), css, bands)
+    before_title, rest = wrapper.split(_TITLE_SLOT)
+    middle, after = rest.split(_CONTENT_SLOT)
+    return before_title, middle, after
+
+
+@lru_cache(maxsize=4)
+def _title_stamp(minute: datetime) -> str:
+    return minute.strftime("%B %d, %Y %I:%M %p")
+
+
+def _wrap(
+    content: str, stylesheet: str, now: Optional[datetime], bands_key: Optional[tuple] = None
+) -> str:
+    before_title, middle, after = _compile_wrapper(stylesheet, bands_key)
+    stamp = _title_stamp((now or datetime.now()).replace(second=0, microsecond=0))
+    return "".join((before_title, stamp, middle, content, after))
+
+
+@perf.timed("pipeline.wrapper")
+def get_styled_wrapper(
+    content: str,
+    colors: Optional[dict] = None,
+    now: Optional[datetime] = None,
+    theme: str = DEFAULT_THEME,
+) -> str:
+    """Wrap an HTML fragment in a Papyrus theme.
+
+    Documents that already have both ``<html`` and ``<body`` are returned
+    unchanged. The wrapper is compiled once per stylesheet; each call only
+    joins the cached fragments around the content.
+
+    Args:
+        content: HTML fragment or document
+        colors: Color palette; overrides theme when given
+        now: Timestamp for the document title, defaults to the current time
+        theme: Theme id from papyrus.core.themes
+
+    Returns:
+        Styled HTML document
+
+    Raises:
+        ThemeError: If the theme is unknown
+    """
+    if _has_root_tags(content):
+        return content
+    return _wrap(content, wrapper_css(colors, theme), now)
+
+
+CODE_VIEW_PREFIX = (
+    '<section class="code-view">\n'
+    '  <h2 style="margin-bottom:12px;color:#ffa86b;font-weight:600;">HTML Source</h2>\n'
+    "  <pre><code>"
+)
+CODE_VIEW_SUFFIX = "</code></pre>\n</section>"
+
+
+@perf.timed("pipeline.code_view")
+def build_copyable_code_view(raw_html: str) -> str:
+    """Return an escaped <pre><code> block for copyable HTML source.
+
+    Args:
+        raw_html: HTML source to display as code
+
+    Returns:
+        HTML section rendering the escaped source
+    """
+    return CODE_VIEW_PREFIX + escape_code(raw_html) + CODE_VIEW_SUFFIX
+
+
+def escape_code(s: str) -> str:
+    """Escape text for display inside <pre><code>."""
+    # Order matters: ampersand first
+    s = s.replace("&", "&amp;")
+    s = s.replace("<", "&lt;").replace(">", "&gt;")
+    s = s.replace('"', "&quot;")
+    return s
+
+
+# Characters replaced or removed by sanitize_for_pdf_copy. Each is checked with
+# a non-allocating substring test first; str.translate and regex substitution
+# both fall back to per-character work on non-Latin-1 text and are far slower.
+_PDF_COPY_CHAR_REPLACEMENTS = (
+    ("\xa0", " "),  # NBSP
+    ("\u202f", " "),  # narrow NBSP
+    *(
+        (ch, "")
+        for ch in (
+            "\ufeff"  # BOM
+            "\u200b\u200c\u200d"  # zero width
+            "\u2060"  # word joiner
+            "\u200e\u200f"  # LRM/RLM
+            "\u202a\u202b\u202c\u202d\u202e"  # bidi embedding/override
+            "\u2066\u2067\u2068\u2069"  # bidi isolates
+            "\xad"  # soft hyphen
+        )
+    ),
+)
+# The "-webkit-user-select" spellings are covered by these substrings
+_NON_SELECTABLE_TOKENS = (
+    ("user-select", ("user-select: none", "user-select:none"), "user-select: text"),
+    ("pointer-events", ("pointer-events: none", "pointer-events:none"), "pointer-events: auto"),
+)
+# Used only when lowercasing changes the text length, e.g. for U+0130
+_PDF_COPY_MARKERS_RE = re.compile(
+    r"</head>|pdf-copy-sanitize|<html|<body", re.IGNORECASE | re.ASCII
+)
+_PDF_COPY_STYLE_BLOCK = """
+<style id="pdf-copy-sanitize">
+  body, pre, code, table, td, th, p, li, div { -webkit-user-select: text !important; user-select: text !important; }
+  pre, code { font-family: SFMono-Regular, Menlo, Consolas, 'Liberation Mono', monospace; font-variant-ligatures: none; tab-size: 4; -moz-tab-size: 4; }
+  pre { white-space: pre; }
+  @media print { pre { white-space: pre-wrap; word-break: normal; overflow-wrap: anywhere; } }
+</style>
+"""
+
+
+def _find_pdf_copy_markers(s: str) -> tuple:
+    """Return (last </head> index, has pdf-copy-sanitize, has <html or <body)."""
+    lower = s.lower()
+    if len(lower) == len(s):
+        return (
+            lower.rfind("</head>"),
+            "pdf-copy-sanitize" in lower,
+            "<html" in lower or "<body" in lower,
+        )
+    head_idx, sanitized, has_root = -1, False, False
+    for match in _PDF_COPY_MARKERS_RE.finditer(s):
+        marker = match.group().lower()
+        if marker == "</head>":
+            head_idx = match.start()
+        elif marker == "pdf-copy-sanitize":
+            sanitized = True
+        else:
+            has_root = True
+    return head_idx, sanitized, has_root
+
+
+@perf.timed("pipeline.sanitize")
+def sanitize_for_pdf_copy(html: str) -> str:
+    """Minimal sanitization so code copies cleanly from macOS Preview PDFs.
+
+    - Normalize line endings
+    - Remove zero-width, soft hyphen, BOM, and directional marks
+    - Replace user-select:none with selectable text
+    - Inject style to enforce selectable, monospace code and sane wrapping
+
+    Lookup tables are built at import time and every replacement is skipped
+    unless a substring check shows it has something to change.
+
+    Args:
+        html: HTML text to sanitize
+
+    Returns:
+        Sanitized HTML text
+    """
+    s = html
+    # Normalize line endings
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").replace("\r", "\n")
+    # Replace non-breaking spaces and remove invisible characters
+    if not s.isascii():
+        for ch, replacement in _PDF_COPY_CHAR_REPLACEMENTS:
+            if ch in s:
+                s = s.replace(ch, replacement)
+    # Make non-selectable rules selectable
+    if "none" in s:
+        for prefix, tokens, replacement in _NON_SELECTABLE_TOKENS:
+            if prefix in s:
+                for token in tokens:
+                    s = s.replace(token, replacement)
+    # Inject a small style block to enforce selection and monospace code
+    head_idx, sanitized, has_root = _find_pdf_copy_markers(s)
+    if sanitized:
+        return s
+    if head_idx >= 0:
+        return s[:head_idx] + _PDF_COPY_STYLE_BLOCK + s[head_idx:]
+    if has_root:
+        return _PDF_COPY_STYLE_BLOCK + s
+    return s
+
+
+@lru_cache(maxsize=16)
+def print_band_markup(band_text: str, top_mm: int = 12, bottom_mm: int = 12) -> tuple:
+    """Return the (style block, header and footer divs) inject_print_bands adds.
+
+    Args:
+        band_text: Text to repeat across the bands, already stripped
+        top_mm: Offset of the header band from the top of the page
+        bottom_mm: Offset of the footer band from the bottom of the page
+
+    Returns:
+        Tuple of (CSS <style> block, band markup)
+    """
+    css = f"""
+<style>
+  .print-header, .print-footer {{ display: block !important; position: fixed; left: 0; right: 0; height: 8mm; padding: 2mm 6mm; background: transparent; z-index: 9999; font-size: 9pt; color: #2a6792; text-align: center; line-height: 1; white-space: nowrap; overflow: hidden; text-overflow: clip; }}
+  .print-header {{ top: {top_mm}mm; }}
+  .print-footer {{ bottom: {bottom_mm}mm; }}
+  @media print {{ header, footer {{ display: none !important; }} body {{ padding-top: max(15mm, {top_mm + 3}mm); padding-bottom: max(15mm, {bottom_mm + 3}mm); }} }}
+</style>
+"""
+    repeated = (band_text + " ") * 5
+    bands = f"""
+<div class="print-header" aria-hidden="true">{repeated}</div>
+<div class="print-footer" aria-hidden="true">{repeated}</div>
+"""
+    return css, bands
+
+
+@perf.timed("pipeline.bands")
+def inject_print_bands(
+    html: str, band_text: str, top_mm: int = 12, bottom_mm: int = 12
+) -> str:
+    """Add repeated header/footer bands that appear on every printed page.
+
+    Args:
+        html: HTML document
+        band_text: Text to repeat across the bands; empty disables the bands
+        top_mm: Offset of the header band from the top of the page
+        bottom_mm: Offset of the footer band from the bottom of the page
+
+    Returns:
+        HTML document with band styles and markup injected
+    """
+    band_text = (band_text or "").strip()
+    if not band_text:
+        return html
+    css, bands = print_band_markup(band_text, top_mm, bottom_mm)
+    return _insert_bands(html, scan_document(html), css, bands)
+
+
+def _insert_bands(html: str, offsets: DocumentOffsets, css: str, bands: str) -> str:
+    """Join the band style and markup into html at the scanned offsets.
+
+    The style goes before the last </head>, else first. The markup goes
+    after the first <body> tag, else before the last </html>, else last.
+    """
+    # (offset, order among inserts at the same offset, text)
+    inserts = [(offsets.head_close if offsets.head_close >= 0 else 0, 1, css)]
+    if offsets.has_body:
+        inserts.append((offsets.body_tag_end, 0, bands))
+    elif offsets.html_close >= 0:
+        inserts.append((offsets.html_close, 2, bands))
+    else:
+        inserts.append((len(html), 2, bands))
+    inserts.sort()
+    parts = []
+    pos = 0
+    for offset, _, text in inserts:
+        parts.append(html[pos:offset])
+        parts.append(text)
+        pos = offset
+    parts.append(html[pos:])
+    return "".join(parts)
+
+
+@perf.timed("pipeline.render")
+def render_html(
+    html: str,
+    options: Optional[RenderOptions] = None,
+    colors: Optional[dict] = None,
+    now: Optional[datetime] = None,
+    base_dir: Optional[str] = None,
+    output_path: Optional[str] = None,
+) -> str:
+    """Run the full processing chain used for browser preview and printing.
+
+    Args:
+        html: Raw HTML from the editor or a source file
+        options: Render options, defaults to RenderOptions()
+        colors: Color palette for the styling wrapper; overrides options.theme
+        now: Timestamp for the wrapper title, defaults to the current time
+        base_dir: Directory the source's relative references resolve against;
+            without it options.assets is ignored
+        output_path: Where the result is written, for options.assets == "copy"
+
+    Returns:
+        Final HTML document
+
+    Raises:
+        ThemeError: If options.theme is unknown
+        ValueError: If options.assets is not a mode from papyrus.core.assets
+    """
+    options = options or RenderOptions()
+    # The code view shows references as text, so they are left as written
+    if options.assets and base_dir is not None and not options.pdf_copy:
+        html = resolve_assets(html, base_dir, options.assets, output_path)
+    processed = sanitize_for_pdf_copy(html)
+    # When enabled, render the sanitized content as escaped code for PDF copyability
+    if options.pdf_copy:
+        processed = build_copyable_code_view(processed)
+    band_text = (options.band_text or "").strip()
+    bands_key = (
+        (band_text, options.top_mm, options.bottom_mm)
+        if options.print_bands and band_text
+        else None
+    )
+    if not options.add_wrapper and bands_key is None:
+        return processed
+
+    # The code view contains no markup of its own to find
+    offsets = _NO_MARKERS if options.pdf_copy else scan_document(processed)
+    if options.add_wrapper and not (offsets.has_html and offsets.has_body):
+        # Bands are compiled into the wrapper unless the content has a
+        # </head> of its own, which is where their style then goes
+        stylesheet = wrapper_css(colors, options.theme)
+        if offsets.head_close < 0:
+            return _wrap(processed, stylesheet, now, bands_key)
+        processed = _wrap(processed, stylesheet, now)
+        offsets = scan_document(processed)
+    if bands_key is None:
+        return processed
+    return _insert_bands(processed, offsets, *print_band_markup(*bands_key))
@@ -0,0 +1,207 @@
+"""Content-addressed cache of rendered HTML files for browser previews."""
+
+import atexit
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from papyrus.core.assets import asset_fingerprint
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.core.stream import iter_render_chunks
+from papyrus.core.themes import registry
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_FILES = 64
+
+
+def render_key(
+    html: str,
+    options: RenderOptions,
+    colors: Optional[dict] = None,
+    base_dir: Optional[str] = None,
+) -> str:
+    """Return a digest of the editor content and everything that shapes the output.
+
+    Args:
+        html: Editor content
+        options: Render options
+        colors: Wrapper color palette
+        base_dir: Directory local assets resolve against when options.assets is set
+
+    Returns:
+        Hex digest identifying the rendered file
+
+    Raises:
+        ThemeError: If options.theme is unknown
+    """
+    h = hashlib.sha256()
+    h.update(repr(dataclasses.astuple(options)).encode("utf-8"))
+    h.update(repr(sorted((colors or {}).items())).encode("utf-8"))
+    if options.add_wrapper and not colors:
+        # An edited theme file changes the output under the same theme id
+        h.update(registry().get(options.theme).digest.encode("ascii"))
+    if options.assets and base_dir is not None and not options.pdf_copy:
+        # Inlined images and stylesheets may change while the document does not
+        h.update(asset_fingerprint(html, base_dir).encode("ascii"))
+    h.update(b"\0")
+    h.update(html.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class RenderCache:
+    """Rendered HTML files keyed on render_key(), evicted least recently used.
+
+    Files live in a private temporary directory that is removed at exit, so
+    previews no longer leave a NamedTemporaryFile behind on every click.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_files: int = DEFAULT_MAX_FILES,
+    ):
+        """Create the cache.
+
+        Args:
+            directory: Where to write files; a fresh temporary directory by default
+            max_bytes: Total size kept on disk before old files are evicted
+            max_files: Number of files kept before old files are evicted
+        """
+        self._owns_directory = directory is None
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="papyrus-render-")
+            atexit.register(self.cleanup)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (path, size)
+        self._total_bytes = 0
+
+    def get_or_render(
+        self,
+        html: str,
+        options: RenderOptions,
+        colors: Optional[dict] = None,
+        render: Callable[..., str] = render_html,
+        base_dir: Optional[str] = None,
+    ) -> tuple:
+        """Return the file for this content and options, rendering it on a miss.
+
+        Args:
+            html: Editor content
+            options: Render options
+            colors: Wrapper color palette
+            render: Pipeline called as render(html, options, colors) on a miss,
+                with base_dir=base_dir added when one is given
+            base_dir: Directory of the file the content came from, for options.assets
+
+        Returns:
+            Tuple of (file path, True if it was served from the cache)
+        """
+        key = render_key(html, options, colors, base_dir)
+        path = self._lookup(key)
+        if path is not None:
+            return path, True
+
+        if base_dir is not None:
+            output = render(html, options, colors, base_dir=base_dir)
+        else:
+            output = render(html, options, colors)
+        data = output.encode("utf-8", "surrogatepass")
+        return self._store(key, lambda f: f.write(data)), False
+
+    def get_or_render_chunks(
+        self,
+        identity: str,
+        open_chunks: Callable[[], Iterable[str]],
+        options: RenderOptions,
+        colors: Optional[dict] = None,
+    ) -> tuple:
+        """Like get_or_render() for sources too large to hold as one string.
+
+        The output is streamed to disk with papyrus.core.stream.
+
+        Args:
+            identity: Changes whenever the source does, e.g. MappedDocument.identity
+            open_chunks: Returns a fresh iterator over the source text
+            options: Render options
+            colors: Wrapper color palette
+
+        Returns:
+            Tuple of (file path, True if it was served from the cache)
+        """
+        key = render_key(identity, options, colors)
+        path = self._lookup(key)
+        if path is not None:
+            return path, True
+
+        def write(f):
+            for chunk in iter_render_chunks(open_chunks, options, colors):
+                f.write(chunk.encode("utf-8", "surrogatepass"))
+
+        return self._store(key, write), False
+
+    def _lookup(self, key: str) -> Optional[str]:
+        cached = self._files.get(key)
+        if cached is not None and os.path.exists(cached[0]):
+            self._files.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+        if cached is not None:
+            self._forget(key)
+        self.misses += 1
+        return None
+
+    def _store(self, key: str, write: Callable) -> str:
+        path = os.path.join(self.directory, f"{key[:32]}.html")
+        partial = f"{path}.part"
+        with open(partial, "wb") as f:
+            write(f)
+        os.replace(partial, path)
+        size = os.path.getsize(path)
+        self._files[key] = (path, size)
+        self._total_bytes += size
+        self._evict(keep=key)
+        return path
+
+    def _forget(self, key: str) -> Optional[str]:
+        path, size = self._files.pop(key)
+        self._total_bytes -= size
+        return path
+
+    def _evict(self, keep: str) -> None:
+        while len(self._files) > 1 and (
+            len(self._files) > self.max_files or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._files))
+            if oldest == keep:
+                break
+            path = self._forget(oldest)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Delete every cached file."""
+        for key in list(self._files):
+            try:
+                os.remove(self._forget(key))
+            except OSError:
+                pass
+
+    def cleanup(self) -> None:
+        """Remove the cache directory if this cache created it."""
+        self._files.clear()
+        self._total_bytes = 0
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
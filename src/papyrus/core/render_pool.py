@@ -0,0 +1,223 @@
+"""Pool of long-lived PDF renderer processes for batch conversion.
+
+Each worker starts a headless Qt application once, renders a throwaway page
+to warm up fonts (and QtWebEngine when used), then serves jobs over its own
+pipe. A job that runs past the timeout or takes its worker down only fails
+that job; the worker is replaced and the rest of the batch carries on.
+
+Workers are started with the "spawn" method so a parent that has already
+loaded Qt never forks it. Importing this module does not import Qt.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+DEFAULT_TIMEOUT = 120.0
+
+# Sent in place of a job to ask a worker to exit
+_STOP = None
+
+
+def render_pdf_job(source: Path, target: Path, options, engine: str = "auto") -> tuple:
+    """Default job function: convert one HTML file to PDF in the worker.
+
+    Args:
+        source: HTML file to read
+        target: PDF file to write
+        options: Render options
+        engine: PDF engine name from papyrus.core.pdf.ENGINES
+
+    Returns:
+        Tuple of (source, target, bytes read, bytes written, error message or None)
+    """
+    from papyrus.cli import convert_file  # pylint: disable=import-outside-toplevel
+
+    return convert_file(source, target, options, pdf_engine=engine)
+
+
+def _warm_up(engine: str) -> None:
+    from papyrus.core.pdf import export_pdf  # pylint: disable=import-outside-toplevel
+
+    with tempfile.TemporaryDirectory(prefix="papyrus-warmup-") as tmp:
+        export_pdf("<p>warm-up</p>", os.path.join(tmp, "warmup.pdf"), engine=engine)
+
+
+def _worker_main(conn, task: Callable, engine: str, warm_up: bool) -> None:
+    if warm_up:
+        _warm_up(engine)
+    conn.send("ready")
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is _STOP:
+            return
+        try:
+            result = task(*job, engine=engine)
+        except Exception as e:  # pylint: disable=broad-except
+            result = (job[0], job[1], 0, 0, f"{type(e).__name__}: {e}")
+        conn.send(result)
+
+
+class _Worker:
+    """One renderer process and the job it is working on."""
+
+    def __init__(self, ctx, task: Callable, engine: str, warm_up: bool):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, task, engine, warm_up),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.job: Optional[tuple] = None
+        self.deadline = 0.0
+
+    def assign(self, job: tuple, timeout: float) -> None:
+        self.job = job
+        self.deadline = time.monotonic() + timeout
+        self.conn.send(job)
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RendererPool:
+    """Render many documents to PDF on a fixed set of warm worker processes.
+
+    Use as a context manager so the workers are stopped afterwards:
+
+        with RendererPool(workers=4) as pool:
+            for source, target, size_in, size_out, error in pool.imap_unordered(jobs):
+                ...
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        engine: str = "auto",
+        task: Callable = render_pdf_job,
+        warm_up: bool = True,
+    ):
+        """Start the worker processes.
+
+        Args:
+            workers: Number of processes, defaults to the CPU count
+            timeout: Seconds a single job may run before its worker is killed
+            engine: PDF engine passed to every job
+            task: Module-level function called in the worker as
+                task(source, target, options, engine=engine) and returning a
+                (source, target, bytes in, bytes out, error) tuple
+            warm_up: Render a throwaway page when each worker starts
+        """
+        self.size = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.engine = engine
+        self.restarts = 0
+        self._task = task
+        self._warm_up = warm_up
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers = [self._start_worker() for _ in range(self.size)]
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._ctx, self._task, self.engine, self._warm_up)
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        self._workers[self._workers.index(worker)] = self._start_worker()
+        self.restarts += 1
+
+    def imap_unordered(self, jobs: Iterable[tuple]) -> Iterator[tuple]:
+        """Run jobs and yield their results as they finish.
+
+        Args:
+            jobs: (source, target, options) tuples
+
+        Yields:
+            (source, target, bytes in, bytes out, error) tuples in completion order
+
+        Raises:
+            RuntimeError: If a worker exits before it finishes starting up
+        """
+        pending = iter(jobs)
+        exhausted = False
+        while True:
+            for worker in self._workers:
+                if worker.ready and worker.job is None and not exhausted:
+                    job = next(pending, None)
+                    if job is None:
+                        exhausted = True
+                    else:
+                        worker.assign(tuple(job), self.timeout)
+            busy = [w for w in self._workers if w.job is not None]
+            if exhausted and not busy:
+                return
+
+            now = time.monotonic()
+            wait_for = min((w.deadline - now for w in busy), default=None)
+            handles = {}
+            for worker in self._workers:
+                handles[worker.conn] = worker
+                handles[worker.process.sentinel] = worker
+            ready = wait(list(handles), timeout=None if wait_for is None else max(0.0, wait_for))
+
+            for worker in {handles[h] for h in ready}:
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        message = None
+                    if message == "ready":
+                        worker.ready = True
+                        continue
+                    if message is not None:
+                        worker.job = None
+                        yield message
+                        continue
+                # The process exited without answering
+                job = worker.job
+                worker.process.join()
+                code = worker.process.exitcode
+                if not worker.ready:
+                    worker.kill()
+                    raise RuntimeError(f"PDF renderer failed to start (exit code {code})")
+                self._replace(worker)
+                if job is not None:
+                    yield job[0], job[1], 0, 0, f"renderer crashed (exit code {code})"
+
+            now = time.monotonic()
+            for worker in list(self._workers):
+                if worker.job is not None and now >= worker.deadline:
+                    job = worker.job
+                    self._replace(worker)
+                    yield job[0], job[1], 0, 0, f"timed out after {self.timeout:g}s"
+
+    def close(self) -> None:
+        """Stop every worker."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(_STOP)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            worker.kill()
+        self._workers = []
+
+    def __enter__(self) -> "RendererPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,727 @@
+"""Local HTTP service that runs the render pipeline for other tools.
+
+    POST /render?bands=1&theme=light        body: HTML   -> processed HTML
+    POST /render?format=pdf                 body: HTML   -> PDF
+    GET  /metrics                           Prometheus text format
+    GET  /health
+
+Render options are query parameters: wrapper, pdf_copy, bands, band_text,
+top_mm, bottom_mm, theme and format (html or pdf). Bodies may be sent with
+Content-Length or chunked transfer encoding, and connections are kept
+alive between requests.
+
+The event loop only moves bytes. Rendering runs on a pool of worker
+processes, at most one document per worker at a time; requests beyond
+that wait in a bounded queue and the rest are turned away with 503.
+Request bodies up to SPOOL_THRESHOLD are rendered in memory; larger ones
+are written to disk as they arrive, rendered file to file by
+papyrus.core.stream and sent back in chunks, so memory use does not grow
+with document size. PDFs are written by papyrus.core.pdf in separate
+"spawn" processes so Qt is never forked, and only when PySide6 is
+installed.
+
+The server only binds to loopback addresses. This module must not import Qt.
+"""
+
+import asyncio
+import ipaddress
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from papyrus import __version__
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.core.render_pool import DEFAULT_TIMEOUT
+from papyrus.core.stream import render_file
+from papyrus.core.themes import registry
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Requests that may wait for a worker before new ones get 503
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_MAX_BODY = 256 * 1024 * 1024
+# Seconds an idle keep-alive connection stays open
+DEFAULT_KEEP_ALIVE = 15.0
+# Request bodies larger than this are written to disk and streamed through the pipeline
+SPOOL_THRESHOLD = 8 * 1024 * 1024
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_IO_CHUNK = 256 * 1024
+_MAX_HEADER_BYTES = 64 * 1024
+# Bodies of rejected requests up to this size are skipped to keep the connection open
+_DISCARD_LIMIT = 1024 * 1024
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Content Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+_METRICS = {
+    "papyrus_requests_total": ("counter", "Requests answered, by path and status."),
+    "papyrus_request_duration_seconds": (
+        "histogram",
+        "Time from the request line to the last response byte, by path and format.",
+    ),
+    "papyrus_queue_wait_seconds": ("histogram", "Time rendering requests waited for a worker."),
+    "papyrus_render_duration_seconds": ("histogram", "Time spent rendering on a worker, by format."),
+    "papyrus_request_bytes_total": ("counter", "Request body bytes received."),
+    "papyrus_response_bytes_total": ("counter", "Response body bytes sent."),
+    "papyrus_rejected_total": ("counter", "Render requests turned away because the queue was full."),
+    "papyrus_connections_open": ("gauge", "Open client connections."),
+    "papyrus_renders_in_flight": ("gauge", "Render requests waiting for or running on a worker."),
+}
+
+
+class _RequestError(Exception):
+    """Ends a request with an HTTP error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: dict
+    version: str
+    headers: dict
+    # Whether the body has been read, so the next request can follow on the connection
+    body_read: bool = False
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return "keep-alive" in connection
+        return "close" not in connection
+
+
+@dataclass
+class _Body:
+    """A request body held in memory or, past SPOOL_THRESHOLD, in a file."""
+
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    size: int = 0
+
+
+class Metrics:
+    """Counters, gauges and fixed-bucket histograms in Prometheus text format."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # name -> {sorted label items: value}
+        self._values: dict = {name: {} for name in _METRICS}
+
+    def add(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter or gauge."""
+        series = self._values[name]
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one duration in a histogram."""
+        series = self._values[name]
+        key = tuple(sorted(labels.items()))
+        entry = series.get(key)
+        if entry is None:
+            # Per-bucket counts, then the sum and the total count
+            entry = series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                entry[i] += 1
+                break
+        entry[-2] += seconds
+        entry[-1] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Return a counter or gauge, or a histogram's count."""
+        value = self._values[name].get(tuple(sorted(labels.items())), 0)
+        return value[-1] if isinstance(value, list) else value
+
+    def exposition(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, (kind, help_text) in _METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(self._values[name].items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(key)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(key, le=_number(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {value[-1]}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: tuple, **extra) -> str:
+    items = [*key, *extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in items) + "}"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+@lru_cache(maxsize=None)
+def pdf_available() -> bool:
+    """Return True if PySide6 is installed, so PDFs can be rendered."""
+    return find_spec("PySide6") is not None
+
+
+def parse_options(query: dict) -> tuple:
+    """Build render options from /render query parameters.
+
+    Args:
+        query: Parameters as returned by urllib.parse.parse_qs
+
+    Returns:
+        Tuple of (RenderOptions, "html" or "pdf")
+
+    Raises:
+        ValueError: If a parameter is unknown or has an invalid value
+    """
+
+    def flag(name: str, default: bool) -> bool:
+        value = query.get(name, [None])[-1]
+        if value is None:
+            return default
+        if value.lower() in _TRUE:
+            return True
+        if value.lower() in _FALSE:
+            return False
+        raise ValueError(f"{name} must be 1 or 0, not {value!r}")
+
+    def integer(name: str, default: int) -> int:
+        value = query.get(name, [None])[-1]
+        try:
+            return default if value is None else int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer, not {value!r}") from None
+
+    unknown = set(query) - {
+        "wrapper", "pdf_copy", "bands", "band_text", "top_mm", "bottom_mm", "theme", "format"
+    }
+    if unknown:
+        raise ValueError(f"Unknown parameter: {', '.join(sorted(unknown))}")
+    defaults = RenderOptions()
+    output = query.get("format", ["html"])[-1].lower()
+    if output not in ("html", "pdf"):
+        raise ValueError(f"format must be html or pdf, not {output!r}")
+    theme = query.get("theme", [defaults.theme])[-1]
+    registry().get(theme)
+    options = RenderOptions(
+        add_wrapper=flag("wrapper", defaults.add_wrapper),
+        pdf_copy=flag("pdf_copy", defaults.pdf_copy),
+        print_bands=flag("bands", defaults.print_bands),
+        band_text=query.get("band_text", [defaults.band_text])[-1],
+        top_mm=integer("top_mm", defaults.top_mm),
+        bottom_mm=integer("bottom_mm", defaults.bottom_mm),
+        theme=theme,
+    )
+    return options, output
+
+
+def _render_bytes(data: bytes, options: RenderOptions) -> bytes:
+    return render_html(data.decode("utf-8", errors="replace"), options).encode("utf-8")
+
+
+def _render_path(source: str, target: str, options: RenderOptions) -> None:
+    render_file(source, target, options)
+
+
+def _render_pdf(source: str, target: str, options: RenderOptions, engine: str) -> None:
+    from papyrus.core.pdf import export_pdf  # pylint: disable=import-outside-toplevel
+
+    with open(source, encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    export_pdf(html, target, options, engine=engine)
+
+
+def check_loopback(host: str) -> None:
+    """Raise ValueError unless host is localhost or a loopback address."""
+    if host == "localhost":
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f"Refusing to listen on {host}: only loopback addresses are allowed")
+
+
+class RenderServer:
+    """asyncio HTTP/1.1 server in front of the render pipeline."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        jobs: Optional[int] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_body: int = DEFAULT_MAX_BODY,
+        timeout: float = DEFAULT_TIMEOUT,
+        pdf_engine: str = "auto",
+        pdf_workers: int = 1,
+        keep_alive_timeout: float = DEFAULT_KEEP_ALIVE,
+    ):
+        """Configure the server; start() binds it.
+
+        Args:
+            host: Loopback address to listen on
+            port: Port to listen on, 0 for any free port
+            jobs: Worker processes for HTML, None for the CPU count, 1 for one
+                thread in this process
+            max_queue: Render requests that may wait for a worker
+            max_body: Largest accepted request body in bytes
+            timeout: Seconds one render may take before the request fails with 504
+            pdf_engine: papyrus.core.pdf engine for format=pdf
+            pdf_workers: Processes that render PDFs
+            keep_alive_timeout: Seconds an idle connection is kept open
+
+        Raises:
+            ValueError: If host is not a loopback address
+        """
+        check_loopback(host)
+        self.host = host
+        self.port = port
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.timeout = timeout
+        self.pdf_engine = pdf_engine
+        self.pdf_workers = max(1, pdf_workers)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.metrics = Metrics()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._executors: dict = {}  # "html" or "pdf" -> Executor
+        self._slots: dict = {}  # "html" or "pdf" -> asyncio.Semaphore
+        self._in_flight = 0
+        self._connections: set = set()  # tasks serving open connections
+        self._spool_dir: Optional[str] = None
+        self._next_id = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Bind the listening socket and start accepting connections."""
+        self._spool_dir = tempfile.mkdtemp(prefix="papyrus-serve-")
+        self._slots = {
+            "html": asyncio.Semaphore(self.jobs),
+            "pdf": asyncio.Semaphore(self.pdf_workers),
+        }
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=_MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start if needed and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and shut the worker pools down."""
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() up
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+        if self._spool_dir is not None:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            self._spool_dir = None
+
+    def _executor(self, kind: str) -> Executor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == "pdf":
+                executor = ProcessPoolExecutor(
+                    self.pdf_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            elif self.jobs == 1:
+                executor = ThreadPoolExecutor(1, thread_name_prefix="papyrus-render")
+            else:
+                executor = ProcessPoolExecutor(self.jobs)
+            self._executors[kind] = executor
+        return executor
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        self.metrics.add("papyrus_connections_open", 1)
+        try:
+            while await self._handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled by close(); the connection just goes away
+            pass
+        finally:
+            self._connections.discard(task)
+            self.metrics.add("papyrus_connections_open", -1)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer one request; return whether the connection stays open."""
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout
+            )
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return False
+        except asyncio.LimitOverrunError:
+            await self._send(writer, 431, b"Request headers too large\n", keep_alive=False)
+            return False
+        started = time.perf_counter()
+        try:
+            request = _parse_head(head)
+        except _RequestError as e:
+            await self._send(writer, e.status, f"{e}\n".encode("utf-8"), keep_alive=False)
+            return False
+
+        output = "-"
+        keep_alive = request.keep_alive
+        try:
+            if request.path == "/render":
+                if request.method != "POST":
+                    raise _RequestError(405, "Use POST")
+                try:
+                    options, output = parse_options(request.query)
+                except ValueError as e:  # ThemeError is a ValueError
+                    raise _RequestError(400, str(e)) from None
+                keep_alive = await self._render(request, reader, writer, options, output)
+                status = 200
+            elif request.path in ("/metrics", "/health"):
+                if request.method != "GET":
+                    raise _RequestError(405, "Use GET")
+                await self._drain_body(request, reader, writer)
+                if request.path == "/metrics":
+                    body = self.metrics.exposition().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    body = f"ok {__version__}\n".encode("utf-8")
+                    content_type = "text/plain; charset=utf-8"
+                status = 200
+                await self._send(writer, status, body, content_type, keep_alive)
+            else:
+                raise _RequestError(404, f"No such path: {request.path}")
+        except _RequestError as e:
+            status = e.status
+            if keep_alive and not request.body_read:
+                # An unread body would be taken for the next request
+                length = _declared_length(request)
+                keep_alive = length is not None and length <= _DISCARD_LIMIT
+                if keep_alive:
+                    await self._drain_body(request, reader, writer)
+            headers = {"Allow": "POST" if request.path == "/render" else "GET"} if status == 405 else {}
+            if status == 503:
+                headers["Retry-After"] = "1"
+            await self._send(writer, status, f"{e}\n".encode("utf-8"), keep_alive=keep_alive, headers=headers)
+
+        self.metrics.add("papyrus_requests_total", path=_metric_path(request.path), status=str(status))
+        self.metrics.observe(
+            "papyrus_request_duration_seconds",
+            time.perf_counter() - started,
+            path=_metric_path(request.path),
+            format=output,
+        )
+        return keep_alive
+
+    async def _render(
+        self,
+        request: _Request,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        options: RenderOptions,
+        output: str,
+    ) -> bool:
+        if output == "pdf" and not pdf_available():
+            raise _RequestError(501, "PDF output needs PySide6")
+        if self._in_flight >= self.jobs + self.pdf_workers + self.max_queue:
+            self.metrics.add("papyrus_rejected_total")
+            raise _RequestError(503, "Too many requests queued, retry later")
+        self._in_flight += 1
+        self.metrics.add("papyrus_renders_in_flight", 1)
+        self._next_id += 1
+        stem = os.path.join(self._spool_dir, str(self._next_id))
+        source = f"{stem}.in.html"
+        target = f"{stem}.out.{output}"
+        try:
+            # PDF engines read from a file anyway
+            body = await self._read_body(request, reader, writer, source, to_file=output == "pdf")
+            queued = time.perf_counter()
+            async with self._slots[output]:
+                self.metrics.observe("papyrus_queue_wait_seconds", time.perf_counter() - queued)
+                rendered = time.perf_counter()
+                if output == "pdf":
+                    result = await self._run(
+                        "pdf", _render_pdf, body.path, target, options, self.pdf_engine
+                    )
+                elif body.path is None:
+                    result = await self._run("html", _render_bytes, body.data, options)
+                else:
+                    result = await self._run("html", _render_path, body.path, target, options)
+                self.metrics.observe(
+                    "papyrus_render_duration_seconds", time.perf_counter() - rendered, format=output
+                )
+            content_type = "application/pdf" if output == "pdf" else "text/html; charset=utf-8"
+            if result is not None:
+                await self._send(writer, 200, result, content_type, request.keep_alive)
+            else:
+                await self._send_file(writer, target, content_type, request.keep_alive)
+        finally:
+            self._in_flight -= 1
+            self.metrics.add("papyrus_renders_in_flight", -1)
+            for path in (source, target):
+                if os.path.exists(path):
+                    os.remove(path)
+        return request.keep_alive
+
+    async def _run(self, kind: str, func, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor(kind), func, *args), self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise _RequestError(504, f"Rendering took longer than {self.timeout:g}s") from None
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            self._executors.pop(kind).shutdown(wait=False)
+            raise _RequestError(500, "Renderer crashed") from None
+        except (OSError, ValueError) as e:
+            raise _RequestError(500, f"Rendering failed: {e}") from None
+
+    async def _read_body(
+        self,
+        request: _Request,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        spool_path: str,
+        to_file: bool,
+    ) -> _Body:
+        """Read the request body into memory, or into spool_path once it is large."""
+        body = _Body()
+        chunks = []
+        spool = None
+        try:
+            async for chunk in _body_chunks(request, reader, writer):
+                body.size += len(chunk)
+                if body.size > self.max_body:
+                    raise _RequestError(413, f"Body larger than {self.max_body} bytes")
+                if spool is None and (to_file or body.size > SPOOL_THRESHOLD):
+                    spool = open(spool_path, "wb")  # pylint: disable=consider-using-with
+                    body.path = spool_path
+                    spool.writelines(chunks)
+                    chunks = []
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    chunks.append(chunk)
+            if spool is None and to_file:
+                spool = open(spool_path, "wb")  # pylint: disable=consider-using-with
+                body.path = spool_path
+        finally:
+            if spool is not None:
+                spool.close()
+        request.body_read = True
+        self.metrics.add("papyrus_request_bytes_total", body.size)
+        if body.path is None:
+            body.data = b"".join(chunks)
+        return body
+
+    async def _drain_body(
+        self, request: _Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        size = 0
+        async for chunk in _body_chunks(request, reader, writer, required=False):
+            size += len(chunk)
+            if size > _DISCARD_LIMIT:
+                raise _RequestError(413, "Unexpected request body")
+        request.body_read = True
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        content_type: str = "text/plain; charset=utf-8",
+        keep_alive: bool = True,
+        headers: Optional[dict] = None,
+    ) -> None:
+        writer.write(_response_head(status, content_type, len(body), keep_alive, headers))
+        writer.write(body)
+        await writer.drain()
+        self.metrics.add("papyrus_response_bytes_total", len(body))
+
+    async def _send_file(
+        self, writer: asyncio.StreamWriter, path: str, content_type: str, keep_alive: bool
+    ) -> None:
+        size = os.path.getsize(path)
+        writer.write(_response_head(200, content_type, size, keep_alive))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_IO_CHUNK), b""):
+                writer.write(chunk)
+                # Wait for the client so the whole file is never buffered
+                await writer.drain()
+        self.metrics.add("papyrus_response_bytes_total", size)
+
+
+def _metric_path(path: str) -> str:
+    # Unknown paths share one label so scanners cannot grow the series without bound
+    return path if path in ("/render", "/metrics", "/health") else "other"
+
+
+def _declared_length(request: _Request) -> Optional[int]:
+    """Return the Content-Length, 0 without one, or None for chunked or invalid bodies."""
+    if request.headers.get("transfer-encoding"):
+        return None
+    try:
+        length = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
+def _parse_head(head: bytes) -> _Request:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise _RequestError(400, "Malformed request line") from None
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise _RequestError(400, f"Unsupported protocol {version}")
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise _RequestError(400, "Malformed header line")
+        name = name.strip().lower()
+        value = value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    url = urlsplit(target)
+    return _Request(method, url.path, parse_qs(url.query, keep_blank_values=True), version, headers)
+
+
+async def _body_chunks(
+    request: _Request,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    required: bool = True,
+):
+    """Yield the request body as it arrives, decoding chunked transfer encoding."""
+    if request.headers.get("expect", "").lower() == "100-continue":
+        # Clients such as curl wait for this before sending large bodies
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+    encoding = request.headers.get("transfer-encoding", "").lower()
+    if encoding:
+        if encoding != "chunked":
+            raise _RequestError(501, f"Unsupported transfer encoding {encoding}")
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise _RequestError(400, "Malformed chunk size") from None
+            if size == 0:
+                # Skip any trailer fields
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return
+            async for chunk in _read_exactly(reader, size):
+                yield chunk
+            if await reader.readexactly(2) != b"\r\n":
+                raise _RequestError(400, "Malformed chunk")
+        return
+    length = request.headers.get("content-length")
+    if length is None:
+        if required:
+            raise _RequestError(411, "Send Content-Length or a chunked body")
+        return
+    try:
+        remaining = int(length)
+    except ValueError:
+        remaining = -1
+    if remaining < 0:
+        raise _RequestError(400, "Invalid Content-Length")
+    async for chunk in _read_exactly(reader, remaining):
+        yield chunk
+
+
+async def _read_exactly(reader: asyncio.StreamReader, size: int):
+    while size:
+        chunk = await reader.read(min(size, _IO_CHUNK))
+        if not chunk:
+            raise asyncio.IncompleteReadError(b"", size)
+        size -= len(chunk)
+        yield chunk
+
+
+def _response_head(
+    status: int,
+    content_type: str,
+    length: int,
+    keep_alive: bool,
+    headers: Optional[dict] = None,
+) -> bytes:
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {length}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        "Server: Papyrus",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
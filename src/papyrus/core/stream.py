@@ -0,0 +1,388 @@
+"""Chunked version of render_html for files larger than memory.
+
+render_html holds the whole document plus several full-size intermediate
+copies. Here every stage is a generator over text chunks, so memory stays
+proportional to the chunk size whatever the input size.
+
+Stages that match multi-character patterns hold back the last few
+characters of each chunk, so a "\\r\\n" or "user-select:none" split across
+two reads is still found. The decisions render_html makes from the whole
+text (is there a </head>, which one is the last, is the document already
+wrapped) come from a first read of the file that only counts markers;
+the second read produces the output. Output matches render_html, except
+that an unterminated "<body" tag gets its bands at the end of the
+document rather than the start.
+
+This module must not import Qt.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+from papyrus.core.pipeline import (
+    _PDF_COPY_CHAR_REPLACEMENTS,
+    _PDF_COPY_STYLE_BLOCK,
+    _NON_SELECTABLE_TOKENS,
+    CODE_VIEW_PREFIX,
+    CODE_VIEW_SUFFIX,
+    RenderOptions,
+    escape_code,
+    get_styled_wrapper,
+    print_band_markup,
+)
+from papyrus.utils import perf
+
+# Characters per read; stages add at most a few dozen characters of carry
+CHUNK_SIZE = 1 << 20
+
+_TOKEN_REPLACEMENTS = {
+    token: replacement for _, tokens, replacement in _NON_SELECTABLE_TOKENS for token in tokens
+}
+_TOKEN_RE = re.compile("|".join(re.escape(token) for token in _TOKEN_REPLACEMENTS))
+_MARKERS = ("</head>", "</html>", "<html", "<body", "pdf-copy-sanitize")
+# ASCII-only case folding matches str.lower() for these markers
+_MARKER_RE = re.compile("|".join(_MARKERS), re.IGNORECASE | re.ASCII)
+_HEAD_CLOSE_RE = re.compile(r"</head>", re.IGNORECASE | re.ASCII)
+_HTML_CLOSE_RE = re.compile(r"</html>", re.IGNORECASE | re.ASCII)
+_BODY_RE = re.compile(r"<body", re.IGNORECASE | re.ASCII)
+
+_WRAPPER_SLOT = "\x00papyrus-content\x00"
+
+
+@dataclass
+class DocumentMarkers:
+    """Counts of the markers render_html looks for, from the first read."""
+
+    head_closes: int = 0
+    html_closes: int = 0
+    has_html: bool = False
+    has_body: bool = False
+    sanitized: bool = False
+
+    def add(self, marker: str, count: int = 1) -> None:
+        if not count:
+            return
+        marker = marker.lower()
+        if marker == "</head>":
+            self.head_closes += count
+        elif marker == "</html>":
+            self.html_closes += count
+        elif marker == "<html":
+            self.has_html = True
+        elif marker == "<body":
+            self.has_body = True
+        else:
+            self.sanitized = True
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the file as text chunks, decoding UTF-8 like the CLI does.
+
+    Line endings are left alone; sanitizing normalizes them.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def substitute(
+    chunks: Iterable[str],
+    pattern: re.Pattern,
+    replace: Callable,
+    longest: int,
+    required: Optional[str] = None,
+) -> Iterator[str]:
+    """Stream re.sub() over chunks.
+
+    Matches starting in the last longest - 1 characters of a chunk are
+    carried into the next one, so the result equals pattern.sub() on the
+    joined text.
+
+    Args:
+        chunks: Text chunks
+        pattern: Compiled pattern
+        replace: Called with each match, returns the replacement text
+        longest: Length of the longest possible match
+        required: Substring of every match; chunks without it skip the regex
+
+    Yields:
+        Replaced text chunks
+    """
+    hold = longest - 1
+    carry = ""
+    for chunk in chunks:
+        buf = carry + chunk if carry else chunk
+        cut = len(buf) - hold
+        if cut <= 0:
+            carry = buf
+            continue
+        if required is not None and required not in buf:
+            carry = buf[cut:]
+            yield buf[:cut]
+            continue
+        parts = []
+        pos = 0
+        for match in pattern.finditer(buf):
+            if match.start() >= cut:
+                break
+            parts.append(buf[pos : match.start()])
+            parts.append(replace(match))
+            pos = match.end()
+        end = max(cut, pos)
+        parts.append(buf[pos:end])
+        carry = buf[end:]
+        yield "".join(parts)
+    if carry:
+        yield pattern.sub(replace, carry)
+
+
+def normalize_characters(chunks: Iterable[str]) -> Iterator[str]:
+    """Normalize line endings and drop invisible characters.
+
+    Only "\\r\\n" spans two characters, so a trailing "\\r" is the only carry.
+    """
+    carry = ""
+    for chunk in chunks:
+        s = carry + chunk if carry else chunk
+        carry = ""
+        if s.endswith("\r"):
+            s, carry = s[:-1], "\r"
+        if "\r" in s:
+            s = s.replace("\r\n", "\n").replace("\r", "\n")
+        if not s.isascii():
+            for ch, replacement in _PDF_COPY_CHAR_REPLACEMENTS:
+                if ch in s:
+                    s = s.replace(ch, replacement)
+        yield s
+    if carry:
+        yield "\n"
+
+
+def sanitize_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Character and CSS fixes of sanitize_for_pdf_copy, without the style block."""
+    longest = max(len(token) for token in _TOKEN_REPLACEMENTS)
+    return substitute(
+        normalize_characters(chunks),
+        _TOKEN_RE,
+        lambda m: _TOKEN_REPLACEMENTS[m.group()],
+        longest,
+        required="none",
+    )
+
+
+def scan_markers(chunks: Iterable[str]) -> DocumentMarkers:
+    """Count the markers in sanitized chunks without keeping the text."""
+    markers = DocumentMarkers()
+    hold = max(len(marker) for marker in _MARKERS) - 1
+    carry = ""
+    for chunk in chunks:
+        buf = carry + chunk if carry else chunk
+        cut = len(buf) - hold
+        if cut <= 0:
+            carry = buf
+            continue
+        carry = buf[cut:]
+        lower = buf.lower()
+        if len(lower) == len(buf):
+            # Count markers starting before cut; none of them can overlap itself
+            for marker in _MARKERS:
+                markers.add(marker, lower.count(marker, 0, cut + len(marker) - 1))
+        else:
+            for match in _MARKER_RE.finditer(buf, 0, cut + hold):
+                if match.start() < cut:
+                    markers.add(match.group())
+    for match in _MARKER_RE.finditer(carry):
+        markers.add(match.group())
+    return markers
+
+
+def insert_before(
+    chunks: Iterable[str], pattern: re.Pattern, occurrence: int, text: str
+) -> Iterator[str]:
+    """Insert text before the given 1-based occurrence of a fixed-length pattern."""
+    seen = 0
+
+    def replace(match):
+        nonlocal seen
+        seen += 1
+        return text + match.group() if seen == occurrence else match.group()
+
+    return substitute(chunks, pattern, replace, len(pattern.pattern))
+
+
+def insert_after_body_tag(chunks: Iterable[str], text: str) -> Iterator[str]:
+    """Insert text after the '>' closing the first <body tag."""
+    carry = ""
+    waiting_for_body = True
+    chunks = iter(chunks)
+    for chunk in chunks:
+        buf = carry + chunk
+        carry = ""
+        if waiting_for_body:
+            match = _BODY_RE.search(buf)
+            if match is None:
+                hold = len("<body") - 1
+                carry = buf[-hold:]
+                yield buf[:-hold]
+                continue
+            waiting_for_body = False
+            yield buf[: match.end()]
+            buf = buf[match.end() :]
+        close = buf.find(">")
+        if close < 0:
+            yield buf
+            continue
+        yield buf[: close + 1] + text + buf[close + 1 :]
+        yield from chunks
+        return
+    if carry:
+        yield carry
+    yield text
+
+
+def escape_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    # Every escaped character is a single character, so no carry is needed
+    for chunk in chunks:
+        yield escape_code(chunk)
+
+
+def _wrapper_parts(colors: Optional[dict], now: Optional[datetime], theme: str) -> tuple:
+    return tuple(get_styled_wrapper(_WRAPPER_SLOT, colors, now, theme).split(_WRAPPER_SLOT))
+
+
+def iter_render(
+    path: str,
+    options: Optional[RenderOptions] = None,
+    colors: Optional[dict] = None,
+    now: Optional[datetime] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield render_html(<file contents>, options, colors, now) in chunks.
+
+    The file is read twice and must not change in between.
+
+    Args:
+        path: HTML file to render
+        options: Render options, defaults to RenderOptions()
+        colors: Color palette for the styling wrapper
+        now: Timestamp for the wrapper title, defaults to the current time
+        chunk_size: Characters per read
+
+    Yields:
+        Output text chunks
+    """
+    return iter_render_chunks(lambda: read_chunks(path, chunk_size), options, colors, now)
+
+
+def iter_render_chunks(
+    open_chunks: Callable[[], Iterable[str]],
+    options: Optional[RenderOptions] = None,
+    colors: Optional[dict] = None,
+    now: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Yield render_html(<joined chunks>, options, colors, now) in chunks.
+
+    Args:
+        open_chunks: Returns a fresh iterator over the source text; called twice
+        options: Render options, defaults to RenderOptions()
+        colors: Color palette for the styling wrapper
+        now: Timestamp for the wrapper title, defaults to the current time
+
+    Yields:
+        Output text chunks
+    """
+    options = options or RenderOptions()
+    markers = scan_markers(sanitize_chunks(open_chunks()))
+    stream = sanitize_chunks(open_chunks())
+    prefix, suffix = "", ""
+
+    # sanitize_for_pdf_copy: style block before the last </head>, or first
+    if not markers.sanitized:
+        if markers.head_closes:
+            stream = insert_before(
+                stream, _HEAD_CLOSE_RE, markers.head_closes, _PDF_COPY_STYLE_BLOCK
+            )
+        elif markers.has_html or markers.has_body:
+            prefix = _PDF_COPY_STYLE_BLOCK
+
+    # From here on the text is prefix + stream + suffix
+    content_markers = markers
+    if options.pdf_copy:
+        stream = escape_chunks(_chain(prefix, stream))
+        prefix, suffix = CODE_VIEW_PREFIX, CODE_VIEW_SUFFIX
+        content_markers = DocumentMarkers()
+
+    wrapped = options.add_wrapper and not (content_markers.has_html and content_markers.has_body)
+    if wrapped:
+        wrap_head, wrap_tail = _wrapper_parts(colors, now, options.theme)
+        prefix, suffix = wrap_head + prefix, suffix + wrap_tail
+
+    band_text = (options.band_text or "").strip()
+    if options.print_bands and band_text:
+        css, bands = print_band_markup(band_text, options.top_mm, options.bottom_mm)
+        # The last </head> is in the content if it has one, else in the wrapper
+        if content_markers.head_closes:
+            stream = insert_before(stream, _HEAD_CLOSE_RE, content_markers.head_closes, css)
+        elif wrapped:
+            idx = prefix.lower().rfind("</head>")
+            prefix = prefix[:idx] + css + prefix[idx:]
+        else:
+            prefix = css + prefix
+        # The wrapper's <body> comes before any content
+        if wrapped:
+            idx = prefix.lower().find(">", prefix.lower().find("<body")) + 1
+            prefix = prefix[:idx] + bands + prefix[idx:]
+        elif content_markers.has_body:
+            stream = insert_after_body_tag(_chain(prefix, stream), bands)
+            prefix = ""
+        elif content_markers.html_closes:
+            stream = insert_before(stream, _HTML_CLOSE_RE, content_markers.html_closes, bands)
+        else:
+            suffix += bands
+
+    yield from _chain(prefix, stream)
+    if suffix:
+        yield suffix
+
+
+def _chain(first: str, rest: Iterable[str]) -> Iterator[str]:
+    if first:
+        yield first
+    yield from rest
+
+
+@perf.timed("stream.render")
+def render_file(
+    source: str,
+    target: str,
+    options: Optional[RenderOptions] = None,
+    colors: Optional[dict] = None,
+    now: Optional[datetime] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple:
+    """Render an HTML file to another file without loading either into memory.
+
+    Args:
+        source: HTML file to read
+        target: File to write the processed HTML to
+        options: Render options, defaults to RenderOptions()
+        colors: Color palette for the styling wrapper
+        now: Timestamp for the wrapper title, defaults to the current time
+        chunk_size: Characters per read
+
+    Returns:
+        Tuple of (bytes read, bytes written)
+
+    Raises:
+        OSError: If either file cannot be accessed
+    """
+    with open(target, "w", encoding="utf-8", newline="") as out:
+        for chunk in iter_render(source, options, colors, now, chunk_size):
+            out.write(chunk)
+    return os.path.getsize(source), os.path.getsize(target)
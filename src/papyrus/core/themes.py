@@ -0,0 +1,290 @@
+"""Theme registry and compiled, cached CSS bundles for the styling wrapper.
+
+A theme is a JSON file in src/papyrus/themes/ or in a directory listed in
+PAPYRUS_THEME_PATH, named after its id::
+
+    {
+      "name": "Papyrus Dark",
+      "colors": {"dark_grey": "#1e1e1e", ...},
+      "tokens": {"tag": "#FF5A09", ...},
+      "css": "optional extra rules"
+    }
+
+Colors and tokens a theme leaves out come from the default theme. Each
+theme is compiled once into a minified CSS bundle, kept in memory and on
+disk under a digest of the theme and the stylesheet, so switching themes
+or rendering many documents with one reuses the same bundle.
+
+This module must not import Qt.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import re
+import threading
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Optional
+
+BUILTIN_THEME_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "themes")
+DEFAULT_THEME = "dark"
+
+_STYLESHEET = """\
+* {{ margin: 0; padding: 0; box-sizing: border-box; }}
+body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, {dark_grey} 0%, {darker_grey} 100%); color: {white}; min-height: 100vh; line-height: 1.8; padding: 60px 40px; }}
+.container {{ max-width: 900px; margin: 0 auto; background: rgba(57, 57, 57, 0.4); backdrop-filter: blur(20px); border-radius: 20px; padding: 40px; border: 1px solid rgba(255, 90, 9, 0.2); box-shadow: 0 20px 40px rgba(0, 0, 0, 0.4); }}
+h1, h2, h3, h4, h5, h6 {{ color: {light_orange}; margin-bottom: 20px; margin-top: 30px; }}
+h1:first-child {{ margin-top: 0; }}
+a {{ color: {deep_orange}; text-decoration: none; transition: color 0.3s ease; }}
+a:hover {{ color: {light_orange}; text-decoration: underline; }}
+code {{ background: rgba(255, 90, 9, 0.1); color: {light_orange}; padding: 2px 6px; border-radius: 4px; font-family: 'SF Mono', monospace; font-variant-ligatures: none; -webkit-user-select: text; user-select: text; }}
+pre {{ background: {darker_grey}; padding: 20px; border-radius: 10px; overflow-x: auto; margin: 20px 0; border: 1px solid rgba(255, 90, 9, 0.2); -webkit-user-select: text; user-select: text; white-space: pre; tab-size: 4; -moz-tab-size: 4; }}
+blockquote {{ border-left: 4px solid {deep_orange}; padding-left: 20px; margin: 20px 0; font-style: italic; color: rgba(255, 255, 255, 0.8); }}
+hr {{ border: none; height: 1px; background: linear-gradient(90deg, transparent, {orange_yellow}, transparent); margin: 30px 0; }}
+table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid rgba(255, 90, 9, 0.2); }}
+th {{ background: rgba(255, 90, 9, 0.1); color: {light_orange}; font-weight: 600; }}
+@media print {{ body {{ background: white; color: black; padding: 20px; }} .container {{ background: white; box-shadow: none; border: none; padding: 0; }} h1, h2, h3, h4, h5, h6 {{ color: {dark_grey}; }} a {{ color: {orange_yellow}; }} code {{ background: #f0f0f0; }} pre {{ background: #f5f5f5; border: 1px solid #ddd; }} }}
+"""
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r" ?([{};,>]) ?")
+_COLON_RE = re.compile(r": ")
+
+
+class ThemeError(ValueError):
+    """A theme is unknown or its file is invalid."""
+
+
+@dataclass(frozen=True, eq=False)
+class Theme:
+    """A loaded theme with every color filled in."""
+
+    id: str
+    name: str
+    colors: dict
+    tokens: dict
+    css: str = ""
+
+    @cached_property
+    def digest(self) -> str:
+        """Hash of everything the compiled bundle depends on."""
+        h = hashlib.sha256(_STYLESHEET.encode("utf-8"))
+        h.update(
+            json.dumps([self.colors, self.tokens, self.css], sort_keys=True).encode("utf-8")
+        )
+        return h.hexdigest()[:32]
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and the whitespace CSS does not need."""
+    css = _SPACE_RE.sub(" ", _COMMENT_RE.sub("", css))
+    css = _COLON_RE.sub(":", _PUNCTUATION_RE.sub(r"\1", css))
+    return css.replace(";}", "}").strip()
+
+
+def compile_css(theme: Theme) -> str:
+    """Return the minified wrapper stylesheet for a theme.
+
+    Raises:
+        ThemeError: If the theme lacks a color the stylesheet uses
+    """
+    try:
+        css = _STYLESHEET.format(**theme.colors)
+    except KeyError as e:
+        raise ThemeError(f"Theme {theme.id!r} has no color {e}") from e
+    return minify_css(css + theme.css)
+
+
+def load_theme(path: str, base: Optional[Theme] = None) -> Theme:
+    """Read a theme file.
+
+    Args:
+        path: JSON theme file; its name without extension is the theme id
+        base: Theme that supplies colors and tokens the file leaves out
+
+    Returns:
+        Loaded theme
+
+    Raises:
+        ThemeError: If the file cannot be read or is not a theme
+    """
+    theme_id = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ThemeError(f"Cannot load theme {path}: {e}") from e
+    if not isinstance(data, dict) or not all(
+        isinstance(data.get(key, {}), dict) for key in ("colors", "tokens")
+    ):
+        raise ThemeError(f"Cannot load theme {path}: expected colors and tokens objects")
+    return Theme(
+        id=theme_id,
+        name=str(data.get("name") or theme_id),
+        colors={**(base.colors if base else {}), **data.get("colors", {})},
+        tokens={**(base.tokens if base else {}), **data.get("tokens", {})},
+        css=str(data.get("css", "")),
+    )
+
+
+@lru_cache(maxsize=None)
+def builtin_theme(theme_id: str = DEFAULT_THEME) -> Theme:
+    """Load a theme shipped with Papyrus, without touching the registry."""
+    return load_theme(os.path.join(BUILTIN_THEME_DIR, f"{theme_id}.json"))
+
+
+@lru_cache(maxsize=16)
+def palette_css(colors_key: tuple) -> str:
+    """Compile the stylesheet for an explicit palette given as sorted items."""
+    default = builtin_theme()
+    theme = Theme(
+        id="custom", name="Custom", colors={**default.colors, **dict(colors_key)}, tokens={}
+    )
+    return compile_css(theme)
+
+
+def cache_root() -> str:
+    """Papyrus's cache directory: PAPYRUS_CACHE_DIR, else the user cache."""
+    base = os.environ.get("PAPYRUS_CACHE_DIR")
+    if base:
+        return base
+    if platform.system() == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "Papyrus")
+    return os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "papyrus",
+    )
+
+
+def default_cache_dir() -> str:
+    """Directory for compiled bundles."""
+    return os.path.join(cache_root(), "themes")
+
+
+class ThemeRegistry:
+    """Themes found in the built-in and user theme directories.
+
+    Later directories override earlier ones, so a user theme named "dark"
+    replaces the built-in one. Themes are loaded on first use.
+    """
+
+    def __init__(self, directories: Optional[list] = None, cache_dir: Optional[str] = None):
+        """Create the registry.
+
+        Args:
+            directories: Extra theme directories, defaults to PAPYRUS_THEME_PATH
+            cache_dir: Where compiled bundles are kept, defaults to default_cache_dir();
+                an empty string keeps them in memory only
+        """
+        if directories is None:
+            directories = [
+                d for d in os.environ.get("PAPYRUS_THEME_PATH", "").split(os.pathsep) if d
+            ]
+        self.directories = [BUILTIN_THEME_DIR, *directories]
+        self.cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        self._themes: Optional[dict] = None
+        self._bundles: dict = {}  # digest -> css
+        self._lock = threading.Lock()
+
+    def reload(self) -> None:
+        """Forget loaded themes so edited files are picked up."""
+        with self._lock:
+            self._themes = None
+            self._bundles.clear()
+
+    def _load(self) -> dict:
+        with self._lock:
+            if self._themes is None:
+                paths = {}
+                for directory in self.directories:
+                    try:
+                        names = sorted(os.listdir(directory))
+                    except OSError:
+                        continue
+                    for name in names:
+                        if name.endswith(".json"):
+                            paths[name[:-5]] = os.path.join(directory, name)
+                # A user "dark.json" may override only part of the built-in one
+                base = load_theme(
+                    paths.pop(DEFAULT_THEME, os.path.join(BUILTIN_THEME_DIR, f"{DEFAULT_THEME}.json")),
+                    builtin_theme(),
+                )
+                themes = {DEFAULT_THEME: base}
+                for theme_id, path in paths.items():
+                    themes[theme_id] = load_theme(path, base)
+                self._themes = themes
+            return self._themes
+
+    def ids(self) -> list:
+        """Theme ids, the default first and the rest by name."""
+        themes = self._load()
+        return [DEFAULT_THEME] + sorted(
+            (t for t in themes if t != DEFAULT_THEME), key=lambda t: themes[t].name.lower()
+        )
+
+    def get(self, theme_id: str) -> Theme:
+        """Return a theme by id.
+
+        Raises:
+            ThemeError: If no such theme exists
+        """
+        try:
+            return self._load()[theme_id]
+        except KeyError:
+            raise ThemeError(
+                f"Unknown theme {theme_id!r} (available: {', '.join(self.ids())})"
+            ) from None
+
+    def css(self, theme_id: str = DEFAULT_THEME) -> str:
+        """Return a theme's compiled bundle, compiling and caching it on a miss.
+
+        Raises:
+            ThemeError: If the theme is unknown or incomplete
+        """
+        theme = self.get(theme_id)
+        digest = theme.digest
+        css = self._bundles.get(digest)
+        if css is not None:
+            return css
+        path = os.path.join(self.cache_dir, f"{digest}.css") if self.cache_dir else None
+        css = _read_bundle(path) if path else None
+        if css is None:
+            css = compile_css(theme)
+            if path:
+                _write_bundle(path, css)
+        return self._bundles.setdefault(digest, css)
+
+
+def _read_bundle(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_bundle(path: str, css: str) -> None:
+    # A read-only or full cache only costs a recompile next time
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.{os.getpid()}.part"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(css)
+        os.replace(partial, path)
+    except OSError:
+        pass
+
+
+_registry: Optional[ThemeRegistry] = None
+
+
+def registry() -> ThemeRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _registry  # pylint: disable=global-statement
+    if _registry is None:
+        _registry = ThemeRegistry()
+    return _registry
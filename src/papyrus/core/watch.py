@@ -0,0 +1,299 @@
+"""Keep a mirrored folder of processed HTML up to date.
+
+WatchFolder records the size, modification time and content hash of every
+source it renders, and the options it rendered with, in a SQLite manifest.
+A later pass only renders files whose content or options changed; files
+whose size and modification time still match the manifest are skipped on
+their os.scandir() entry alone, so a pass that finds nothing to do opens
+no files.
+
+Watching polls instead of subscribing to file system events, which works
+the same on every platform and on network shares. Files modified within
+the debounce window are left for the next pass, so a burst of writes is
+rendered once, after it settles.
+
+This module must not import Qt.
+"""
+
+import dataclasses
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from papyrus import __version__
+from papyrus.core.pipeline import RenderOptions
+from papyrus.core.themes import registry
+
+MANIFEST_NAME = ".papyrus-manifest.sqlite3"
+DEFAULT_SUFFIXES = (".html", ".htm")
+# Seconds a file must go unmodified before it is rendered
+DEFAULT_DEBOUNCE = 0.5
+_HASH_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    options TEXT NOT NULL
+);
+"""
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 of a file's bytes, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def options_key(options: RenderOptions) -> str:
+    """Return a digest of everything besides the source that shapes the output.
+
+    Raises:
+        ThemeError: If options.theme is unknown
+    """
+    h = hashlib.sha256(__version__.encode("utf-8"))
+    h.update(repr(dataclasses.astuple(options)).encode("utf-8"))
+    if options.add_wrapper:
+        h.update(registry().get(options.theme).digest.encode("ascii"))
+    return h.hexdigest()[:32]
+
+
+@dataclasses.dataclass
+class SyncResult:
+    """What one WatchFolder.sync() pass did."""
+
+    converted: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    # Changed files left for a later pass because they are still being written
+    pending: int = 0
+    failed: list = dataclasses.field(default_factory=list)  # (source, error)
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.converted or self.removed or self.failed)
+
+
+class Manifest:
+    """Per-source size, modification time, content hash and options key."""
+
+    def __init__(self, path: str):
+        """Open or create the manifest database.
+
+        Args:
+            path: Database file, or ":memory:"
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def entries(self) -> dict:
+        """Return {relative path: (size, mtime_ns, digest, options key)}."""
+        rows = self._conn.execute("SELECT path, size, mtime_ns, digest, options FROM files")
+        return {row[0]: row[1:] for row in rows}
+
+    def update(self, rows: list, removed: list) -> None:
+        """Store rows of (path, size, mtime_ns, digest, options) and drop removed paths."""
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in removed))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class WatchFolder:
+    """Mirror a source tree of HTML files into an output tree of rendered files."""
+
+    def __init__(
+        self,
+        source: str,
+        output: str,
+        convert: Callable,
+        options_for: Callable[[Path], RenderOptions],
+        manifest_path: Optional[str] = None,
+        jobs: Optional[int] = 1,
+        debounce: float = DEFAULT_DEBOUNCE,
+        suffixes: tuple = DEFAULT_SUFFIXES,
+    ):
+        """Open the manifest for a source and output folder.
+
+        Args:
+            source: Folder of HTML files, searched recursively
+            output: Folder that mirrors the layout of source
+            convert: Called as convert(source, target, options) and returns
+                (source, target, bytes read, bytes written, error or None), like
+                papyrus.cli.convert_file; must be picklable when jobs is not 1
+            options_for: Returns the render options for a path relative to source
+            manifest_path: Manifest database, defaults to MANIFEST_NAME in output
+            jobs: Worker processes for rendering, None for the CPU count, 1 in-process
+            debounce: Seconds a changed file must go unmodified before it is rendered
+            suffixes: Lower-case extensions of the files to render
+        """
+        self.source = os.path.abspath(source)
+        self.output = os.path.abspath(output)
+        self.convert = convert
+        self.options_for = options_for
+        self.jobs = jobs
+        self.debounce = debounce
+        self.suffixes = suffixes
+        os.makedirs(self.output, exist_ok=True)
+        self.manifest = Manifest(manifest_path or os.path.join(self.output, MANIFEST_NAME))
+        self._known = self.manifest.entries()
+        self._option_keys: dict = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def scan(self) -> dict:
+        """Return {relative posix path: (absolute path, size, mtime_ns)} for every source file."""
+        found = {}
+        # The output folder may live inside the source folder
+        skip = self.output + os.sep
+        stack = [(self.source, "")]
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not (entry.path + os.sep).startswith(skip):
+                                stack.append((entry.path, f"{prefix}{entry.name}/"))
+                        elif os.path.splitext(entry.name)[1].lower() in self.suffixes:
+                            stat = entry.stat()
+                            found[prefix + entry.name] = (entry.path, stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        return found
+
+    def _options(self, relative: str) -> tuple:
+        options = self.options_for(Path(relative))
+        key = self._option_keys.get(options)
+        if key is None:
+            key = self._option_keys[options] = options_key(options)
+        return options, key
+
+    def sync(self, now: Optional[float] = None) -> SyncResult:
+        """Render new and changed files and remove the output of deleted ones.
+
+        Args:
+            now: Current time in seconds for the debounce check, defaults to time.time()
+
+        Returns:
+            What the pass did
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        result = SyncResult()
+        found = self.scan()
+        rows = []
+        todo = []
+        for relative, (path, size, mtime_ns) in found.items():
+            options, key = self._options(relative)
+            target = os.path.join(self.output, relative)
+            known = self._known.get(relative)
+            if known is not None and known[3] == key and os.path.exists(target):
+                if known[0] == size and known[1] == mtime_ns:
+                    result.unchanged += 1
+                    continue
+            if now - mtime_ns / 1e9 < self.debounce:
+                result.pending += 1
+                continue
+            try:
+                digest = file_digest(path)
+            except OSError as e:
+                result.failed.append((path, str(e)))
+                continue
+            row = (relative, size, mtime_ns, digest, key)
+            if known is not None and known[2:] == (digest, key) and os.path.exists(target):
+                # Touched or copied over with the same content
+                rows.append(row)
+                result.unchanged += 1
+                continue
+            todo.append((Path(path), Path(target), options, row))
+
+        for (_, _, _, row), (source, _, _, _, error) in zip(todo, self._convert_all(todo)):
+            if error:
+                result.failed.append((str(source), error))
+            else:
+                rows.append(row)
+                result.converted += 1
+
+        removed = [relative for relative in self._known if relative not in found]
+        for relative in removed:
+            try:
+                os.remove(os.path.join(self.output, relative))
+            except OSError:
+                pass
+        result.removed = len(removed)
+
+        if rows or removed:
+            self.manifest.update(rows, removed)
+            for row in rows:
+                self._known[row[0]] = row[1:]
+            for relative in removed:
+                del self._known[relative]
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _convert_all(self, todo: list):
+        sources = [job[0] for job in todo]
+        targets = [job[1] for job in todo]
+        options = [job[2] for job in todo]
+        if self.jobs == 1 or len(todo) < 2:
+            return map(self.convert, sources, targets, options)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        workers = self.jobs or os.cpu_count() or 1
+        chunksize = max(1, min(64, len(todo) // (workers * 4)))
+        return self._executor.map(self.convert, sources, targets, options, chunksize=chunksize)
+
+    def watch(
+        self,
+        interval: float = 1.0,
+        on_sync: Optional[Callable[[SyncResult], None]] = None,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> None:
+        """Sync, then poll for changes every interval seconds until should_stop() is true.
+
+        Args:
+            interval: Seconds between passes
+            on_sync: Called with the result of every pass
+            should_stop: Checked after every pass
+        """
+        while True:
+            result = self.sync()
+            if on_sync is not None:
+                on_sync(result)
+            if should_stop():
+                return
+            # Come back as soon as files still being written have settled
+            time.sleep(min(interval, self.debounce) if result.pending else interval)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.manifest.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -1,7 +1,9 @@
 import sys
 import os
+import time
 import traceback
-from PySide6.QtWidgets import QApplication
+
+_STARTED = time.perf_counter()
 
 # Add src directory to Python path to allow 'papyrus' package imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,13 +11,91 @@ src_dir = os.path.dirname(current_dir)
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
+# Modules that should not load before the first window is painted
+DEFERRED_MODULES = (
+    "bs4",
+    "sqlite3",
+    "webbrowser",
+    "importlib.metadata",
+    "papyrus.core.history",
+    "papyrus.core.mapped",
+)
+
+
+class StartupProfile:
+    """Wall-clock timings of the launch phases, printed by --profile-startup."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases = []
+        self._last = _STARTED
+
+    def mark(self, phase: str) -> None:
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append((phase, now - self._last))
+            self._last = now
+
+    def report(self, budget_ms: float = 0) -> int:
+        """Print the breakdown and return 1 if the startup budget was exceeded."""
+        total_ms = (self._last - _STARTED) * 1000
+        print("Papyrus startup profile", file=sys.stderr)
+        for phase, seconds in self.phases:
+            print(f"  {phase:<32} {seconds * 1000:8.1f} ms", file=sys.stderr)
+        print(f"  {'time to first paint':<32} {total_ms:8.1f} ms", file=sys.stderr)
+        loaded = [m for m in DEFERRED_MODULES if m in sys.modules]
+        print(
+            f"  deferred modules loaded early: {', '.join(loaded) or 'none'}",
+            file=sys.stderr,
+        )
+        if budget_ms and total_ms > budget_ms:
+            print(f"  over budget: {total_ms:.1f} ms > {budget_ms:g} ms", file=sys.stderr)
+            return 1
+        return 0
+
+
+def _parse_args(argv):
+    import argparse  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(prog="papyrus-gui", add_help=False)
+    parser.add_argument("--profile-startup", action="store_true")
+    parser.add_argument("--startup-budget-ms", type=float, default=0)
+    return parser.parse_known_args(argv)
+
 
 def main():
+    args, qt_args = _parse_args(sys.argv[1:])
+    profile = StartupProfile(args.profile_startup)
     try:
+        from PySide6.QtCore import QCoreApplication, QEvent, QObject, Qt, QTimer
+        from PySide6.QtWidgets import QApplication
+
+        profile.mark("import PySide6")
         from papyrus.core.app import HTMLConverterApp
 
-        app = QApplication(sys.argv)
+        profile.mark("import papyrus.core.app")
+        # QtWebEngine (live preview) is imported after the QApplication exists
+        QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+        app = QApplication(sys.argv[:1] + qt_args)
+        profile.mark("create QApplication")
         window = HTMLConverterApp()
+        profile.mark("build main window")
+
+        if profile.enabled:
+
+            class FirstPaint(QObject):
+                def eventFilter(self, obj, event):  # pylint: disable=invalid-name
+                    if event.type() == QEvent.Type.Paint:
+                        obj.removeEventFilter(self)
+                        profile.mark("show and first paint")
+                        QTimer.singleShot(
+                            0, lambda: app.exit(profile.report(args.startup_budget_ms))
+                        )
+                    return False
+
+            first_paint = FirstPaint(window)
+            window.installEventFilter(first_paint)
+
         window.show()
         sys.exit(app.exec())
     except Exception as e:
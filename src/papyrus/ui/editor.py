@@ -1,19 +1,153 @@
 """Custom text editor with page breaks and HTML paste handling."""
 # pylint: disable=invalid-name  # Qt override methods keep camelCase
-from PySide6.QtWidgets import QTextEdit, QApplication  # pylint: disable=no-name-in-module
-from PySide6.QtCore import Qt, QMimeData  # pylint: disable=no-name-in-module
-from PySide6.QtGui import QColor, QPainter, QPen  # pylint: disable=no-name-in-module
-from papyrus.utils.helpers import clean_pasted_html
+import itertools
 
-class PagedTextEdit(QTextEdit):
-    """Text editor with visual page break indicators and HTML paste handling."""
+from PySide6.QtWidgets import QPlainTextEdit, QApplication  # pylint: disable=no-name-in-module
+from PySide6.QtCore import (  # pylint: disable=no-name-in-module
+    Qt,
+    QMimeData,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QColor, QPainter, QPen, QTextCursor  # pylint: disable=no-name-in-module
+from papyrus.utils import perf
+from papyrus.utils.helpers import PRETTIFY_MAX_CHARS, clean_pasted_html
+
+# Pastes at least this long are inserted immediately and cleaned off the UI thread
+PASTE_ASYNC_THRESHOLD = 100_000
+
+# Blocks above and below the viewport reported as visible, so short scrolls
+# land on text that is already highlighted
+VISIBLE_BLOCK_MARGIN = 50
+
+
+def page_height_px() -> int:
+    """Return the height of an 11 inch page in screen pixels."""
+    try:
+        dpi = QApplication.primaryScreen().logicalDotsPerInch() or 96
+    except (AttributeError, RuntimeError):
+        dpi = 96
+    return int(round(11.0 * dpi))
+
+
+class _PasteCleanSignals(QObject):
+    """Signals for delivering a cleaned paste back to the GUI thread."""
+
+    finished = Signal(int, str, bool)
+
+
+class _PasteCleanTask(QRunnable):
+    """Run clean_pasted_html on a worker thread."""
+
+    def __init__(self, job_id: int, text: str, prettify_limit: int):
+        super().__init__()
+        self.job_id = job_id
+        self.text = text
+        self.prettify_limit = prettify_limit
+        self.signals = _PasteCleanSignals()
+
+    def run(self):
+        cleaned = clean_pasted_html(self.text, self.prettify_limit)
+        changed = cleaned != self.text
+        self.signals.finished.emit(self.job_id, cleaned if changed else "", changed)
+
+
+class PagedTextEdit(QPlainTextEdit):
+    """Plain-text editor with visual page break indicators and HTML paste handling.
+
+    QPlainTextEdit lays out only the blocks it shows and scrolls by line,
+    so opening, scrolling and typing in multi-megabyte sources does not wait
+    on a layout of the whole document. A page holds page_height_px() worth
+    of lines; each page break is drawn at the block edge nearest to it.
+    """
+
+    # Number of pastes still being cleaned in the background
+    pasteCleaningChanged = Signal(int)
+    # First and last block number on screen, widened by VISIBLE_BLOCK_MARGIN;
+    # emitted after scrolling, resizing and edits settle
+    visibleBlocksChanged = Signal(int, int)
 
     def __init__(self, *args, **kwargs):
         """Initialize the paged text editor."""
         super().__init__(*args, **kwargs)
         self._show_page_breaks = False
         self._line_color = QColor('#FF5A09')
-        self.verticalScrollBar().valueChanged.connect(self._request_repaint)
+        self.paste_async_threshold = PASTE_ASYNC_THRESHOLD
+        self.prettify_limit = PRETTIFY_MAX_CHARS
+        self._paste_job_ids = itertools.count(1)
+        self._paste_jobs: dict[int, tuple] = {}
+        self._visible_blocks_timer = QTimer(self)
+        self._visible_blocks_timer.setSingleShot(True)
+        self._visible_blocks_timer.setInterval(15)
+        self._visible_blocks_timer.timeout.connect(self._emit_visible_blocks)
+        self.verticalScrollBar().valueChanged.connect(self._visible_blocks_timer.start)
+        self._watch_document()
+
+    def setDocument(self, document):
+        """Replace the document and report its visible blocks.
+
+        Args:
+            document: New QTextDocument with a QPlainTextDocumentLayout
+        """
+        super().setDocument(document)
+        self._watch_document()
+
+    def _watch_document(self) -> None:
+        self.document().contentsChange.connect(self._visible_blocks_timer.start)
+        self._visible_blocks_timer.start()
+
+    def visible_blocks(self) -> tuple:
+        """Return the first and last block numbers shown in the viewport."""
+        block = self.firstVisibleBlock()
+        first = last = block.blockNumber()
+        offset = self.contentOffset()
+        bottom = self.viewport().height()
+        while block.isValid():
+            if self.blockBoundingGeometry(block).translated(offset).top() > bottom:
+                break
+            last = block.blockNumber()
+            block = block.next()
+        return first, last
+
+    def _emit_visible_blocks(self) -> None:
+        first, last = self.visible_blocks()
+        self.visibleBlocksChanged.emit(
+            max(0, first - VISIBLE_BLOCK_MARGIN), last + VISIBLE_BLOCK_MARGIN
+        )
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._visible_blocks_timer.start()
+
+    def lines_per_page(self) -> int:
+        """Return how many editor lines fit on one printed page."""
+        return max(1, max(100, self.page_height_px()) // max(1, self.fontMetrics().lineSpacing()))
+
+    @staticmethod
+    def _page_break_edge(block, lines_per_page: int):
+        """Return whether a page break snaps to a block's top or bottom edge.
+
+        Lines are counted with QTextBlock.firstLineNumber(), which the
+        plain-text layout keeps up to date and uses for the scroll bar too.
+
+        Args:
+            block: Block to check
+            lines_per_page: Lines per printed page
+
+        Returns:
+            "top", "bottom", or None when no page break falls in the block
+        """
+        start = block.firstLineNumber()
+        end = start + max(1, block.lineCount())
+        line = max(lines_per_page, -(-start // lines_per_page) * lines_per_page)
+        if line >= end:
+            return None
+        if line == start or line - start < end - line:
+            return "top"
+        return "bottom"
 
     def keyPressEvent(self, event):
         """Handle key press events.
@@ -57,12 +191,9 @@ class PagedTextEdit(QTextEdit):
         Returns:
             Page height in pixels
         """
-        try:
-            dpi = QApplication.primaryScreen().logicalDotsPerInch() or 96
-        except (AttributeError, RuntimeError):
-            dpi = 96
-        return int(round(11.0 * dpi))
+        return page_height_px()
 
+    @perf.timed("editor.paint")
     def paintEvent(self, event):
         """Paint the editor with page break lines.
 
@@ -78,47 +209,74 @@ class PagedTextEdit(QTextEdit):
         painter.setPen(pen)
         h = self.viewport().height()
         w = self.viewport().width()
-        page_h = max(100, self.page_height_px())
-        scroll_y = self.verticalScrollBar().value()
-        first_y = page_h - (scroll_y % page_h)
-        y = first_y
-        while y < h:
-            doc_y = y + scroll_y
-            layout = self.document().documentLayout()
-            blk = self.document().firstBlock()
-            boundary = 0.0
-            prev_bottom = 0.0
-            while blk.isValid():
-                rect = layout.blockBoundingRect(blk)
-                top = rect.top()
-                bottom = rect.bottom()
-                if doc_y < top:
-                    boundary = top
-                    break
-                if top <= doc_y <= bottom:
-                    boundary = top if (doc_y - top) < (bottom - doc_y) else bottom
-                    break
-                prev_bottom = bottom
-                blk = blk.next()
-            else:
-                boundary = prev_bottom
-            y_view = boundary - scroll_y
-            painter.drawLine(0, int(y_view), w, int(y_view))
-            y += page_h
+        lines_per_page = self.lines_per_page()
+        offset = self.contentOffset()
+        block = self.firstVisibleBlock()
+        while block.isValid():
+            rect = self.blockBoundingGeometry(block).translated(offset)
+            if rect.top() > h:
+                break
+            edge = self._page_break_edge(block, lines_per_page)
+            if edge is not None:
+                y = int(rect.top() if edge == "top" else rect.bottom())
+                painter.drawLine(0, y, w, y)
+            block = block.next()
         painter.end()
 
+    @perf.timed("editor.paste")
     def insertFromMimeData(self, source):
         """Insert data from clipboard with HTML cleaning.
 
+        Large pastes are inserted as-is right away and replaced with the
+        cleaned text once a worker thread finishes, unless the pasted range
+        has been edited in the meantime.
+
         Args:
             source: MIME data from clipboard
         """
         if source.hasText():
             text = source.text()
-            cleaned = clean_pasted_html(text)
+            if len(text) >= self.paste_async_threshold:
+                self._insert_and_clean_async(text)
+                return
+            cleaned = clean_pasted_html(text, self.prettify_limit)
             if cleaned != text:
                 new_source = QMimeData()
                 new_source.setText(cleaned)
                 super().insertFromMimeData(new_source)
                 return
         super().insertFromMimeData(source)
+
+    def _insert_and_clean_async(self, text: str) -> None:
+        """Insert raw pasted text and schedule cleaning on the thread pool."""
+        raw_source = QMimeData()
+        raw_source.setText(text)
+        start = self.textCursor().selectionStart()
+        super().insertFromMimeData(raw_source)
+        end = self.textCursor().position()
+        # A QTextCursor follows edits made elsewhere in the document
+        tracker = QTextCursor(self.document())
+        tracker.setPosition(start)
+        tracker.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+
+        job_id = next(self._paste_job_ids)
+        task = _PasteCleanTask(job_id, text, self.prettify_limit)
+        task.signals.finished.connect(self._apply_cleaned_paste)
+        self._paste_jobs[job_id] = (tracker, end - start, task.signals)
+        QThreadPool.globalInstance().start(task)
+        self.pasteCleaningChanged.emit(len(self._paste_jobs))
+
+    def _apply_cleaned_paste(self, job_id: int, cleaned: str, changed: bool) -> None:
+        """Replace a raw paste with its cleaned version if it is untouched."""
+        job = self._paste_jobs.pop(job_id, None)
+        self.pasteCleaningChanged.emit(len(self._paste_jobs))
+        if job is None or not changed:
+            return
+        tracker, length, _signals = job
+        if tracker.selectionEnd() - tracker.selectionStart() != length:
+            return
+        tracker.insertText(cleaned)
+
+    def is_cleaning_paste(self) -> bool:
+        """Return True while a background paste clean is in progress."""
+        return bool(self._paste_jobs)
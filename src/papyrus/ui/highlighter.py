@@ -1,9 +1,106 @@
 """HTML syntax highlighter for the text editor."""
+import re
+
 from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QTextDocument
-from PySide6.QtCore import QRegularExpression
+
+from papyrus.core.themes import builtin_theme
+from papyrus.utils import perf
+
+# One alternation for everything outside comments; the named group that
+# matched is the token kind. Doctype is tried before tags and '>'.
+_TOKEN_RE = re.compile(
+    r"(?P<doctype><!DOCTYPE[^>]*>)"
+    r"|(?P<tag></?[\w-]+(?=\s|/?>)|/?>)"
+    r"|(?P<attribute>\s[\w-]+=)"
+    r"|(?P<value>\"[^\"]*\"|'[^']*')"
+    r"|(?P<entity>&[a-zA-Z0-9#]+;)"
+)
+
+# Block state bits: inside an unclosed comment, and formatting deferred
+IN_COMMENT = 1
+PENDING = 2
+
+# Documents with fewer blocks are always highlighted in full
+DEFER_THRESHOLD_BLOCKS = 2000
+
+# Token colors of the default theme
+TOKEN_COLORS = dict(builtin_theme().tokens)
+
+
+def comment_spans(text: str, in_comment: bool = False) -> tuple:
+    """Find comment ranges in one line.
+
+    Args:
+        text: Line of text
+        in_comment: Whether the previous line ended inside a comment
+
+    Returns:
+        Tuple of (list of (start, end) ranges, whether the line ends inside a comment)
+    """
+    spans = []
+    start = 0 if in_comment else text.find("<!--")
+    while start >= 0:
+        end = text.find("-->", start)
+        if end < 0:
+            spans.append((start, len(text)))
+            return spans, True
+        end += 3
+        spans.append((start, end))
+        start = text.find("<!--", end)
+    return spans, False
+
+
+def build_formats(colors: dict) -> dict:
+    """Return a QTextCharFormat per token kind for a color palette.
+
+    Args:
+        colors: Hex color per token kind, as in TOKEN_COLORS
+
+    Returns:
+        Dict of token kind to format
+    """
+    formats = {}
+    for kind, color in colors.items():
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        formats[kind] = fmt
+    formats['tag'].setFontWeight(700)  # Bold tags
+    formats['doctype'].setFontItalic(True)
+    formats['comment'].setFontItalic(True)
+    return formats
+
+
+def tokenize(text: str, in_comment: bool = False) -> tuple:
+    """Split one line into highlight tokens in a single left-to-right pass.
+
+    Args:
+        text: Line of text
+        in_comment: Whether the previous line ended inside a comment
+
+    Returns:
+        Tuple of (list of (start, length, kind) in order, whether the line
+        ends inside a comment). Kinds are the keys of
+        HTMLSyntaxHighlighter.colors.
+    """
+    comments, ends_in_comment = comment_spans(text, in_comment)
+    tokens = []
+    pos = 0
+    for gap_end, next_pos in comments + [(len(text), len(text))]:
+        for match in _TOKEN_RE.finditer(text, pos, gap_end):
+            tokens.append((match.start(), match.end() - match.start(), match.lastgroup))
+        if next_pos > gap_end:
+            tokens.append((gap_end, next_pos - gap_end, "comment"))
+        pos = next_pos
+    return tokens, ends_in_comment
+
 
 class HTMLSyntaxHighlighter(QSyntaxHighlighter):
-    """Syntax highlighter for HTML code with custom color scheme."""
+    """Syntax highlighter for HTML code with custom color scheme.
+
+    In documents of DEFER_THRESHOLD_BLOCKS blocks or more, only blocks in
+    the range given to set_visible_blocks() are formatted. Other blocks only
+    track comment state and are marked PENDING until they scroll into view.
+    """
 
     def __init__(self, doc: QTextDocument):
         """Initialize the syntax highlighter.
@@ -12,84 +109,63 @@ class HTMLSyntaxHighlighter(QSyntaxHighlighter):
             doc: QTextDocument to apply highlighting to
         """
         super().__init__(doc)
-        self.colors = {
-            'tag': '#FF5A09',       # Deep Orange
-            'attribute': '#EC7F37', # Light Orange
-            'value': '#BE4F0C',     # Orange Yellow (Darker)
-            'comment': '#666666',   # Grey
-            'doctype': '#2a9df4',   # Bright Blue
-            'entity': '#d19a66'     # Soft Orange/Brown
-        }
-        
-        self.highlighting_rules = []
-
-        # Tag format (e.g., <div, </div>, <br/>)
-        tag_format = QTextCharFormat()
-        tag_format.setForeground(QColor(self.colors['tag']))
-        tag_format.setFontWeight(700)  # Bold tags
-        self.highlighting_rules.append((QRegularExpression(r"</?[\w-]+(?:\s|/?>)"), tag_format))
-        self.highlighting_rules.append((QRegularExpression(r">"), tag_format))
-
-        # Attribute format (e.g., class=, id=)
-        attr_format = QTextCharFormat()
-        attr_format.setForeground(QColor(self.colors['attribute']))
-        self.highlighting_rules.append((QRegularExpression(r"\s[\w-]+="), attr_format))
-
-        # Value format (e.g., "container", 'header')
-        value_format = QTextCharFormat()
-        value_format.setForeground(QColor(self.colors['value']))
-        self.highlighting_rules.append((QRegularExpression(r"\"[^\"]*\""), value_format))
-        self.highlighting_rules.append((QRegularExpression(r"'[^']*'"), value_format))
-
-        # Doctype format
-        doctype_format = QTextCharFormat()
-        doctype_format.setForeground(QColor(self.colors['doctype']))
-        doctype_format.setFontItalic(True)
-        self.highlighting_rules.append((QRegularExpression(r"<!DOCTYPE[^>]*>"), doctype_format))
-
-        # Entity format (e.g., &nbsp;)
-        entity_format = QTextCharFormat()
-        entity_format.setForeground(QColor(self.colors['entity']))
-        self.highlighting_rules.append((QRegularExpression(r"&[a-zA-Z0-9#]+;"), entity_format))
-
-        # Comment format
-        self.comment_format = QTextCharFormat()
-        self.comment_format.setForeground(QColor(self.colors['comment']))
-        self.comment_format.setFontItalic(True)
-        
-        self.comment_start = QRegularExpression(r"<!--")
-        self.comment_end = QRegularExpression(r"-->")
+        self.colors = dict(TOKEN_COLORS)
+        self.defer_threshold = DEFER_THRESHOLD_BLOCKS
+        self._visible_first = 0
+        self._visible_last = 200
+        self.formats = build_formats(self.colors)
+
+    def set_colors(self, colors: dict) -> None:
+        """Switch to another token palette and reformat the document.
+
+        Args:
+            colors: Hex color per token kind, as in TOKEN_COLORS
+        """
+        self.colors = dict(colors)
+        self.formats = build_formats(self.colors)
+        self.rehighlight()
 
+    @perf.timed("highlight.visible")
+    def set_visible_blocks(self, first: int, last: int) -> None:
+        """Format pending blocks between two block numbers, inclusive.
+
+        Args:
+            first: First block number shown in the editor
+            last: Last block number shown in the editor
+        """
+        self._visible_first = first
+        self._visible_last = last
+        doc = self.document()
+        if doc is None:
+            return
+        block = doc.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            state = block.userState()
+            if state != -1 and state & PENDING:
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    @perf.timed("highlight.block")
     def highlightBlock(self, text):
         """Apply syntax highlighting to a block of text.
 
         Args:
             text: Text block to highlight
         """
-        # Apply regular expression rules
-        for pattern, format in self.highlighting_rules:
-            match_iterator = pattern.globalMatch(text)
-            while match_iterator.hasNext():
-                match = match_iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), format)
-
-        # Handle multi-line comments
-        self.setCurrentBlockState(0)
-        
-        start_index = 0
-        if self.previousBlockState() != 1:
-            start_index = self.comment_start.match(text).capturedStart()
-
-        while start_index >= 0:
-            match = self.comment_end.match(text, start_index)
-            end_index = match.capturedStart()
-            comment_length = 0
-            
-            if end_index == -1:
-                self.setCurrentBlockState(1)
-                comment_length = len(text) - start_index
-            else:
-                comment_length = end_index - start_index + match.capturedLength()
-            
-            self.setFormat(start_index, comment_length, self.comment_format)
-            start_index = self.comment_start.match(text, start_index + comment_length).capturedStart()
+        previous = self.previousBlockState()
+        in_comment = previous != -1 and bool(previous & IN_COMMENT)
+        block = self.currentBlock()
+        number = block.blockNumber()
+        if (
+            not self._visible_first <= number <= self._visible_last
+            and block.document().blockCount() >= self.defer_threshold
+        ):
+            _, ends_in_comment = comment_spans(text, in_comment)
+            self.setCurrentBlockState(PENDING | (IN_COMMENT if ends_in_comment else 0))
+            return
+
+        tokens, ends_in_comment = tokenize(text, in_comment)
+        formats = self.formats
+        for start, length, kind in tokens:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(IN_COMMENT if ends_in_comment else 0)
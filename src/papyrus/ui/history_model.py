@@ -0,0 +1,121 @@
+"""Lazily paged list model over the history database."""
+# pylint: disable=invalid-name  # Qt override methods keep camelCase
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt  # pylint: disable=no-name-in-module
+
+from papyrus.core.history import HistoryStore
+
+ENTRY_ID_ROLE = Qt.ItemDataRole.UserRole
+
+
+class HistoryListModel(QAbstractListModel):
+    """Expose history entries to a QListView one page at a time.
+
+    Only id, title and timestamp are held for rows that have been fetched;
+    the view asks for more pages through canFetchMore/fetchMore as it
+    scrolls. Deletes and inserts are reported as row changes instead of
+    resetting the model.
+    """
+
+    def __init__(self, store: HistoryStore, page_size: int = 200, parent=None):
+        """Create the model.
+
+        Args:
+            store: History database
+            page_size: Rows loaded per fetchMore call
+            parent: Optional QObject parent
+        """
+        super().__init__(parent)
+        self._store = store
+        self._page_size = page_size
+        self._rows: list[dict] = []
+        self._query = ""
+        self._exhausted = False
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        entry = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{index.row() + 1}. {entry['title']} – {entry.get('timestamp', '')}"
+        if role == ENTRY_ID_ROLE:
+            return entry["id"]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        offset = len(self._rows)
+        if self._query:
+            page = self._store.search(self._query, limit=self._page_size, offset=offset)
+        else:
+            page = self._store.entries(offset=offset, limit=self._page_size)
+        self._exhausted = len(page) < self._page_size
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), offset, offset + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def set_query(self, query: str) -> None:
+        """Show search results for query, or all entries when it is empty."""
+        self.beginResetModel()
+        self._query = query.strip()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def reload(self) -> None:
+        self.set_query(self._query)
+
+    def entry_id(self, row: int) -> int:
+        return self._rows[row]["id"]
+
+    def entry_added(self, entry_id: int) -> None:
+        """Insert a newly saved entry at the top of an unfiltered list."""
+        if self._query:
+            return
+        entry = self._store.entries(limit=1)
+        if not entry or entry[0]["id"] != entry_id:
+            self.reload()
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, entry[0])
+        self.endInsertRows()
+        self._renumber_from(1)
+
+    def remove_entry(self, entry_id: int) -> None:
+        """Delete an entry from the store and drop its row."""
+        self._store.delete(entry_id)
+        for row, entry in enumerate(self._rows):
+            if entry["id"] == entry_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+                self._renumber_from(row)
+                return
+
+    def clear(self) -> None:
+        """Delete every entry from the store."""
+        self.beginResetModel()
+        self._store.clear()
+        self._rows = []
+        self._exhausted = True
+        self.endResetModel()
+
+    def _renumber_from(self, row: int) -> None:
+        # Display text carries the row number; only visible rows repaint
+        if row < len(self._rows):
+            self.dataChanged.emit(
+                self.index(row), self.index(len(self._rows) - 1), [Qt.ItemDataRole.DisplayRole]
+            )
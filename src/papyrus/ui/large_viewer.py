@@ -0,0 +1,233 @@
+"""Read-only viewer for files too large for the editor."""
+# pylint: disable=invalid-name  # Qt override methods keep camelCase
+from typing import Optional
+
+from PySide6.QtCore import Qt  # pylint: disable=no-name-in-module
+from PySide6.QtGui import (  # pylint: disable=no-name-in-module
+    QColor,
+    QFont,
+    QFontDatabase,
+    QFontMetrics,
+    QPainter,
+    QPen,
+)
+from PySide6.QtWidgets import QAbstractScrollArea  # pylint: disable=no-name-in-module
+
+from papyrus.core.mapped import MappedDocument
+from papyrus.ui.editor import page_height_px
+from papyrus.ui.highlighter import TOKEN_COLORS, tokenize
+from papyrus.utils import perf
+
+# QScrollBar values are ints; larger files scroll in coarser steps
+_SCROLL_RANGE = 1 << 30
+# Rows moved per wheel notch
+_WHEEL_ROWS = 3
+
+
+class LargeFileViewer(QAbstractScrollArea):
+    """Scrolls a MappedDocument by byte offset and paints only visible rows.
+
+    Nothing is decoded or highlighted until it is on screen. The vertical
+    scroll bar maps to byte offsets, so dragging it jumps straight to that
+    part of the file; wheel and arrow keys move by whole rows. Page breaks
+    are drawn every page-height worth of lines.
+    """
+
+    def __init__(self, parent=None):
+        """Create an empty viewer.
+
+        Args:
+            parent: Optional parent widget
+        """
+        super().__init__(parent)
+        self._document: Optional[MappedDocument] = None
+        self._top = 0
+        self._scale = 1
+        self._max_width = 0
+        self._show_page_breaks = True
+        self._line_color = QColor('#FF5A09')
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.colors = dict(TOKEN_COLORS)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+    def document(self) -> Optional[MappedDocument]:
+        return self._document
+
+    def set_document(self, document: Optional[MappedDocument]) -> None:
+        """Show a document from its first row; None clears the viewer."""
+        self._document = document
+        self._top = 0
+        self._max_width = 0
+        size = document.size if document is not None else 0
+        self._scale = max(1, -(-size // _SCROLL_RANGE))
+        bar = self.verticalScrollBar()
+        bar.blockSignals(True)
+        bar.setRange(0, size // self._scale)
+        bar.setValue(0)
+        bar.blockSignals(False)
+        self.horizontalScrollBar().setRange(0, 0)
+        self.viewport().update()
+
+    def set_colors(self, colors: dict) -> None:
+        """Use another token palette, as in highlighter.TOKEN_COLORS."""
+        self.colors = dict(colors)
+        self.viewport().update()
+
+    def set_show_page_breaks(self, show: bool) -> None:
+        self._show_page_breaks = bool(show)
+        self.viewport().update()
+
+    def top_offset(self) -> int:
+        """Byte offset of the first row on screen."""
+        return self._top
+
+    def scroll_to_offset(self, offset: int) -> None:
+        """Scroll so the row containing offset is at the top."""
+        if self._document is None:
+            return
+        self._set_top(self._document.row_start(offset))
+
+    def scroll_rows(self, rows: int) -> None:
+        """Scroll down by rows, or up when negative."""
+        document = self._document
+        if document is None:
+            return
+        top = self._top
+        step = document.next_row if rows > 0 else document.previous_row
+        for _ in range(abs(rows)):
+            moved = step(top)
+            if moved == top or moved >= document.size:
+                break
+            top = moved
+        self._set_top(top)
+
+    def _set_top(self, offset: int) -> None:
+        self._top = offset
+        bar = self.verticalScrollBar()
+        bar.blockSignals(True)
+        bar.setValue(offset // self._scale)
+        bar.blockSignals(False)
+        self.viewport().update()
+
+    def _on_scrolled(self, value: int) -> None:
+        if self._document is not None:
+            self._top = self._document.row_start(value * self._scale)
+            self.viewport().update()
+
+    def _rows_per_viewport(self) -> int:
+        return max(1, self.viewport().height() // QFontMetrics(self.font()).lineSpacing())
+
+    def visible_rows(self) -> list:
+        """Return (offset, text) for each row on screen."""
+        document = self._document
+        if document is None:
+            return []
+        rows = []
+        offset = self._top
+        for _ in range(self._rows_per_viewport() + 1):
+            if offset >= document.size:
+                break
+            text, following = document.row_text(offset)
+            rows.append((offset, text))
+            offset = following
+        return rows
+
+    def wheelEvent(self, event):
+        notches = event.angleDelta().y() / 120
+        if notches:
+            self.scroll_rows(-round(notches * _WHEEL_ROWS) or (-1 if notches > 0 else 1))
+        bar = self.horizontalScrollBar()
+        if event.angleDelta().x():
+            bar.setValue(bar.value() - event.angleDelta().x())
+        event.accept()
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        page = self._rows_per_viewport() - 1
+        if key == Qt.Key.Key_Down:
+            self.scroll_rows(1)
+        elif key == Qt.Key.Key_Up:
+            self.scroll_rows(-1)
+        elif key == Qt.Key.Key_PageDown:
+            self.scroll_rows(max(1, page))
+        elif key == Qt.Key.Key_PageUp:
+            self.scroll_rows(-max(1, page))
+        elif key == Qt.Key.Key_Home:
+            self.scroll_to_offset(0)
+        elif key == Qt.Key.Key_End and self._document is not None:
+            self.scroll_to_offset(self._document.size)
+            self.scroll_rows(-page)
+        else:
+            super().keyPressEvent(event)
+
+    @perf.timed("viewer.paint")
+    def paintEvent(self, event):
+        """Decode, highlight and draw the rows on screen."""
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().base())
+        document = self._document
+        if document is None:
+            painter.end()
+            return
+        metrics = QFontMetrics(self.font())
+        line_height = metrics.lineSpacing()
+        lines_per_page = max(1, page_height_px() // line_height)
+        x0 = 4 - self.horizontalScrollBar().value()
+        width = self.viewport().width()
+        text_pen = QPen(self.palette().text().color())
+        pens = {kind: QPen(QColor(color)) for kind, color in self.colors.items()}
+        # (bold, italic) -> (font, metrics)
+        fonts = {}
+        for bold in (False, True):
+            for italic in (False, True):
+                font = QFont(self.font())
+                font.setBold(bold)
+                font.setItalic(italic)
+                fonts[bold, italic] = (font, QFontMetrics(font))
+        plain = fonts[False, False]
+
+        y = 0
+        line = document.line_number(self._top)
+        widest = self._max_width
+        for offset, text in self.visible_rows():
+            starts_line = offset == 0 or document.line_start(offset) == offset
+            if offset != self._top and starts_line:
+                line += 1
+            if self._show_page_breaks and starts_line and line and line % lines_per_page == 0:
+                painter.setPen(QPen(self._line_color))
+                painter.drawLine(0, y, width, y)
+            tokens, _ = tokenize(text, document.in_comment(offset))
+            x = x0
+            pos = 0
+            baseline = y + metrics.ascent()
+            for start, length, kind in tokens:
+                if start > pos:
+                    x = self._draw_run(painter, x, baseline, width, text[pos:start], text_pen, plain)
+                font = fonts[kind == "tag", kind in ("comment", "doctype")]
+                x = self._draw_run(
+                    painter, x, baseline, width, text[start : start + length], pens.get(kind, text_pen), font
+                )
+                pos = start + length
+            if pos < len(text):
+                x = self._draw_run(painter, x, baseline, width, text[pos:], text_pen, plain)
+            widest = max(widest, x - x0)
+            y += line_height
+        painter.end()
+        if widest > self._max_width:
+            self._max_width = widest
+            self.horizontalScrollBar().setRange(0, max(0, widest + 8 - width))
+            self.horizontalScrollBar().setPageStep(width)
+
+    @staticmethod
+    def _draw_run(
+        painter: QPainter, x: int, baseline: int, width: int, text: str, pen: QPen, font: tuple
+    ) -> int:
+        """Draw text at x unless it starts off screen; return the x after it."""
+        qfont, metrics = font
+        if x < width:
+            painter.setPen(pen)
+            painter.setFont(qfont)
+            painter.drawText(x, baseline, text)
+        return x + metrics.horizontalAdvance(text)
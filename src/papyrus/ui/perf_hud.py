@@ -0,0 +1,141 @@
+"""Overlay showing live timings from papyrus.utils.perf."""
+from PySide6.QtCore import Qt, QTimer  # pylint: disable=no-name-in-module
+from PySide6.QtWidgets import (  # pylint: disable=no-name-in-module
+    QFileDialog,
+    QFrame,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from papyrus.utils import perf
+
+COLUMNS = ("Operation", "Calls", "p50 ms", "p95 ms", "Max ms")
+
+
+class PerfHud(QFrame):
+    """Floating table of per-operation call counts and latency percentiles.
+
+    Showing the HUD enables recording; hiding it leaves the recorder running
+    so a trace can still be exported, and stops the refresh timer. The HUD
+    positions itself in the top-right corner of its parent.
+    """
+
+    def __init__(self, parent=None, refresh_ms: int = 500):
+        """Create the overlay, hidden.
+
+        Args:
+            parent: Widget to float over
+            refresh_ms: Interval between table refreshes while visible
+        """
+        super().__init__(parent)
+        self.setObjectName("perfHud")
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        self.resize(460, 300)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+        self.summary_label = QLabel("Recording\u2026")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(COLUMNS))
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(COLUMNS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        export_button = QPushButton("Export trace\u2026")
+        export_button.setObjectName("secondary")
+        export_button.clicked.connect(self.export_trace)
+        buttons.addWidget(export_button)
+        clear_button = QPushButton("Clear")
+        clear_button.setObjectName("secondary")
+        clear_button.clicked.connect(self.clear)
+        buttons.addWidget(clear_button)
+        layout.addLayout(buttons)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(refresh_ms)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self) -> None:
+        """Show the HUD and start recording, or hide it."""
+        showing = self.isHidden()
+        if showing:
+            perf.enable()
+        self.setVisible(showing)
+
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        self.reposition()
+        self.raise_()
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):  # pylint: disable=invalid-name
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def reposition(self) -> None:
+        """Move to the top-right corner of the parent widget."""
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(max(0, parent.width() - self.width() - 12), 12)
+
+    def refresh(self) -> None:
+        """Reload the table from the active recorder."""
+        rec = perf.recorder()
+        stats = rec.stats() if rec is not None else {}
+        self.table.setRowCount(len(stats))
+        for row, name in enumerate(sorted(stats)):
+            entry = stats[name]
+            values = (
+                name,
+                str(entry["count"]),
+                f"{entry['p50_ms']:.2f}",
+                f"{entry['p95_ms']:.2f}",
+                f"{entry['max_ms']:.2f}",
+            )
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        events = len(rec.events) if rec is not None else 0
+        self.summary_label.setText(f"{len(stats)} operations \u00b7 {events} spans buffered")
+
+    def clear(self) -> None:
+        rec = perf.recorder()
+        if rec is not None:
+            rec.clear()
+        self.refresh()
+
+    def export_trace(self) -> None:
+        """Ask for a file name and write the buffered spans as Chrome trace JSON."""
+        rec = perf.recorder()
+        if rec is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "papyrus-trace.json", "Trace JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            count = rec.export_chrome_trace(path)
+        except OSError as exc:
+            self.summary_label.setText(f"\u274c Could not write trace: {exc}")
+            return
+        self.summary_label.setText(f"Exported {count} spans to {path}")
@@ -0,0 +1,134 @@
+"""Embedded live preview of the processed HTML."""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Optional
+
+from PySide6.QtCore import QTimer, QUrl  # pylint: disable=no-name-in-module
+from PySide6.QtWidgets import QTextBrowser, QVBoxLayout, QWidget  # pylint: disable=no-name-in-module
+
+from papyrus.utils import perf
+
+# QWebEngineView.setHtml() rejects content above 2 MB; larger output is
+# written to a file and loaded by URL instead.
+SET_HTML_LIMIT = 1_500_000
+
+# Swap head and body in place so the page keeps its scroll position
+_PATCH_DOCUMENT_JS = """
+(function (html) {
+    var next = new DOMParser().parseFromString(html, "text/html");
+    document.head.replaceWith(document.adoptNode(next.head));
+    document.body.replaceWith(document.adoptNode(next.body));
+})(%s);
+"""
+
+
+def _load_web_engine_view():
+    """Return the QWebEngineView class, or None if QtWebEngine is unavailable."""
+    try:
+        from PySide6.QtWebEngineWidgets import QWebEngineView  # pylint: disable=no-name-in-module,import-outside-toplevel
+    except ImportError:
+        return None
+    return QWebEngineView
+
+
+class PreviewPane(QWidget):
+    """Preview that re-renders from the pipeline after edits pause.
+
+    render is called on the GUI thread once the debounce timer fires; when
+    its output hashes the same as the last update the view is left alone.
+    QtWebEngine pages are patched in place rather than reloaded. Builds
+    without QtWebEngine fall back to QTextBrowser, which understands only a
+    subset of HTML and CSS.
+    """
+
+    def __init__(self, render: Callable[[], str], debounce_ms: int = 300, parent=None):
+        """Create the pane.
+
+        Args:
+            render: Returns the processed HTML for the current editor state
+            debounce_ms: Quiet period after the last change before re-rendering
+            parent: Optional parent widget
+        """
+        super().__init__(parent)
+        self._render = render
+        self._last_digest: Optional[bytes] = None
+        self._page_ready = False
+        self._spill_dir: Optional[str] = None
+        self.render_count = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        view_class = _load_web_engine_view()
+        self.uses_web_engine = view_class is not None
+        if view_class is not None:
+            self.view = view_class(self)
+            self.view.loadFinished.connect(self._on_load_finished)
+        else:
+            self.view = QTextBrowser(self)
+            self.view.setOpenExternalLinks(True)
+        layout.addWidget(self.view)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.refresh)
+
+    def schedule_refresh(self) -> None:
+        """Re-render once changes stop arriving for the debounce interval."""
+        if self.isVisible():
+            self._timer.start()
+
+    @perf.timed("preview.refresh")
+    def refresh(self) -> None:
+        """Render now and update the view if the output changed."""
+        self._timer.stop()
+        html = self._render()
+        digest = hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        if digest == self._last_digest:
+            return
+        self._last_digest = digest
+        self.render_count += 1
+        if self.uses_web_engine:
+            self._update_web_view(html)
+        else:
+            self._update_text_browser(html)
+
+    def _update_text_browser(self, html: str) -> None:
+        bar = self.view.verticalScrollBar()
+        position = bar.value()
+        self.view.setHtml(html)
+        bar.setValue(min(position, bar.maximum()))
+
+    def _update_web_view(self, html: str) -> None:
+        if len(html) > SET_HTML_LIMIT // 4 and len(html.encode("utf-8")) > SET_HTML_LIMIT:
+            self._page_ready = False
+            self.view.load(QUrl.fromLocalFile(self._spill(html)))
+        elif self._page_ready:
+            self.view.page().runJavaScript(_PATCH_DOCUMENT_JS % json.dumps(html))
+        else:
+            self.view.setHtml(html)
+
+    def _on_load_finished(self, ok: bool) -> None:
+        self._page_ready = ok
+
+    def _spill(self, html: str) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="papyrus-preview-")
+            atexit.register(self._remove_spill_dir)
+        path = os.path.join(self._spill_dir, "preview.html")
+        with open(path, "w", encoding="utf-8", errors="surrogatepass") as f:
+            f.write(html)
+        return path
+
+    def _remove_spill_dir(self) -> None:
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        super().showEvent(event)
+        QTimer.singleShot(0, self.refresh)
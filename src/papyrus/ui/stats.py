@@ -0,0 +1,84 @@
+"""Incremental character, word and line counts for the editor document."""
+from PySide6.QtCore import QObject, QTimer, Signal  # pylint: disable=no-name-in-module
+from PySide6.QtGui import QTextDocument  # pylint: disable=no-name-in-module
+
+
+def _block_words(block) -> int:
+    return len(block.text().split())
+
+
+class DocumentStats(QObject):
+    """Keep document counts up to date without copying the whole text.
+
+    Characters and lines come straight from QTextDocument. Words are cached
+    per block and only the blocks touched by each contentsChange are
+    recounted. Updates are coalesced into one countsChanged emission after
+    typing pauses.
+    """
+
+    # characters, words, lines
+    countsChanged = Signal(int, int, int)
+
+    def __init__(self, doc: QTextDocument, debounce_ms: int = 150, parent=None):
+        """Start tracking a document.
+
+        Args:
+            doc: Document to count
+            debounce_ms: Quiet period before countsChanged is emitted
+            parent: Optional QObject parent
+        """
+        super().__init__(parent)
+        self._doc = doc
+        self._block_word_counts: list[int] = []
+        self._words = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._emit_counts)
+        self._recount_all()
+        doc.contentsChange.connect(self._on_contents_change)
+
+    @property
+    def chars(self) -> int:
+        # characterCount() includes the final paragraph separator
+        return max(0, self._doc.characterCount() - 1)
+
+    @property
+    def words(self) -> int:
+        return self._words
+
+    @property
+    def lines(self) -> int:
+        return self._doc.blockCount() if self.chars else 0
+
+    def _recount_all(self) -> None:
+        counts = []
+        block = self._doc.firstBlock()
+        while block.isValid():
+            counts.append(_block_words(block))
+            block = block.next()
+        self._block_word_counts = counts
+        self._words = sum(counts)
+
+    def _on_contents_change(self, position: int, _removed: int, added: int) -> None:
+        doc = self._doc
+        first = doc.findBlock(position).blockNumber()
+        last = doc.findBlock(min(position + added, doc.characterCount() - 1)).blockNumber()
+        # Blocks outside [first, last] are untouched, so the difference in
+        # block count tells how many old blocks the changed range replaced.
+        replaced = (last - first + 1) + (len(self._block_word_counts) - doc.blockCount())
+        if first < 0 or last < first or replaced < 0:
+            self._recount_all()
+        else:
+            block = doc.findBlockByNumber(first)
+            new_counts = []
+            for _ in range(last - first + 1):
+                new_counts.append(_block_words(block))
+                block = block.next()
+            old_counts = self._block_word_counts[first:first + replaced]
+            self._words += sum(new_counts) - sum(old_counts)
+            self._block_word_counts[first:first + replaced] = new_counts
+        self._timer.start()
+
+    def _emit_counts(self) -> None:
+        self.countsChanged.emit(self.chars, self.words, self.lines)
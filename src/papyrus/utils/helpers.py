@@ -2,7 +2,22 @@
 
 import sys
 import os
-from bs4 import BeautifulSoup
+import re
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+from papyrus.utils import perf
+
+# bs4 takes longer to import than the rest of startup; it loads on first paste
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Pastes longer than this are cleaned but not pretty-printed; prettify()
+# roughly doubles the output size and dominates cleaning time on big pages.
+PRETTIFY_MAX_CHARS = 1_000_000
+
+_DOCUMENT_TAG_RE = re.compile(r"<(?:html|head|body)\b", re.IGNORECASE)
 
 
 def resource_path(relative_path):
@@ -31,7 +46,39 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-def clean_pasted_html(text: str) -> str:
+@lru_cache(maxsize=None)
+def preferred_html_parser() -> str:
+    """Return the fastest BeautifulSoup tree builder that is installed.
+
+    Returns:
+        "lxml" or "html5lib" when available, otherwise "html.parser"
+    """
+    for name in ("lxml", "html5lib"):
+        if find_spec(name) is not None:
+            return name
+    return "html.parser"
+
+
+def _unwrap_document(soup: "BeautifulSoup") -> "BeautifulSoup":
+    """Move head/body children of a parsed fragment into a bare soup.
+
+    lxml and html5lib always build a full <html><head><body> tree, while a
+    pasted fragment should stay a fragment like it does with html.parser.
+    """
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+
+    if soup.body is None:
+        return soup
+    fragment = BeautifulSoup("", "html.parser")
+    for container in (soup.head, soup.body):
+        if container is not None:
+            for child in list(container.contents):
+                fragment.append(child.extract())
+    return fragment
+
+
+@perf.timed("paste.clean")
+def clean_pasted_html(text: str, prettify_limit: int = PRETTIFY_MAX_CHARS) -> str:
     """Clean and format pasted HTML using BeautifulSoup.
 
     This function parses the input HTML, fixes malformed tags, and returns
@@ -40,6 +87,8 @@ def clean_pasted_html(text: str) -> str:
 
     Args:
         text: HTML text to clean
+        prettify_limit: Inputs longer than this many characters are
+            repaired but not pretty-printed
 
     Returns:
         Cleaned and formatted HTML text
@@ -47,12 +96,15 @@ def clean_pasted_html(text: str) -> str:
     if not text or not text.strip():
         return text
 
-    try:
-        # Use html.parser as it's built-in, though lxml is faster if available
-        soup = BeautifulSoup(text, "html.parser")
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
 
-        # If it's just a fragment, we might want to keep it as a fragment
-        # But for now, let's just pretty print whatever we get
+    try:
+        parser = preferred_html_parser()
+        soup = BeautifulSoup(text, parser)
+        if parser != "html.parser" and not _DOCUMENT_TAG_RE.search(text):
+            soup = _unwrap_document(soup)
+        if len(text) > prettify_limit:
+            return str(soup)
         return soup.prettify()
     except Exception:
         # Fallback to original text if parsing fails
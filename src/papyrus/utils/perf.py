@@ -0,0 +1,192 @@
+"""Opt-in timing instrumentation for hot paths.
+
+Recording is off unless enable() is called (the performance HUD does this,
+as does PAPYRUS_PERF=1 in the environment). While it is off, span() returns
+a shared no-op context manager and timed() wrappers make one global lookup
+before calling through, so instrumented code pays almost nothing.
+
+This module must not import Qt: the pipeline and the CLI use it too.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Optional
+
+DEFAULT_CAPACITY = 10_000
+# Durations kept per operation for percentiles
+HISTOGRAM_SIZE = 2_000
+
+
+class Recorder:
+    """Fixed-size ring buffer of timed spans with per-operation histories."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, histogram_size: int = HISTOGRAM_SIZE):
+        """Create an empty recorder.
+
+        Args:
+            capacity: Spans kept for trace export; older spans are dropped
+            histogram_size: Recent durations kept per operation name
+        """
+        self.capacity = capacity
+        self.histogram_size = histogram_size
+        self.origin_ns = time.perf_counter_ns()
+        # (name, start ns, duration ns, thread id)
+        self.events: deque = deque(maxlen=capacity)
+        self._durations: dict = {}
+        self._counts: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start_ns: int, duration_ns: int) -> None:
+        self.events.append((name, start_ns, duration_ns, threading.get_ident()))
+        durations = self._durations.get(name)
+        if durations is None:
+            with self._lock:
+                durations = self._durations.setdefault(name, deque(maxlen=self.histogram_size))
+        durations.append(duration_ns)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def stats(self) -> dict:
+        """Return {name: {"count", "p50_ms", "p95_ms", "max_ms"}} for each operation.
+
+        count covers every call; the percentiles and maximum cover the most
+        recent HISTOGRAM_SIZE calls.
+        """
+        result = {}
+        for name, durations in list(self._durations.items()):
+            values = sorted(durations)
+            if not values:
+                continue
+            result[name] = {
+                "count": self._counts.get(name, len(values)),
+                "p50_ms": _percentile(values, 0.50) / 1e6,
+                "p95_ms": _percentile(values, 0.95) / 1e6,
+                "max_ms": values[-1] / 1e6,
+            }
+        return result
+
+    def chrome_trace(self) -> dict:
+        """Return the buffered spans as Chrome trace-event JSON data."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - self.origin_ns) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in list(self.events)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write the trace to path for chrome://tracing or Perfetto.
+
+        Returns:
+            Number of events written
+        """
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return len(trace["traceEvents"])
+
+    def clear(self) -> None:
+        self.events.clear()
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+
+
+def _percentile(sorted_values: list, fraction: float) -> int:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# The active recorder, or None while instrumentation is disabled
+_recorder: Optional[Recorder] = None
+
+
+def enable(capacity: int = DEFAULT_CAPACITY) -> Recorder:
+    """Start recording, keeping the existing recorder if already enabled."""
+    global _recorder  # pylint: disable=global-statement
+    if _recorder is None:
+        _recorder = Recorder(capacity)
+    return _recorder
+
+
+def disable() -> None:
+    """Stop recording and drop the collected data."""
+    global _recorder  # pylint: disable=global-statement
+    _recorder = None
+
+
+def recorder() -> Optional[Recorder]:
+    return _recorder
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        rec = _recorder
+        if rec is not None:
+            rec.record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager timing its body as operation name while enabled."""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name: str):
+    """Decorator recording each call of the function as operation name."""
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            rec = _recorder
+            if rec is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                rec.record(name, start, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorate
+
+
+if os.environ.get("PAPYRUS_PERF"):
+    enable()
@@ -0,0 +1,76 @@
+"""Tests for inlining and copying local assets."""
+
+import base64
+
+from papyrus import cli
+from papyrus.core.assets import AssetCache, resolve_assets
+from papyrus.core.pipeline import RenderOptions, render_html
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(64))
+PAGE = (
+    '<link rel="stylesheet" href="css/site.css"><link rel="next" href="img/a.png">'
+    '<img src="img/a.png"><img src=img/missing.png><a href="img/a.png">a</a>'
+    "<div style=\"background: url('img/a.png')\"></div>"
+    '<img src="https://example.com/x.png">'
+)
+
+
+def _site(tmp_path):
+    doc = tmp_path / "doc"
+    (doc / "img").mkdir(parents=True)
+    (doc / "css").mkdir()
+    (doc / "img" / "a.png").write_bytes(PNG)
+    (doc / "css" / "site.css").write_text("body { background: url(../img/a.png) }")
+    (doc / "page.html").write_text(PAGE)
+    return doc
+
+
+def test_inline_rewrites_only_loaded_assets(tmp_path):
+    doc = _site(tmp_path)
+    png_uri = "data:image/png;base64," + base64.b64encode(PNG).decode()
+    css_uri = "data:text/css;base64," + base64.b64encode(
+        f'body {{ background: url({png_uri}) }}'.encode()
+    ).decode()
+
+    html = resolve_assets(PAGE, str(doc), cache=AssetCache(str(tmp_path / "cache")))
+    assert html == (
+        f'<link rel="stylesheet" href="{css_uri}"><link rel="next" href="img/a.png">'
+        f'<img src="{png_uri}"><img src=img/missing.png><a href="img/a.png">a</a>'
+        f"<div style=\"background: url('{png_uri}')\"></div>"
+        '<img src="https://example.com/x.png">'
+    )
+
+
+def test_cache_survives_processes_and_notices_changes(tmp_path):
+    doc = _site(tmp_path)
+    first = AssetCache(str(tmp_path / "cache"))
+    resolve_assets(PAGE, str(doc), cache=first)
+    assert first.misses == 1
+
+    again = AssetCache(str(tmp_path / "cache"))
+    resolve_assets(PAGE, str(doc), cache=again)
+    assert (again.hits, again.misses) == (2, 0)
+
+    (doc / "img" / "a.png").write_bytes(PNG + b"changed")
+    html = resolve_assets('<img src="img/a.png">', str(doc), cache=again)
+    assert again.misses == 1
+    assert base64.b64encode(PNG + b"changed").decode() in html
+
+
+def test_copy_mode_and_command_line(tmp_path):
+    doc = _site(tmp_path)
+    out = tmp_path / "out"
+    assert cli.main(["convert", str(doc / "page.html"), "-o", str(out), "--assets", "copy"]) == 0
+
+    html = (out / "page.html").read_text()
+    copies = sorted(p.name for p in (out / "page_files").iterdir())
+    assert len(copies) == 2 and copies[0].endswith("-a.png") and copies[1].endswith("-site.css")
+    assert f'<img src="page_files/{copies[0]}">' in html
+    assert (out / "page_files" / copies[0]).read_bytes() == PNG
+    # The copied stylesheet points at the copied image beside it
+    assert (out / "page_files" / copies[1]).read_text() == f"body {{ background: url({copies[0]}) }}"
+
+    # Without a base directory, or as a code view, references stay as written
+    assert "img/a.png" in render_html(PAGE, RenderOptions(assets="inline"))
+    code = render_html(PAGE, RenderOptions(assets="inline", pdf_copy=True), base_dir=str(doc))
+    assert "data:" not in code
@@ -0,0 +1,31 @@
+"""Tests for the benchmark harness (not the benchmarks themselves)."""
+
+import json
+
+from benchmarks.documents import make_document
+from benchmarks.harness import compare_results, summarize
+from benchmarks.run import main
+
+
+def test_documents_are_deterministic():
+    doc = make_document(5_000, seed=1)
+    assert doc == make_document(5_000, seed=1)
+    assert 5_000 <= len(doc) < 6_000
+    assert make_document(1_000, full=True).startswith("<!DOCTYPE html>")
+
+
+def test_compare_flags_slowdowns_beyond_threshold(tmp_path, capsys):
+    baseline = {"a[1KB]": summarize([0.010], 1000), "b[1KB]": summarize([0.010], 1000)}
+    current = {"a[1KB]": summarize([0.0105], 1000), "b[1KB]": summarize([0.013], 1000)}
+    rows = compare_results(baseline, current, threshold=0.10)
+    assert [(name, regressed) for name, *_, regressed in rows] == [
+        ("a[1KB]", False),
+        ("b[1KB]", True),
+    ]
+
+    for name, results in (("base.json", baseline), ("cur.json", current)):
+        (tmp_path / name).write_text(json.dumps({"results": results}), encoding="utf-8")
+    args = ["--compare", str(tmp_path / "base.json"), "--against", str(tmp_path / "cur.json")]
+    assert main(args) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+    assert main(args + ["--threshold", "0.5"]) == 0
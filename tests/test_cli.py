@@ -0,0 +1,61 @@
+"""Tests for the headless batch conversion CLI."""
+
+import subprocess
+import sys
+
+from papyrus import cli
+from papyrus.core import pipeline
+
+
+def test_cli_does_not_import_qt():
+    """The batch path must be usable without PySide6."""
+    code = (
+        "import sys, papyrus.cli; "
+        "sys.exit(any(m.startswith('PySide6') for m in sys.modules))"
+    )
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0
+
+
+def test_convert_directory_and_glob(tmp_path, capsys):
+    """Directories keep their layout and globs flatten into the output dir."""
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.html").write_text("<h1>A</h1>", encoding="utf-8")
+    (src / "nested" / "b.htm").write_text("<p>B\u200b</p>", encoding="utf-8")
+    (src / "notes.txt").write_text("skip me", encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert cli.main(["convert", str(src), "-o", str(out), "-j", "1", "--bands"]) == 0
+    assert "Converted 2 file(s)" in capsys.readouterr().out
+    nested = (out / "nested" / "b.htm").read_text(encoding="utf-8")
+    assert "\u200b" not in nested and 'class="print-header"' in nested
+    assert not (out / "notes.txt").exists()
+
+    flat = tmp_path / "flat"
+    assert cli.main(["convert", str(src / "**" / "*.htm*"), "-o", str(flat)]) == 0
+    assert sorted(p.name for p in flat.iterdir()) == ["a.html", "b.htm"]
+
+
+def test_render_html_matches_stage_order():
+    """render_html chains sanitize, wrapper and bands like the GUI does."""
+    options = pipeline.RenderOptions(print_bands=True, band_text="Draft")
+    result = pipeline.render_html("<p>x</p>", options)
+    assert result.startswith("<!DOCTYPE html>")
+    assert "Draft Draft" in result
+
+
+def test_theme_rules_pick_a_theme_per_document(tmp_path, capsys):
+    src = tmp_path / "src"
+    (src / "reports").mkdir(parents=True)
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    (src / "reports" / "b.html").write_text("<p>B</p>", encoding="utf-8")
+    out = tmp_path / "out"
+
+    argv = ["convert", str(src), "-o", str(out), "-j", "1", "--theme", "light"]
+    assert cli.main(argv + ["--theme", "reports/*=dark"]) == 0
+    assert pipeline.wrapper_css(theme="light") in (out / "a.html").read_text(encoding="utf-8")
+    report = (out / "reports" / "b.html").read_text(encoding="utf-8")
+    assert pipeline.wrapper_css(theme="dark") in report
+
+    assert cli.main(argv + ["--theme", "missing"]) == 1
+    assert "Unknown theme 'missing'" in capsys.readouterr().err
@@ -0,0 +1,95 @@
+"""Tests for the PagedTextEdit page breaks and paste handling."""
+
+import os
+import sys
+
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def _naive_break_edges(editor, lines_per_page: int) -> dict:
+    """Place every page break by walking all blocks and counting their lines."""
+    edges = {}
+    line = 0
+    next_break = lines_per_page
+    blk = editor.document().firstBlock()
+    while blk.isValid():
+        end = line + max(1, blk.lineCount())
+        if next_break < end:
+            edges[blk.blockNumber()] = (
+                "top" if next_break == line or next_break - line < end - next_break else "bottom"
+            )
+            while next_break < end:
+                next_break += lines_per_page
+        line = end
+        blk = blk.next()
+    return edges
+
+
+def test_page_breaks_follow_line_numbers():
+    """Breaks land on the block edge nearest each page's worth of lines, before and after edits."""
+    app = _get_app()
+    from papyrus.ui.editor import PagedTextEdit  # pylint: disable=import-outside-toplevel
+
+    editor = PagedTextEdit()
+    editor.page_height_px = lambda: 100
+    editor.resize(400, 300)
+    editor.show()
+    editor.setPlainText("\n".join(f"<p>line {i}</p>" * (i % 4 + 1) for i in range(300)))
+    app.processEvents()
+    lines_per_page = editor.lines_per_page()
+    assert lines_per_page == 100 // editor.fontMetrics().lineSpacing()
+
+    def edges():
+        found = {}
+        blk = editor.document().firstBlock()
+        while blk.isValid():
+            edge = editor._page_break_edge(blk, lines_per_page)
+            if edge is not None:
+                found[blk.blockNumber()] = edge
+            blk = blk.next()
+        return found
+
+    assert edges() == _naive_break_edges(editor, lines_per_page)
+    cursor = editor.textCursor()
+    cursor.setPosition(40)
+    cursor.insertText("\n\n\nwrapped " * 30)
+    editor.resize(250, 300)
+    app.processEvents()
+    assert edges() == _naive_break_edges(editor, lines_per_page)
+    editor.set_show_page_breaks(True)
+    editor.viewport().repaint()
+
+    first, last = editor.visible_blocks()
+    assert first == editor.firstVisibleBlock().blockNumber() and last > first
+    editor.close()
+
+
+def test_large_paste_is_inserted_then_cleaned_off_thread():
+    """Big pastes appear immediately and are swapped for the cleaned HTML."""
+    app = _get_app()
+    from PySide6.QtCore import QMimeData  # pylint: disable=import-outside-toplevel,no-name-in-module
+    from papyrus.ui.editor import PagedTextEdit  # pylint: disable=import-outside-toplevel
+
+    editor = PagedTextEdit()
+    editor.paste_async_threshold = 10
+    pending = []
+    editor.pasteCleaningChanged.connect(pending.append)
+    source = QMimeData()
+    source.setText("<div><p>unclosed")
+    editor.insertFromMimeData(source)
+    assert editor.toPlainText() == "<div><p>unclosed"
+    assert pending == [1]
+
+    while editor.is_cleaning_paste():
+        app.processEvents()
+    assert pending[-1] == 0
+    assert "</div>" in editor.toPlainText()
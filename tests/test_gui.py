@@ -22,3 +22,23 @@ def test_main_window_instantiates():
     window.show()
     app.processEvents()
     window.close()
+
+
+def test_switching_theme_from_settings():
+    app = _get_app()
+
+    from papyrus.core.app import HTMLConverterApp
+    from papyrus.core.themes import registry
+
+    window = HTMLConverterApp()
+    window.ensure_settings_tab()
+    dark_sheet = window.styleSheet()
+    window.theme_combo.setCurrentIndex(window.theme_combo.findData("light"))
+    app.processEvents()
+    light = registry().get("light")
+    assert window.theme == "light"
+    assert window.highlighter.colors == light.tokens
+    assert window._render_options().theme == "light"
+    window.apply_theme("dark")
+    assert window.styleSheet() == dark_sheet
+    window.close()
@@ -20,3 +20,9 @@ def test_sanitize_for_pdf_copy_removes_control_chars():
     sanitized = app.sanitize_for_pdf_copy(raw)
     assert "\u200b" not in sanitized
     assert "\u00ad" not in sanitized
+
+
+def test_clean_pasted_html_skips_prettify_above_limit():
+    """Large inputs are repaired without pretty-printing and stay fragments."""
+    cleaned = helpers.clean_pasted_html("<div><p>unclosed", prettify_limit=5)
+    assert cleaned == "<div><p>unclosed</p></div>"
@@ -0,0 +1,87 @@
+"""Tests for the HTML syntax highlighter."""
+
+import os
+import sys
+
+from PySide6.QtGui import QTextDocument  # pylint: disable=no-name-in-module
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+from papyrus.ui.highlighter import IN_COMMENT, PENDING, HTMLSyntaxHighlighter, tokenize
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def _kinds(text, in_comment=False):
+    tokens, ends = tokenize(text, in_comment)
+    return [(text[s:s + n], kind) for s, n, kind in tokens], ends
+
+
+def test_tokenize_single_pass():
+    """Each construct gets one token; comments win over everything inside them."""
+    assert _kinds('<!DOCTYPE html><a href="x">&amp;</a>') == (
+        [
+            ("<!DOCTYPE html>", "doctype"),
+            ("<a", "tag"),
+            (" href=", "attribute"),
+            ('"x"', "value"),
+            (">", "tag"),
+            ("&amp;", "entity"),
+            ("</a", "tag"),
+            (">", "tag"),
+        ],
+        False,
+    )
+    assert _kinds('<b>x</b><!-- "q" <i>') == (
+        [("<b", "tag"), (">", "tag"), ("</b", "tag"), (">", "tag"), ('<!-- "q" <i>', "comment")],
+        True,
+    )
+    assert _kinds("end --> <br/>", in_comment=True) == (
+        [("end -->", "comment"), ("<br", "tag"), ("/>", "tag")],
+        False,
+    )
+
+
+class _RecordingHighlighter(HTMLSyntaxHighlighter):
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.formatted = []
+
+    def setFormat(self, start, length, fmt):  # pylint: disable=invalid-name
+        self.formatted.append((self.currentBlock().blockNumber(), start, length))
+        super().setFormat(start, length, fmt)
+
+
+def test_offscreen_blocks_are_deferred():
+    """Blocks outside the visible range keep comment state but wait for formats."""
+    _get_app()
+    lines = [f"<p class='c{i}'>{i}</p>" for i in range(300)]
+    lines[100] = "<!-- open"
+    lines[250] = "close -->"
+    doc = QTextDocument()
+    doc.documentLayout()  # contentsChange is only emitted once a layout exists
+    highlighter = _RecordingHighlighter(doc)
+    highlighter.defer_threshold = 100
+    highlighter.set_visible_blocks(0, 20)
+    doc.setPlainText("\n".join(lines))
+
+    def block(n):
+        return doc.findBlockByNumber(n)
+
+    assert block(10).userState() == 0
+    assert block(200).userState() == PENDING | IN_COMMENT
+    assert block(260).userState() == PENDING
+    assert {n for n, _, _ in highlighter.formatted} == set(range(21))
+
+    highlighter.formatted.clear()
+    highlighter.set_visible_blocks(195, 205)
+    assert block(200).userState() == IN_COMMENT
+    assert (200, 0, len(lines[200])) in highlighter.formatted
+    assert {n for n, _, _ in highlighter.formatted} == set(range(195, 206))
+    assert block(206).userState() & PENDING
@@ -0,0 +1,59 @@
+"""Tests for the SQLite history store."""
+
+import json
+
+from papyrus.core.history import HistoryStore
+
+
+def test_add_skips_duplicates_and_prunes_oldest(tmp_path):
+    """Same title and content is stored once; the cap drops oldest entries."""
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), max_entries=3)
+    first = store.add("Report", "<p>a</p>", "t1")
+    assert first is not None
+    assert store.add("Report", "<p>a</p>", "t2") is None
+    assert store.add("Report", "<p>b</p>", "t3") is not None
+    store.add("Other", "<p>a</p>", "t4")
+    store.add("Last", "<p>c</p>", "t5")
+
+    assert [e["title"] for e in store.entries()] == ["Last", "Other", "Report"]
+    assert store.get(first) is None
+    assert "content" not in store.entries(limit=1)[0]
+    newest = store.entries(limit=1)[0]
+    assert store.get(newest["id"])["content"] == "<p>c</p>"
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    """history.json entries keep their order and are not imported twice."""
+    legacy = tmp_path / "history.json"
+    legacy.write_text(
+        json.dumps(
+            [
+                {"title": "New", "timestamp": "2", "content": "<b>2</b>"},
+                {"title": "Old", "timestamp": "1", "content": "<b>1</b>"},
+                {"broken": True},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    db = str(tmp_path / "history.sqlite3")
+    store = HistoryStore(db)
+    assert store.import_legacy_json(str(legacy)) == 2
+    store.close()
+
+    store = HistoryStore(db)
+    assert store.import_legacy_json(str(legacy)) == 0
+    assert [e["title"] for e in store.entries()] == ["New", "Old"]
+
+
+def test_search_ranks_title_matches_first(tmp_path):
+    """Prefix search covers titles and HTML, with title hits ranked higher."""
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store.add("Quarterly invoice", "<p>totals</p>", "t1")
+    store.add("Notes", "<p>see the invoice attached</p>", "t2")
+    store.add("Unrelated", "<p>nothing here</p>", "t3")
+
+    assert [e["title"] for e in store.search("invo")] == ["Quarterly invoice", "Notes"]
+    assert [e["title"] for e in store.search("invoice attach")] == ["Notes"]
+    store.delete(store.search("notes")[0]["id"])
+    assert [e["title"] for e in store.search("invoice")] == ["Quarterly invoice"]
+    assert len(store.search("  ")) == 2
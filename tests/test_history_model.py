@@ -0,0 +1,52 @@
+"""Tests for the paged history list model."""
+
+import os
+import sys
+
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+from papyrus.core.history import HistoryStore
+from papyrus.ui.history_model import ENTRY_ID_ROLE, HistoryListModel
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def test_model_pages_and_updates_rows(tmp_path):
+    """Rows load a page at a time; add and delete touch single rows."""
+    _get_app()
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    for i in range(25):
+        store.add(f"Entry {i}", f"<p>{i}</p>", f"t{i}")
+    model = HistoryListModel(store, page_size=10)
+    model.reload()
+    assert model.rowCount() == 10
+    assert model.index(0).data() == "1. Entry 24 – t24"
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 25
+
+    removed = []
+    model.rowsRemoved.connect(lambda _parent, first, last: removed.append((first, last)))
+    model.remove_entry(model.index(3).data(ENTRY_ID_ROLE))
+    assert removed == [(3, 3)]
+    assert model.rowCount() == 24
+    assert store.count() == 24
+    assert model.index(3).data().startswith("4. Entry 20")
+
+    new_id = store.add("Fresh", "<p>new</p>", "now")
+    model.entry_added(new_id)
+    assert model.index(0).data(ENTRY_ID_ROLE) == new_id
+    assert model.rowCount() == 25
+
+    model.set_query("fresh")
+    assert model.rowCount() == 1
+    model.clear()
+    assert model.rowCount() == 0
+    assert store.count() == 0
@@ -0,0 +1,105 @@
+"""Tests for memory-mapped files and the large-file viewer."""
+
+import os
+import random
+import sys
+
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+from papyrus.core import mapped
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.core.render_cache import RenderCache
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def test_rows_cover_the_file_at_character_boundaries(tmp_path, monkeypatch):
+    """Rows split long lines without cutting UTF-8 sequences."""
+    monkeypatch.setattr(mapped, "ROW_BYTES", 16)
+    monkeypatch.setattr(mapped, "INDEX_CHUNK", 64)
+    rng = random.Random(3)
+    lines = ["".join(rng.choice("ab<>\u00e9\u20ac") for _ in range(rng.randint(0, 70))) for _ in range(40)]
+    text = "\r\n".join(lines)
+    path = tmp_path / "doc.html"
+    path.write_bytes(text.encode("utf-8"))
+    data = text.encode("utf-8")
+
+    with mapped.MappedDocument(str(path)) as doc:
+        assert doc.line_count == len(lines)
+        rows = [0]
+        while doc.next_row(rows[-1]) < doc.size:
+            rows.append(doc.next_row(rows[-1]))
+        decoded = [doc.row_text(row)[0] for row in rows]
+        assert "\ufffd" not in "".join(decoded)
+        assert "".join(decoded) == text.replace("\r\n", "")
+        for offset in range(doc.size):
+            expected = max(row for row in rows if row <= offset)
+            assert doc.row_start(offset) == expected
+            assert doc.line_number(offset) == data.count(b"\n", 0, offset)
+        assert "".join(doc.chunks(7)) == text
+
+
+def test_comment_state_and_small_files(tmp_path):
+    path = tmp_path / "doc.html"
+    path.write_text("<p>a</p>\n<!-- open\nstill -->\n<b>", encoding="utf-8")
+    with mapped.MappedDocument(str(path)) as doc:
+        assert not doc.in_comment(0)
+        assert doc.in_comment(doc.line_start(15))
+        assert not doc.in_comment(doc.size - 1)
+
+    text, document = mapped.open_document(str(path))
+    assert document is None and text.startswith("<p>a</p>")
+    text, document = mapped.open_document(str(path), threshold=1)
+    assert text is None and document.line_count == 4
+    document.close()
+
+
+def test_browser_render_streams_from_mapping(tmp_path):
+    """The cached browser file matches render_html without reading the file into a string."""
+    path = tmp_path / "doc.html"
+    source = "<html><head></head><body><p>x\u200b</p></body></html>"
+    path.write_text(source, encoding="utf-8")
+    cache = RenderCache(directory=str(tmp_path / "cache"))
+    options = RenderOptions(add_wrapper=False, print_bands=True)
+    with mapped.MappedDocument(str(path)) as doc:
+        out, cached = cache.get_or_render_chunks(doc.identity, doc.chunks, options)
+        assert not cached
+        assert cache.get_or_render_chunks(doc.identity, doc.chunks, options) == (out, True)
+    with open(out, encoding="utf-8") as f:
+        assert f.read() == render_html(source, options)
+
+
+def test_window_opens_large_files_read_only(tmp_path):
+    """Large files bypass the editor and paint only the visible rows."""
+    app = _get_app()
+    from papyrus.core.app import HTMLConverterApp
+
+    path = tmp_path / "big.html"
+    path.write_text("<p>row</p>\n" * 1000, encoding="utf-8")
+    window = HTMLConverterApp()
+    window.show()
+    app.processEvents()
+    try:
+        document = mapped.MappedDocument(str(path))
+        window._show_large_file(document)  # pylint: disable=protected-access
+        app.processEvents()
+        viewer = window.large_viewer
+        assert window.text_editor.isHidden() and not viewer.isHidden()
+        assert window.text_editor.toPlainText() == ""
+        rows = viewer.visible_rows()
+        assert 0 < len(rows) < 1000 and rows[0] == (0, "<p>row</p>")
+        viewer.scroll_rows(10)
+        assert viewer.visible_rows()[0][0] == 10 * len("<p>row</p>\n")
+        viewer.repaint()
+
+        window.close_large_file()
+        assert not window.text_editor.isHidden() and viewer.isHidden()
+    finally:
+        window.close()
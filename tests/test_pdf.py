@@ -0,0 +1,41 @@
+"""Tests for in-process PDF export."""
+
+import os
+import subprocess
+import sys
+
+from papyrus.core.pdf import BAND_HEIGHT_MM, DEFAULT_MARGIN_MM, content_margins_mm
+from papyrus.core.pipeline import RenderOptions
+
+
+def test_content_clears_bands():
+    assert content_margins_mm(RenderOptions()) == (DEFAULT_MARGIN_MM, DEFAULT_MARGIN_MM)
+    top, bottom = content_margins_mm(RenderOptions(print_bands=True, top_mm=20, bottom_mm=5))
+    assert top > 20 + BAND_HEIGHT_MM
+    assert bottom > 5 + BAND_HEIGHT_MM
+    assert content_margins_mm(RenderOptions(print_bands=True, band_text=" ")) == (
+        DEFAULT_MARGIN_MM,
+        DEFAULT_MARGIN_MM,
+    )
+
+
+def test_cli_writes_pdf_headless(tmp_path):
+    """convert --pdf runs without a display and paginates long documents."""
+    source = tmp_path / "long.html"
+    source.write_text("".join(f"<p>Line {i}</p>" for i in range(400)), encoding="utf-8")
+    out = tmp_path / "out"
+    env = {k: v for k, v in os.environ.items() if k not in ("DISPLAY", "WAYLAND_DISPLAY")}
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "papyrus.cli", "convert", str(source), "-o", str(out),
+            "--pdf", "--pdf-engine", "qt", "--bands", "-j", "1",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    data = (out / "long.pdf").read_bytes()
+    assert data.startswith(b"%PDF")
+    assert data.count(b"/Type /Page\n") > 1
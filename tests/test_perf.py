@@ -0,0 +1,92 @@
+"""Tests for the hot-path instrumentation."""
+
+import json
+import os
+import sys
+
+import pytest
+from PySide6.QtWidgets import QApplication, QWidget  # pylint: disable=no-name-in-module
+
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.ui.perf_hud import PerfHud
+from papyrus.utils import perf
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+@pytest.fixture
+def recorder():
+    rec = perf.enable()
+    rec.clear()
+    yield rec
+    perf.disable()
+
+
+def test_disabled_records_nothing():
+    perf.disable()
+    assert perf.span("noop") is perf.span("other")
+    with perf.span("noop"):
+        pass
+    render_html("<p>x</p>", RenderOptions(add_wrapper=False))
+    assert perf.recorder() is None
+
+
+def test_stats_percentiles(recorder):
+    for ms in range(1, 101):
+        recorder.record("op", 0, ms * 1_000_000)
+    stats = recorder.stats()["op"]
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == pytest.approx(50, abs=1)
+    assert stats["p95_ms"] == pytest.approx(95, abs=1)
+    assert stats["max_ms"] == 100
+
+
+def test_ring_buffer_is_bounded():
+    rec = perf.Recorder(capacity=10, histogram_size=5)
+    for i in range(50):
+        rec.record("op", i, i)
+    assert len(rec.events) == 10
+    assert rec.stats()["op"]["count"] == 50
+    assert rec.stats()["op"]["max_ms"] == 49 / 1e6
+
+
+def test_pipeline_stages_and_chrome_trace(recorder, tmp_path):
+    render_html("<p>x</p>", RenderOptions(pdf_copy=True))
+    names = set(recorder.stats())
+    assert {"pipeline.render", "pipeline.sanitize"} <= names
+
+    path = tmp_path / "trace.json"
+    count = recorder.export_chrome_trace(str(path))
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert len(trace["traceEvents"]) == count > 0
+    event = trace["traceEvents"][0]
+    assert event["ph"] == "X"
+    assert {"name", "ts", "dur", "pid", "tid"} <= event.keys()
+
+
+def test_hud_shows_recorded_operations():
+    """Showing the HUD starts recording and lists each operation."""
+    _get_app()
+    perf.disable()
+    parent = QWidget()
+    parent.resize(800, 600)
+    hud = PerfHud(parent)
+    try:
+        hud.toggle()
+        assert perf.recorder() is not None
+        render_html("<p>x</p>")
+        hud.refresh()
+        rows = {hud.table.item(row, 0).text() for row in range(hud.table.rowCount())}
+        assert "pipeline.render" in rows
+        hud.toggle()
+        assert hud.isHidden()
+    finally:
+        perf.disable()
+        parent.deleteLater()
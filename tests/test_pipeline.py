@@ -0,0 +1,118 @@
+"""Tests for the Qt-free processing pipeline."""
+
+import random
+from datetime import datetime
+
+from papyrus.core import pipeline
+
+
+def _legacy_sanitize(html: str) -> str:
+    """Reference copy of the original multi-pass sanitizer."""
+    s = html.replace("\r\n", "\n").replace("\r", "\n")
+    s = s.replace("\xa0", " ").replace("\u202f", " ")
+    for ch in "\ufeff\u200b\u200c\u200d\u2060\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069\xad":
+        s = s.replace(ch, "")
+    for token in (
+        "user-select: none",
+        "user-select:none",
+        "-webkit-user-select: none",
+        "-webkit-user-select:none",
+    ):
+        s = s.replace(token, "user-select: text")
+    for token in ("pointer-events: none", "pointer-events:none"):
+        s = s.replace(token, "pointer-events: auto")
+    lower = s.lower()
+    style_block = pipeline._PDF_COPY_STYLE_BLOCK
+    if "</head>" in lower and "pdf-copy-sanitize" not in lower:
+        idx = lower.rfind("</head>")
+        s = s[:idx] + style_block + s[idx:]
+    elif "pdf-copy-sanitize" not in lower and ("<html" in lower or "<body" in lower):
+        s = style_block + s
+    return s
+
+
+FRAGMENTS = [
+    "<html>", "<BODY class=x>", "</head>", "</HEAD>", "<head>", "text ", "\r\n", "\r", "\n",
+    "\xa0", "\u202f", "\u200b", "\xad", "\ufeff", "\u2069", "user-select:", " none",
+    "user-select: none;", "-webkit-user-select:none", "pointer-events:", "none",
+    "pointer-events: none", "pdf-copy-", "sanitize", "<p>",
+]
+
+
+def test_sanitize_matches_legacy_output():
+    """The single-pass sanitizer is byte-identical to the original chain."""
+    rng = random.Random(1234)
+    samples = ["", "plain text", "<p>no markers</p>"]
+    samples += ["".join(rng.choices(FRAGMENTS, k=rng.randint(1, 40))) for _ in range(2000)]
+    for sample in samples:
+        assert pipeline.sanitize_for_pdf_copy(sample) == _legacy_sanitize(sample), repr(sample)
+
+
+def test_sanitize_injects_before_head_despite_case_expansion():
+    """Characters whose lowercase is longer no longer shift the insertion point."""
+    result = pipeline.sanitize_for_pdf_copy("<html><head>\u0130</head></html>")
+    assert result.endswith("\u0130" + pipeline._PDF_COPY_STYLE_BLOCK + "</head></html>")
+
+
+def test_sanitize_returns_clean_input_unchanged():
+    """Text without offending characters or markers is passed through as-is."""
+    text = "<div>hello world</div>"
+    assert pipeline.sanitize_for_pdf_copy(text) is text
+
+
+def _legacy_inject_print_bands(html: str, css: str, bands: str) -> str:
+    """Reference copy of the original string-rebuilding band injection."""
+    lower = html.lower()
+    if "</head>" in lower:
+        idx = lower.rfind("</head>")
+        html = html[:idx] + css + html[idx:]
+    else:
+        html = css + html
+    lower = html.lower()
+    if "<body" in lower:
+        insert_after = lower.find(">", lower.find("<body")) + 1
+        return html[:insert_after] + bands + html[insert_after:]
+    if "</html>" in lower:
+        idx = lower.rfind("</html>")
+        return html[:idx] + bands + html[idx:]
+    return html + bands
+
+
+BAND_FRAGMENTS = [
+    "<html>", "<HTML lang=en>", "</html>", "</HTML>", "<head>", "</head>", "</HEAD>",
+    "<body>", "<BODY class=x>", "<p>", "text", ">", "\n",
+]
+
+
+def test_inject_print_bands_matches_legacy_output():
+    """One scan plus one join places the bands where the old rebuilds did."""
+    css, bands = pipeline.print_band_markup("Band", 5, 5)
+    rng = random.Random(4321)
+    samples = ["", "plain text"]
+    samples += ["".join(rng.choices(BAND_FRAGMENTS, k=rng.randint(1, 12))) for _ in range(2000)]
+    for sample in samples:
+        expected = _legacy_inject_print_bands(sample, css, bands)
+        assert pipeline.inject_print_bands(sample, "Band", 5, 5) == expected, repr(sample)
+
+
+def test_scan_document_offsets():
+    html = "<HTML><head></head><body class=x>hi</body></HTML>"
+    offsets = pipeline.scan_document(html)
+    assert offsets.head_close == html.index("</head>")
+    assert offsets.body_tag_end == html.index("hi")
+    assert offsets.html_close == html.index("</HTML>")
+    assert offsets.has_html and offsets.has_body
+    assert pipeline.scan_document("<p>x</p>") == pipeline.DocumentOffsets()
+
+
+def test_render_with_compiled_bands_matches_separate_stages():
+    """Bands built into the cached wrapper give the same document as injecting them after."""
+    now = datetime(2024, 1, 2, 3, 4, 5)
+    options = pipeline.RenderOptions(print_bands=True, band_text="Band", top_mm=4, bottom_mm=6)
+    expected = pipeline.inject_print_bands(
+        pipeline.get_styled_wrapper("<p>x</p>", now=now), "Band", 4, 6
+    )
+    pipeline._compile_wrapper.cache_clear()
+    assert pipeline.render_html("<p>x</p>", options, now=now) == expected
+    assert pipeline.render_html("<p>y</p>", options, now=now) == expected.replace("<p>x</p>", "<p>y</p>")
+    assert pipeline._compile_wrapper.cache_info().hits == 1
@@ -0,0 +1,40 @@
+"""Tests for the live preview pane."""
+
+import os
+import sys
+
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+from papyrus.ui.preview import PreviewPane
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def test_unchanged_output_is_not_pushed():
+    """Identical processed output leaves the view untouched."""
+    _get_app()
+    source = {"html": "<p>one</p>"}
+    calls = []
+
+    def render():
+        calls.append(source["html"])
+        return source["html"]
+
+    pane = PreviewPane(render, debounce_ms=0)
+    pane.refresh()
+    pane.refresh()
+    assert len(calls) == 2
+    assert pane.render_count == 1
+
+    source["html"] = "<p>two</p>"
+    pane.refresh()
+    assert pane.render_count == 2
+    if not pane.uses_web_engine:
+        assert "two" in pane.view.toPlainText()
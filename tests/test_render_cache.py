@@ -0,0 +1,40 @@
+"""Tests for the preview render cache."""
+
+import os
+
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.core.render_cache import RenderCache
+
+
+def test_hits_reuse_file_and_options_change_key(tmp_path):
+    """Unchanged content is served from disk; any option change re-renders."""
+    calls = []
+
+    def render(html, options, colors):
+        calls.append(options)
+        return render_html(html, options, colors)
+
+    cache = RenderCache(str(tmp_path), max_files=2)
+    path, cached = cache.get_or_render("<p>a</p>", RenderOptions(), render=render)
+    assert not cached
+    assert cache.get_or_render("<p>a</p>", RenderOptions(), render=render) == (path, True)
+    assert len(calls) == 1
+
+    other, cached = cache.get_or_render(
+        "<p>a</p>", RenderOptions(band_text="x", print_bands=True), render=render
+    )
+    assert not cached and other != path
+    cache.get_or_render("<p>b</p>", RenderOptions(), render=render)
+    assert not os.path.exists(path)  # least recently used file evicted
+    assert len(list(tmp_path.iterdir())) == 2
+
+    cache.cleanup()
+    assert tmp_path.exists()  # caller-owned directories are left in place
+
+
+def test_owned_directory_is_removed():
+    cache = RenderCache(max_bytes=1)
+    path, _ = cache.get_or_render("<p>a</p>", RenderOptions(add_wrapper=False))
+    assert open(path, encoding="utf-8").read() == "<p>a</p>"
+    cache.cleanup()
+    assert not os.path.exists(cache.directory)
@@ -0,0 +1,51 @@
+"""Tests for the PDF renderer pool."""
+
+import os
+import time
+
+from papyrus.core.pipeline import RenderOptions
+from papyrus.core.render_pool import RendererPool
+
+
+def _fake_render(source, target, _options, engine="auto"):
+    """Stand-in job: crash or hang on request, otherwise copy the file."""
+    text = source.read_text(encoding="utf-8")
+    if text == "crash":
+        os._exit(3)  # pylint: disable=protected-access
+    if text == "hang":
+        time.sleep(60)
+    target.write_text(f"{engine}:{text}", encoding="utf-8")
+    return source, target, len(text), len(text), None
+
+
+def test_pool_isolates_crashes_and_timeouts(tmp_path):
+    """Failing jobs are reported and their workers replaced; others finish."""
+    names = ["a", "crash", "b", "hang", "c", "d"]
+    jobs = []
+    for name in names:
+        source = tmp_path / f"{name}.html"
+        source.write_text(name, encoding="utf-8")
+        jobs.append((source, tmp_path / f"{name}.out", RenderOptions()))
+
+    with RendererPool(workers=2, timeout=2, engine="qt", task=_fake_render, warm_up=False) as pool:
+        results = {r[0].stem: r[4] for r in pool.imap_unordered(jobs)}
+        assert pool.restarts == 2
+
+    assert sorted(results) == sorted(names)
+    assert "exit code 3" in results["crash"]
+    assert "timed out" in results["hang"]
+    for name in ("a", "b", "c", "d"):
+        assert results[name] is None
+        assert (tmp_path / f"{name}.out").read_text(encoding="utf-8") == f"qt:{name}"
+
+
+def test_pool_renders_pdfs(tmp_path):
+    sources = []
+    for i in range(3):
+        source = tmp_path / f"doc{i}.html"
+        source.write_text(f"<h1>Doc {i}</h1>", encoding="utf-8")
+        sources.append((source, tmp_path / f"doc{i}.pdf", RenderOptions(print_bands=True)))
+    with RendererPool(workers=2, engine="qt") as pool:
+        results = list(pool.imap_unordered(sources))
+    assert [r[4] for r in results] == [None, None, None]
+    assert all(r[1].read_bytes().startswith(b"%PDF") for r in results)
@@ -0,0 +1,139 @@
+"""Tests for the local HTTP render service."""
+
+import asyncio
+import re
+
+import pytest
+
+from papyrus.core.pipeline import RenderOptions, render_html
+from papyrus.core.server import RenderServer, check_loopback, parse_options
+
+
+def _serve(test, **kwargs):
+    """Run test(server) against a server on a free port."""
+
+    async def main():
+        server = RenderServer(port=0, jobs=1, **kwargs)
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+async def _response(reader) -> tuple:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    body = await reader.readexactly(int(headers["Content-Length"]))
+    return int(lines[0].split(" ")[1]), headers, body
+
+
+def _request(method: str, path: str, body: bytes = b"", headers: str = "") -> bytes:
+    length = f"Content-Length: {len(body)}\r\n" if body or method == "POST" else ""
+    return f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n{length}{headers}\r\n".encode() + body
+
+
+def _untimed(html: str) -> str:
+    return re.sub(r"<title>.*?</title>", "", html)
+
+
+def test_render_over_keep_alive_connection():
+    """Plain and chunked bodies are rendered like render_html on one connection."""
+    source = "<h1>Report</h1><p>a\u200bb</p>"
+
+    async def test(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(_request("POST", "/render?bands=1&band_text=Internal", source.encode()))
+        status, headers, body = await _response(reader)
+        assert status == 200 and headers["Connection"] == "keep-alive"
+        expected = render_html(source, RenderOptions(print_bands=True, band_text="Internal"))
+        assert _untimed(body.decode()) == _untimed(expected)
+
+        encoded = source.encode()
+        chunked = b"".join(
+            b"%x\r\n%s\r\n" % (len(part), part) for part in (encoded[:5], encoded[5:])
+        )
+        writer.write(
+            b"POST /render?wrapper=0 HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+            + chunked
+            + b"0\r\n\r\n"
+        )
+        status, _, body = await _response(reader)
+        assert status == 200
+        assert body.decode() == render_html(source, RenderOptions(add_wrapper=False))
+
+        writer.write(_request("GET", "/metrics"))
+        status, headers, body = await _response(reader)
+        metrics = body.decode()
+        assert status == 200 and headers["Content-Type"].startswith("text/plain")
+        assert 'papyrus_requests_total{path="/render",status="200"} 2' in metrics
+        assert 'papyrus_render_duration_seconds_bucket{format="html",le="+Inf"} 2' in metrics
+        writer.close()
+
+    _serve(test)
+
+
+def test_errors_keep_the_connection_usable():
+    """Bad options, unknown paths and wrong methods get error statuses."""
+
+    async def test(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        for request, expected in (
+            (_request("POST", "/render?theme=missing", b"<p>x</p>"), 400),
+            (_request("POST", "/render?colour=red", b"<p>x</p>"), 400),
+            (_request("GET", "/render"), 405),
+            (_request("GET", "/nowhere"), 404),
+            (_request("GET", "/health"), 200),
+        ):
+            writer.write(request)
+            status, _, _ = await _response(reader)
+            assert status == expected
+        writer.write(b"POST /render HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        status, _, _ = await _response(reader)
+        assert status == 411
+        assert server.metrics.value("papyrus_requests_total", path="other", status="404") == 1
+        writer.close()
+
+    _serve(test)
+
+
+def test_full_queue_is_rejected():
+    """Requests beyond the workers and the queue get 503 straight away."""
+
+    async def test(server):
+        streams = []
+        # Both hold a render slot while their bodies are still arriving
+        for _ in range(2):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"POST /render HTTP/1.1\r\nContent-Length: 10\r\n\r\n<p>")
+            await writer.drain()
+            streams.append((reader, writer))
+        await asyncio.sleep(0.05)
+
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(_request("POST", "/render", b"<p>x</p>"))
+        status, headers, _ = await _response(reader)
+        assert status == 503 and headers["Retry-After"] == "1"
+        assert server.metrics.value("papyrus_rejected_total") == 1
+        writer.close()
+
+        for reader, writer in streams:
+            writer.write(b"hi</p>\n")
+            status, _, _ = await _response(reader)
+            assert status == 200
+            writer.close()
+
+    _serve(test, max_queue=0)
+
+
+def test_options_and_host_checks():
+    options, output = parse_options({"bands": ["yes"], "top_mm": ["20"], "format": ["PDF"]})
+    assert output == "pdf" and options.print_bands and options.top_mm == 20
+    with pytest.raises(ValueError):
+        parse_options({"bands": ["maybe"]})
+    check_loopback("::1")
+    with pytest.raises(ValueError):
+        check_loopback("0.0.0.0")
@@ -0,0 +1,23 @@
+"""Tests for the startup path."""
+
+import os
+import subprocess
+import sys
+
+import papyrus.main
+
+
+def test_profile_startup_defers_heavy_modules():
+    """The first window paints without bs4, history or the browser modules."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [sys.executable, papyrus.main.__file__, "--profile-startup"],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "time to first paint" in result.stderr
+    assert "deferred modules loaded early: none" in result.stderr
@@ -0,0 +1,41 @@
+"""Tests for incremental document statistics."""
+
+import os
+import sys
+
+from PySide6.QtWidgets import QApplication  # pylint: disable=no-name-in-module
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _get_app() -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def test_counts_follow_edits():
+    """Incremental word counts match a full recount after mixed edits."""
+    _get_app()
+    from PySide6.QtWidgets import QTextEdit  # pylint: disable=import-outside-toplevel,no-name-in-module
+    from papyrus.ui.stats import DocumentStats  # pylint: disable=import-outside-toplevel
+
+    editor = QTextEdit()
+    stats = DocumentStats(editor.document())
+    assert (stats.chars, stats.words, stats.lines) == (0, 0, 0)
+
+    editor.setPlainText("one two\nthree\n\nfour five six")
+    cursor = editor.textCursor()
+    cursor.setPosition(4)
+    cursor.insertText("and a\nhalf ")
+    cursor.setPosition(2)
+    cursor.setPosition(20, cursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    cursor.movePosition(cursor.MoveOperation.End)
+    cursor.insertText(" seven\n\neight")
+
+    text = editor.toPlainText()
+    assert stats.chars == len(text)
+    assert stats.words == len(text.split())
+    assert stats.lines == text.count("\n") + 1
@@ -0,0 +1,79 @@
+"""Tests for the chunked render pipeline."""
+
+import itertools
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from papyrus import cli
+from papyrus.core import stream
+from papyrus.core.pipeline import RenderOptions, render_html
+
+NOW = datetime(2024, 5, 6, 7, 8)
+
+DOCUMENTS = (
+    "<p>a\r\nb\u200b</p><span style='user-select:none'>x</span>\r",
+    "<!DOCTYPE html><HTML><head><title>t</title></HEAD>"
+    "<body class='x'>\r\n<p>hi\xa0there</p></body></HTML>",
+    "<html><head></head><head></head><body><i style='pointer-events: none'></i></BODY></html>",
+    "<body><p>body without html</p></body>",
+    "<p>fragment</p></head><p>with a stray head close</p>",
+    "<html><p>no body</p></html>",
+    "<style id='pdf-copy-sanitize'></style><p>already sanitized</p>",
+    "",
+)
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_matches_render_html_at_any_chunk_boundary(tmp_path, document):
+    """Tiny chunks split every marker, token and line ending somewhere."""
+    source = tmp_path / "in.html"
+    source.write_bytes(document.encode("utf-8"))
+    for add_wrapper, pdf_copy, print_bands in itertools.product((False, True), repeat=3):
+        options = RenderOptions(add_wrapper=add_wrapper, pdf_copy=pdf_copy, print_bands=print_bands)
+        expected = render_html(document, options, now=NOW)
+        for chunk_size in (1, 2, 3, 7, 4096):
+            rendered = "".join(stream.iter_render(str(source), options, now=NOW, chunk_size=chunk_size))
+            assert rendered == expected, (options, chunk_size)
+
+
+def test_memory_does_not_grow_with_input(tmp_path):
+    """Peak allocation stays near the chunk size for a much larger file."""
+    source = tmp_path / "big.html"
+    line = "<p class='c'>user-select: none \u2014 text\u200b</p>\r\n"
+    with open(source, "w", encoding="utf-8", newline="") as f:
+        f.write("<html><head></head><body>")
+        for _ in range(100):
+            f.write(line * 1000)
+        f.write("</body></html>")
+    size = source.stat().st_size
+
+    tracemalloc.start()
+    try:
+        size_in, size_out = stream.render_file(
+            str(source), str(tmp_path / "out.html"), RenderOptions(print_bands=True), chunk_size=16_384
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert size_in == size and size_out > 0
+    assert peak < size / 5
+
+
+def test_cli_streams_large_sources(tmp_path, monkeypatch):
+    """Files above the threshold go through the chunked renderer."""
+    monkeypatch.setattr(cli, "STREAM_THRESHOLD_BYTES", 10)
+    calls = []
+    real_render_file = cli.render_file
+
+    def spy(*args, **kwargs):
+        calls.append(args[0])
+        return real_render_file(*args, **kwargs)
+
+    monkeypatch.setattr(cli, "render_file", spy)
+    src = tmp_path / "page.html"
+    src.write_text("<h1>Streamed</h1>", encoding="utf-8")
+    assert cli.main(["convert", str(src), "-o", str(tmp_path / "out"), "-j", "1"]) == 0
+    assert calls == [str(src)]
+    assert "<h1>Streamed</h1>" in (tmp_path / "out" / "page.html").read_text(encoding="utf-8")
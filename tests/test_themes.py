@@ -0,0 +1,79 @@
+"""Tests for the theme registry and its compiled CSS bundles."""
+
+import json
+
+import pytest
+
+from papyrus.core import pipeline, themes
+
+
+def _write_theme(directory, theme_id, **data):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{theme_id}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_builtin_themes_are_complete():
+    registry = themes.ThemeRegistry(directories=[], cache_dir="")
+    assert registry.ids()[0] == themes.DEFAULT_THEME
+    dark = registry.get(themes.DEFAULT_THEME)
+    for theme_id in registry.ids():
+        theme = registry.get(theme_id)
+        assert theme.colors.keys() == dark.colors.keys()
+        assert theme.tokens.keys() == dark.tokens.keys()
+        assert registry.css(theme_id).startswith("*{margin:0;")
+    assert pipeline.DEFAULT_COLORS == dark.colors
+
+
+def test_minify_css():
+    css = "/* note */\n a:hover ,  b > c {\n  color: red ;\n  margin: 0 auto;\n}\n"
+    assert themes.minify_css(css) == "a:hover,b>c{color:red;margin:0 auto}"
+
+
+def test_bundle_is_compiled_once_and_kept_on_disk(tmp_path):
+    cache = tmp_path / "cache"
+    first = themes.ThemeRegistry(directories=[], cache_dir=str(cache))
+    css = first.css("light")
+    assert first.css("light") is css
+    path = cache / f"{first.get('light').digest}.css"
+    assert path.read_text(encoding="utf-8") == css
+
+    # A new registry, e.g. in another worker process, reads the stored bundle
+    path.write_text("body{color:red}", encoding="utf-8")
+    second = themes.ThemeRegistry(directories=[], cache_dir=str(cache))
+    assert second.css("light") == "body{color:red}"
+
+
+def test_user_theme_overrides_and_inherits(tmp_path):
+    user = tmp_path / "themes"
+    _write_theme(
+        user, "sepia", name="Sepia", colors={"dark_grey": "#704214"}, css="p { margin: 0; }"
+    )
+    registry = themes.ThemeRegistry(directories=[str(user)], cache_dir="")
+    sepia = registry.get("sepia")
+    assert sepia.name == "Sepia"
+    assert sepia.colors["white"] == registry.get("dark").colors["white"]
+    css = registry.css("sepia")
+    assert "#704214" in css and css.endswith("p{margin:0}")
+
+    # Editing the file changes the digest, so stale bundles are never reused
+    digest = sepia.digest
+    _write_theme(user, "sepia", colors={"dark_grey": "#000000"})
+    registry.reload()
+    assert registry.get("sepia").digest != digest
+
+
+def test_invalid_and_unknown_themes(tmp_path):
+    user = tmp_path / "themes"
+    user.mkdir()
+    (user / "broken.json").write_text("{not json", encoding="utf-8")
+    with pytest.raises(themes.ThemeError):
+        themes.ThemeRegistry(directories=[str(user)], cache_dir="").ids()
+    with pytest.raises(themes.ThemeError, match="Unknown theme"):
+        themes.ThemeRegistry(directories=[], cache_dir="").get("nope")
+
+
+def test_render_html_uses_the_theme_bundle():
+    light = pipeline.render_html("<p>x</p>", pipeline.RenderOptions(theme="light"))
+    assert f"<style>{pipeline.wrapper_css(theme='light')}</style>" in light
+    custom = pipeline.render_html("<p>x</p>", colors={"dark_grey": "#123456"})
+    assert "#123456" in custom
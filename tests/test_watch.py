@@ -0,0 +1,108 @@
+"""Tests for the watch-folder manifest and incremental rebuilds."""
+
+import os
+
+from papyrus import cli
+from papyrus.core.pipeline import RenderOptions
+from papyrus.core.themes import registry
+from papyrus.core.watch import MANIFEST_NAME, WatchFolder
+
+
+def _folder(src, out, options, **kwargs):
+    kwargs.setdefault("debounce", 0.0)
+    return WatchFolder(str(src), str(out), cli.convert_file, lambda _: options[0], **kwargs)
+
+
+def _touch(path, seconds=10):
+    """Move a file's mtime back so it no longer matches the manifest and is settled."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_sync_renders_only_what_changed(tmp_path):
+    """Touched files are hashed, not rendered; edits, deletions and options changes are."""
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.html").write_text("<h1>A</h1>", encoding="utf-8")
+    (src / "nested" / "b.htm").write_text("<p>B\u200b</p>", encoding="utf-8")
+    (src / "notes.txt").write_text("skip me", encoding="utf-8")
+    out = tmp_path / "out"
+    options = [RenderOptions()]
+
+    with _folder(src, out, options) as folder:
+        first = folder.sync()
+        assert (first.converted, first.unchanged, first.failed) == (2, 0, [])
+        assert "\u200b" not in (out / "nested" / "b.htm").read_text(encoding="utf-8")
+        assert not (out / "notes.txt").exists()
+
+        assert folder.sync().converted == 0
+
+        _touch(src / "a.html")
+        touched = folder.sync()
+        assert (touched.converted, touched.unchanged) == (0, 2)
+
+        (src / "a.html").write_text("<h1>A2</h1>", encoding="utf-8")
+        _touch(src / "a.html", 20)
+        assert folder.sync().converted == 1
+        assert "A2" in (out / "a.html").read_text(encoding="utf-8")
+
+        (out / "a.html").unlink()
+        assert folder.sync().converted == 1
+
+        (src / "nested" / "b.htm").unlink()
+        removed = folder.sync()
+        assert removed.removed == 1 and not (out / "nested" / "b.htm").exists()
+
+        options[0] = RenderOptions(theme="light")
+        assert folder.sync().converted == 1
+        assert registry().css("light") in (out / "a.html").read_text(encoding="utf-8")
+
+
+def test_manifest_persists_between_runs(tmp_path):
+    """A new WatchFolder on the same output picks up where the last one stopped."""
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(3):
+        (src / f"{i}.html").write_text(f"<p>{i}</p>", encoding="utf-8")
+    out = tmp_path / "out"
+    options = [RenderOptions()]
+
+    with _folder(src, out, options) as folder:
+        assert folder.sync().converted == 3
+    assert (out / MANIFEST_NAME).exists()
+
+    (src / "1.html").write_text("<p>one</p>", encoding="utf-8")
+    _touch(src / "1.html")
+    with _folder(src, out, options) as folder:
+        result = folder.sync()
+    assert (result.converted, result.unchanged) == (1, 2)
+
+
+def test_recently_modified_files_wait_for_debounce(tmp_path):
+    """A file still being written is left for a later pass."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    out = tmp_path / "out"
+
+    with _folder(src, out, [RenderOptions()], debounce=5.0) as folder:
+        mtime = os.stat(src / "a.html").st_mtime
+        pending = folder.sync(now=mtime + 1)
+        assert (pending.converted, pending.pending) == (0, 1)
+        assert not (out / "a.html").exists()
+        assert folder.sync(now=mtime + 6).converted == 1
+
+
+def test_watch_once_command(tmp_path, capsys):
+    """papyrus watch --once syncs a single time and reports it."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert cli.main(["watch", str(src), "-o", str(out), "--once", "--bands"]) == 0
+    assert "converted 1" in capsys.readouterr().out
+    assert 'class="print-header"' in (out / "a.html").read_text(encoding="utf-8")
+    assert cli.main(["watch", str(src), "-o", str(out), "--once", "-v"]) == 0
+    # Dropping --bands changes the options, so the file is rendered again
+    assert "converted 1" in capsys.readouterr().out